@@ -11,25 +11,34 @@ Modules Used:
 import os
 from script_container.execution.setup_installation import AutomationScriptForSetupInstalltion
 from script_container.execution.bus_info_details import PairingManagerInfo
+from script_container.execution.topology_cache import TopologyCache, DEFAULT_TOPOLOGY_CACHE_PATH
 from script_container.execution.dut_ports_config import DutPortConfig
 from script_container.execution.dut_crbs_config import DutCrbsConfig
 from script_container.execution.dut_execution_config import ExecutionCfgUpdate
 from script_container.execution.constant import print_separator
+from script_container.execution.tracing import TRACER
+from script_container.execution.output_stream import EchoHandler, PatternAlertHandler
+from script_container.execution.pipeline import PipelineScheduler, PipelineStep
+from script_container.execution.step_journal import StepJournal, DEFAULT_STEP_JOURNAL_PATH, file_digest
+from script_container.execution.git_mirror import public_url
+
+DPDK_DTS_FOLDER_NAME = "dts_setup"
+DTS_REPO_NAME = "networking.dataplane.dpdk.dts.local.upstream"
 
 def main():
     """
-    Executes the full setup process:
+    Executes the full setup process as a DAG of steps (see build_pipeline):
     1. Update firmware and drivers
     2. Install required packages
     3. Prepare environment and clone repositories
     4. Fetch interface pairing info and map bus details
     5. Configure DUT ports
+    Independent steps (package installs, git clones, NIC discovery) run in parallel.
     """
 
     error_logs = []
     error_logs_cmd = []
     dpdk_dts_path = os.environ.get('DPDK_INSTALLTION_PATH',"")
-    dpdk_dts_folder_name = "dts_setup"
 
     try:
         print("\n🚀 Starting Setup Scripts...\n")\
@@ -51,97 +60,15 @@ def main():
             git_token=git_token,
             git_user=git_user
         )
-        # ADDING SEPARATOR
-        print_separator()
-        # STEP  :Updating Proxy First 
-        script.setup_proxy_environment()
-        
-        # STEP : Update firmware and drivers
-        if os.environ.get('DRIVER_UPDATE', 'FALSE').upper() == 'TRUE':
-            # ADDING SEPARATOR
-            print_separator()
-            script.updating_firmware_drivers()
-
-        # STEP : Install required system and Python packages
-        if os.environ.get("APT_PACKAGE_UPDATE_REQUIRED","FALSE").upper() == "TRUE":
-            # ADDING SEPARATOR
-            print_separator()
-            script.install_required_packages()
-
-        # STEP : Prepare environment for DPDK/DTS setup
-        if os.environ.get("DPDK_SETUP_INSTALLATION","false").upper() == "TRUE":
-            os.chdir(dpdk_dts_path)
-            # ADDING SEPARATOR
-            print_separator()
-            script.creating_folder_setup(dpdk_dts_folder_name)
-        
-            dpdk_dts_path = os.getcwdb().decode()
-            
-            
-            print("git_user => ",git_user,type(git_user))
-            print("git_token => ",git_token,type(git_token))
-
-            # STEP : Clone DPDK and DTS repositories
-            # ADDING SEPARATOR
-            print_separator()
-            print("\n🚀 Starting DPDK and DTS setup process...\n")
-            script.clone_dts_repo()
-            # ADDING SEPARATOR
-            print_separator()
-            script.clone_dpdk_repo()
 
+        pipeline = build_pipeline(script)
+        try:
+            pipeline.run({'start_dir': os.getcwd(), 'dpdk_dts_path': dpdk_dts_path})
+        finally:
             # Collect error logs
             error_logs += script.error_logs
             error_logs_cmd += script.error_logs_cmd
 
-            # STEP : Fetch interface pairing info
-            # ADDING SEPARATOR
-            print_separator()
-            print("🧩 Initializing PairingManagerInfo object...")
-            obj = PairingManagerInfo()
-
-            print("\n🔍 Fetching Interface and Bus Pairing Information...\n")
-            obj.fetchingInterFacePairingInfo()
-
-            print("\n🔗 Fetching Interface Connection Details...\n")
-            obj.fetchingPairDetailsFromInterface()
-
-            print("\nMapping Interface With Bus Info")
-            interface_details = obj.mapInterfaceToBus()
-
-            print("INTERFACE DETAILS :\n\n",interface_details)
-            
-            # STEP : Configure DUT ports [ports.cfg]
-            ports_config_obj = DutPortConfig(dpdk_dts_path)
-
-            print(
-                "\n🔧 Loaded Configuration:\n"
-                "-----------------------------\n"
-                f"🌐 IP Address : {ports_config_obj.ip_address}\n"
-                f"👤 Username   : {ports_config_obj.username}\n"
-                f"🔑 Password   : {'*' * len(ports_config_obj.password) if ports_config_obj.password else 'Not Set'}\n"
-            )
-
-            ports_config_obj.update_ports(interface_details)
-
-            # STEP : Configure Updating Password [crbs.cfg]
-            # ADDING SEPARATOR
-            print_separator()
-            crfs_file_obj = DutCrbsConfig(dpdk_dts_path) 
-            crfs_file_obj.updating_crbs_file(
-            dut_ip = ports_config_obj.ip_address,
-            dut_user = ports_config_obj.username,
-            dut_passwd = ports_config_obj.password,
-            tester_ip = ports_config_obj.ip_address,
-            tester_passwd = ports_config_obj.password
-            )
-            
-            # STEP : Configure Execution.cfg
-            # ADDING SEPARATOR
-            print_separator()
-        
-            executionObj = ExecutionCfgUpdate(dpdk_dts_path)
-            executionObj.update_execution_content(ports_config_obj.ip_address)
             #ERROR : Capturing Viewer
             for log in error_logs:
                 print("ERROR LOG:",log)
@@ -149,23 +76,222 @@ def main():
             for log in error_logs_cmd:
                 print("ERROR LOG CMD:",log)
 
-
-            # STEP : Executing Process [DTS] setup
-            if os.environ.get("DPDK_SETUP_RUN","false").upper() == "TRUE":
-                # ADDING SEPARATOR
-                print_separator()
-                print_separator()
-                path = dpdk_dts_path.strip() + "/networking.dataplane.dpdk.dts.local.upstream"
-                os.chdir(path)
-                script.run_command(["./dts"],"\n\n---------------RUNNING DTS SERVICE-----------\n\n")
-                print_separator()
-                print_separator()
-
     except Exception as e:
         print(f"\n❌ An error occurred during execution: {e}\n")
 
+    # TIMING : Slowest phases and commands, plus a Chrome trace next to the JSONL trace
+    print_separator()
+    print("⏱️ Slowest Steps:\n")
+    print(TRACER.summary(int(os.environ.get("TRACE_SUMMARY_COUNT", "15"))))
+    if TRACER.trace_path:
+        try:
+            TRACER.export_chrome_trace(TRACER.trace_path + ".chrome.json")
+            print(f"\n🧾 Trace written to {TRACER.trace_path} ({TRACER.trace_path}.chrome.json for chrome://tracing)")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not export Chrome trace: {e}")
+        TRACER.close()
+
     print("\n✅ Script Execution Completed Successfully.\n")
 
 
+def build_pipeline(script):
+    """
+    Declares the setup steps with their inputs, outputs and exclusive resources.
+
+    Steps that os.chdir() hold the "cwd" resource and always change to an absolute
+    directory first, so they never depend on where another step left the process.
+    Steps running apt hold the "apt" resource (dpkg lock). Expensive steps declare a
+    fingerprint of their inputs; with the step journal a rerun skips them while their
+    inputs are unchanged (STEP_JOURNAL_PATH, STEP_JOURNAL_RESET=TRUE to start over).
+
+    Args:
+        script (AutomationScriptForSetupInstalltion): Installer used by the setup steps.
+
+    Returns:
+        PipelineScheduler: Ready to run with {'start_dir', 'dpdk_dts_path'} as context.
+    """
+    dpdk_setup = os.environ.get("DPDK_SETUP_INSTALLATION","false").upper() == "TRUE"
+    pairing_mode = os.environ.get("PAIRING_MODE", "sequential").lower()
+    journal = StepJournal(os.environ.get("STEP_JOURNAL_PATH", DEFAULT_STEP_JOURNAL_PATH))
+    if os.environ.get("STEP_JOURNAL_RESET", "FALSE").upper() == "TRUE":
+        journal.invalidate()
+    pipeline = PipelineScheduler(max_workers=int(os.environ.get("PIPELINE_WORKERS", "4")), journal=journal)
+
+    # FINGERPRINTS : Everything a step's result depends on (credentials are never hashed)
+    def firmware_drivers_inputs(context):
+        return {'firmware': file_digest(script.firmware_file_path), 'driver': file_digest(script.driver_path),
+                'kernel': os.uname().release}
+
+    def packages_inputs(context):
+        return {'apt': script.APT_PACKAGES, 'pip': script.PIP_PACKAGES}
+
+    def clone_dts_inputs(context):
+        # DTS follows the default branch, so the step is keyed on the commit it points at now;
+        # None (remote unreachable) runs the clone instead of trusting the journal
+        commit = script.git_mirror.resolve(script.dts_url)
+        return {'url': public_url(script.dts_url), 'commit': commit, 'path': context['dts_setup_path']} \
+            if commit else None
+
+    def clone_dpdk_inputs(context):
+        return {'url': script.dpdk_url, 'ref': script.DPDK_REF, 'path': context['dts_repo_path']}
+
+    # OUTPUT CHECKS : A journaled clone is only reused while its workspace is still on disk
+    def clone_dts_present(outputs):
+        return os.path.isdir(os.path.join(outputs['dts_repo_path'], "dep"))
+
+    def clone_dpdk_present(outputs):
+        dep_path = os.path.dirname(outputs['dpdk_repo_path'])
+        return os.path.isdir(outputs['dpdk_repo_path']) and os.path.isfile(os.path.join(dep_path, "dpdk.tar.gz"))
+
+    # STEP  :Updating Proxy First 
+    def proxy(context):
+        script.setup_proxy_environment()
+        return {'proxy': True}
+
+    # STEP : Update firmware and drivers
+    def firmware_drivers(context):
+        print_separator()
+        os.chdir(context['start_dir'])
+        script.updating_firmware_drivers()
+        return {'drivers_ready': True}
+
+    # STEP : Install required system and Python packages
+    def packages(context):
+        print_separator()
+        if not script.install_required_packages():
+            return False
+        return {'packages_ready': True}
+
+    # STEP : Prepare environment for DPDK/DTS setup
+    def setup_folder(context):
+        print_separator()
+        os.chdir(context['dpdk_dts_path'])
+        return {'dts_setup_path': script.creating_folder_setup(DPDK_DTS_FOLDER_NAME)}
+
+    # STEP : Clone DPDK and DTS repositories
+    def clone_dts(context):
+        print_separator()
+        os.chdir(context['dts_setup_path'])
+        print("\n🚀 Starting DPDK and DTS setup process...\n")
+        script.clone_dts_repo()
+        return {'dts_repo_path': os.path.join(context['dts_setup_path'], DTS_REPO_NAME)}
+
+    def clone_dpdk(context):
+        print_separator()
+        os.chdir(os.path.join(context['dts_repo_path'], "dep"))
+        script.clone_dpdk_repo()
+        return {'dpdk_repo_path': os.path.join(context['dts_repo_path'], "dep", "dpdk")}
+
+    # STEP : Fetch interface pairing info
+    def pairing(context):
+        print_separator()
+        print("🧩 Initializing PairingManagerInfo object...")
+        with PairingManagerInfo(pairing_mode=pairing_mode) as obj:
+            print("\n🔍 Fetching Interface and Bus Pairing Information...\n")
+            obj.fetchingInterFacePairingInfo()
+
+            # Cached cabling is reused unless the NIC inventory changed or a rediscover is forced
+            topology_cache = TopologyCache(os.environ.get("TOPOLOGY_CACHE_PATH", DEFAULT_TOPOLOGY_CACHE_PATH))
+            if os.environ.get("TOPOLOGY_CACHE_INVALIDATE", "FALSE").upper() == "TRUE":
+                topology_cache.invalidate()
+
+            interface_details = None
+            if os.environ.get("TOPOLOGY_REDISCOVER", "FALSE").upper() != "TRUE":
+                interface_details = obj.loadCachedTopology(topology_cache)
+
+            if interface_details is None:
+                with TRACER.span("pairing_discovery", pairing_mode=obj.pairing_mode):
+                    print("\n🔗 Fetching Interface Connection Details...\n")
+                    obj.fetchingPairDetailsFromInterface()
+
+                    print("\nMapping Interface With Bus Info")
+                    interface_details = obj.mapInterfaceToBus()
+                    obj.saveTopology(topology_cache, interface_details)
+
+        print("INTERFACE DETAILS :\n\n",interface_details)
+        return {'interface_details': interface_details}
+
+    # STEP : Configure DUT ports [ports.cfg]
+    def ports_config(context):
+        ports_config_obj = DutPortConfig(context['dts_setup_path'])
+
+        print(
+            "\n🔧 Loaded Configuration:\n"
+            "-----------------------------\n"
+            f"🌐 IP Address : {ports_config_obj.ip_address}\n"
+            f"👤 Username   : {ports_config_obj.username}\n"
+            f"🔑 Password   : {'*' * len(ports_config_obj.password) if ports_config_obj.password else 'Not Set'}\n"
+        )
+
+        ports_config_obj.update_ports(context['interface_details'])
+        return {'dut_identity': ports_config_obj}
+
+    # STEP : Configure Updating Password [crbs.cfg]
+    def crbs_config(context):
+        print_separator()
+        ports_config_obj = context['dut_identity']
+        crfs_file_obj = DutCrbsConfig(context['dts_setup_path']) 
+        crfs_file_obj.updating_crbs_file(
+        dut_ip = ports_config_obj.ip_address,
+        dut_user = ports_config_obj.username,
+        dut_passwd = ports_config_obj.password,
+        tester_ip = ports_config_obj.ip_address,
+        tester_passwd = ports_config_obj.password
+        )
+        return {'crbs_cfg': True}
+
+    # STEP : Configure Execution.cfg
+    def execution_config(context):
+        print_separator()
+        executionObj = ExecutionCfgUpdate(context['dts_setup_path'])
+        executionObj.update_execution_content(context['dut_identity'].ip_address)
+        return {'execution_cfg': True}
+
+    # STEP : Executing Process [DTS] setup
+    def dts_run(context):
+        print_separator()
+        print_separator()
+        os.chdir(context['dts_repo_path'])
+        script.run_command_streaming(["./dts"],"\n\n---------------RUNNING DTS SERVICE-----------\n\n",
+                                     [EchoHandler(), PatternAlertHandler(echo=False)], tail_lines=500)
+        print_separator()
+        print_separator()
+
+    pipeline.add(PipelineStep("setup_proxy_environment", proxy, outputs=["proxy"]))
+    pipeline.add(PipelineStep("updating_firmware_drivers", firmware_drivers, inputs=["proxy", "start_dir"],
+                              outputs=["drivers_ready"], resources=["cwd", "apt"], fingerprint=firmware_drivers_inputs,
+                              enabled=os.environ.get('DRIVER_UPDATE', 'FALSE').upper() == 'TRUE'))
+    pipeline.add(PipelineStep("install_required_packages", packages, inputs=["proxy"],
+                              outputs=["packages_ready"], resources=["apt"], fingerprint=packages_inputs,
+                              enabled=os.environ.get("APT_PACKAGE_UPDATE_REQUIRED","FALSE").upper() == "TRUE"))
+    pipeline.add(PipelineStep("creating_folder_setup", setup_folder, inputs=["dpdk_dts_path"],
+                              outputs=["dts_setup_path"], resources=["cwd"], enabled=dpdk_setup))
+    pipeline.add(PipelineStep("clone_dts_repo", clone_dts, inputs=["proxy", "dts_setup_path"],
+                              outputs=["dts_repo_path"], resources=["cwd"], fingerprint=clone_dts_inputs,
+                              verify=clone_dts_present, enabled=dpdk_setup))
+    pipeline.add(PipelineStep("clone_dpdk_repo", clone_dpdk, inputs=["proxy", "dts_repo_path"],
+                              outputs=["dpdk_repo_path"], resources=["cwd"], fingerprint=clone_dpdk_inputs,
+                              verify=clone_dpdk_present, enabled=dpdk_setup))
+    # No journal fingerprint: TopologyCache reuses cabling after validating carrier and
+    # honours TOPOLOGY_REDISCOVER / TOPOLOGY_CACHE_INVALIDATE; interfaces are brought up every run
+    # LLDP pairing needs lldpad from install_required_packages; the other modes only need the driver
+    pairing_inputs = ["drivers_ready", "packages_ready"] if pairing_mode == "lldp" else ["drivers_ready"]
+    pipeline.add(PipelineStep("interface_pairing", pairing, inputs=pairing_inputs,
+                              outputs=["interface_details"], enabled=dpdk_setup))
+    pipeline.add(PipelineStep("update_ports", ports_config, inputs=["interface_details", "dts_setup_path", "dts_repo_path"],
+                              outputs=["dut_identity"], resources=["cwd"], enabled=dpdk_setup))
+    pipeline.add(PipelineStep("updating_crbs_file", crbs_config,
+                              inputs=["dut_identity", "dts_setup_path", "dts_repo_path"],
+                              outputs=["crbs_cfg"], resources=["cwd"], enabled=dpdk_setup))
+    pipeline.add(PipelineStep("update_execution_content", execution_config,
+                              inputs=["dut_identity", "dts_setup_path", "dts_repo_path"],
+                              outputs=["execution_cfg"], resources=["cwd"], enabled=dpdk_setup))
+    pipeline.add(PipelineStep("dts_run", dts_run,
+                              inputs=["crbs_cfg", "execution_cfg", "dpdk_repo_path", "packages_ready", "dts_repo_path"],
+                              resources=["cwd"],
+                              enabled=dpdk_setup and os.environ.get("DPDK_SETUP_RUN","false").upper() == "TRUE"))
+    return pipeline
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
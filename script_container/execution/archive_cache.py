@@ -0,0 +1,190 @@
+import os
+import json
+import shutil
+import tarfile
+import hashlib
+import platform
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.tracing import TRACER
+from script_container.execution.step_journal import file_digest
+
+
+DEFAULT_EXTRACTION_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dpdkCrafter", "extracted")
+
+# Folder-name tokens of the architecture-specific subtrees shipped in NVM update packages
+ARCH_TOKENS = {
+    "x86_64": ("x64", "x86_64"),
+    "aarch64": ("aarch64", "arm64"),
+}
+
+
+def member_path(name):
+    """
+    Normalises a tar member name ("./E810/Linux_x64/" -> "E810/Linux_x64").
+
+    Returns:
+        str: Relative path, or None for names escaping the extraction directory.
+    """
+    path = os.path.normpath(name.lstrip("/"))
+    if path in (".", "") or path == ".." or path.startswith("../"):
+        return None
+    return path
+
+
+class ExtractionCache(CommonFuntion):
+    """
+    Extracts tarballs once per content: trees are cached under the archive's SHA-256,
+    so running again with the same FIRMWARE_PATH / DRIVER_PATH does not extract at all.
+
+    The member index is read with tarfile (no extraction) and saved next to the
+    extracted trees, which lets callers pick directories without `ls` and extract
+    only the subtree they need.
+
+    Layout:
+        <root>/<sha256>/index.json     member paths and directories of the archive
+        <root>/<sha256>/tree/...       full extraction
+        <root>/<sha256>/<subtree>/...  selective extraction, rooted like the archive
+    """
+
+    def __init__(self, cache_root=DEFAULT_EXTRACTION_CACHE_PATH):
+        """
+        Args:
+            cache_root (str): Directory holding one folder per archive checksum.
+        """
+        self.cache_root = cache_root
+        self.digests = {}
+
+    def digest(self, archive):
+        # Checksums are memoised per (path, size, mtime): hashing a large NVM package twice is slow
+        stat = os.stat(archive)
+        key = (os.path.abspath(archive), stat.st_size, stat.st_mtime_ns)
+        if key not in self.digests:
+            self.digests[key] = file_digest(archive)
+        return self.digests[key]
+
+    def index(self, archive):
+        """
+        Returns:
+            dict: {'files': [...], 'dirs': [...]} relative member paths, in archive order.
+                  Directories implied by file paths are included even without their own entry.
+        """
+        index_path = os.path.join(self.cache_root, self.digest(archive), "index.json")
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        files, dirs = [], {}
+        with TRACER.span(f"Indexing {os.path.basename(archive)}", "archive"):
+            with tarfile.open(archive, "r|*") as tar:
+                for member in tar:
+                    path = member_path(member.name)
+                    if path is None:
+                        continue
+                    if member.isdir():
+                        dirs[path] = None
+                    else:
+                        files.append(path)
+                    for parent in self._parents(path):
+                        dirs.setdefault(parent, None)
+        index = {'files': files, 'dirs': sorted(dirs)}
+
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"⚠️ Could not save archive index {index_path}: {e}")
+        return index
+
+    @staticmethod
+    def _parents(path):
+        parts = path.split("/")
+        return ["/".join(parts[:i]) for i in range(1, len(parts))]
+
+    def top_level_dirs(self, archive):
+        """
+        Returns:
+            list: Top-level directories of the archive.
+        """
+        return [path for path in self.index(archive)['dirs'] if "/" not in path]
+
+    def subdirs(self, archive, parent):
+        """
+        Returns:
+            list: Direct subdirectories of `parent` inside the archive, sorted.
+        """
+        prefix = parent.rstrip("/") + "/"
+        return [path for path in self.index(archive)['dirs']
+                if path.startswith(prefix) and "/" not in path[len(prefix):]]
+
+    def arch_subdir(self, archive, parent, machine=None):
+        """
+        Picks the subdirectory of `parent` built for this machine ("Linux_x64" on x86_64),
+        falling back to the first subdirectory when none is named after an architecture.
+
+        Returns:
+            str: Archive-relative path, or None if `parent` has no subdirectory.
+        """
+        candidates = self.subdirs(archive, parent)
+        tokens = ARCH_TOKENS.get(machine or platform.machine(), ())
+        for path in candidates:
+            if any(token in os.path.basename(path).lower() for token in tokens):
+                return path
+        return candidates[0] if candidates else None
+
+    def extract(self, archive, subtree=None):
+        """
+        Extracts the archive (or only `subtree`) into the cache unless already there.
+
+        Args:
+            archive (str): Tarball path (any compression tarfile understands).
+            subtree (str): Archive-relative directory to extract; None extracts everything.
+
+        Returns:
+            str: Directory the members were extracted into (archive paths are preserved
+                 below it), or None on failure.
+        """
+        digest = self.digest(archive)
+        if digest is None:
+            print(f"❌ Error reading archive {archive}")
+            return None
+        subtree = member_path(subtree) if subtree else None
+        name = "tree" if subtree is None else "sub-" + hashlib.sha1(subtree.encode()).hexdigest()[:12]
+        dest = os.path.join(self.cache_root, digest, name)
+        if os.path.isdir(dest):
+            print(f"♻️ {os.path.basename(archive)} already extracted at {dest}")
+            return dest
+
+        prefix = None if subtree is None else subtree + "/"
+        tmp_dest = f"{dest}.{os.getpid()}.tmp"
+        extracted = 0
+        print(f"\n🔧 Executing: Extracting {subtree or 'all members'} of {archive}")
+        with TRACER.span(f"Extracting {os.path.basename(archive)}", "archive", subtree=subtree) as span:
+            try:
+                shutil.rmtree(tmp_dest, ignore_errors=True)
+                os.makedirs(tmp_dest)
+                # One streaming pass: only the selected members are written to disk
+                with tarfile.open(archive, "r|*") as tar:
+                    for member in tar:
+                        path = member_path(member.name)
+                        if path is None or (prefix and path != subtree and not path.startswith(prefix)):
+                            continue
+                        if hasattr(tarfile, "data_filter"):
+                            tar.extract(member, tmp_dest, filter="tar")
+                        else:
+                            tar.extract(member, tmp_dest)
+                        extracted += 1
+                if not extracted:
+                    raise tarfile.TarError(f"no member under '{subtree}'")
+                os.rename(tmp_dest, dest)
+            except (OSError, tarfile.TarError) as e:
+                shutil.rmtree(tmp_dest, ignore_errors=True)
+                print(f"❌ Error extracting {archive}: {e}")
+                return None
+            span['members'] = extracted
+        print(f"📦 Extracted {extracted} members into {dest}")
+        return dest
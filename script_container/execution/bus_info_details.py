@@ -1,8 +1,292 @@
+import os
 import re
+import math
 import time
+import socket
+import shutil
+import tempfile
+import struct
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from script_container.execution.constant import CommonFuntion
+from script_container.execution.nic_inventory import NicInventory
+from script_container.execution.kmsg_reader import KmsgReader, CassetteKmsgReader
+from script_container.execution.topology_graph import TopologyGraph
+from script_container.execution.lldp_pairing import LldpNeighborCollector
+from script_container.execution.ethtool_ioctl import EthtoolIoctl, CassetteEthtoolBackend
 
 
+# --------------------------------------------------------------------------------------------------
+
+# RTNETLINK constants (linux/rtnetlink.h, linux/if_link.h)
+RTMGRP_LINK = 0x1
+RTM_NEWLINK = 16
+IFLA_IFNAME = 3
+IFLA_CARRIER = 33
+IFF_UP = 0x1
+IFF_LOWER_UP = 0x10000
+
+NLMSG_HEADER = struct.Struct("=IHHII")      # len, type, flags, seq, pid
+IFINFO_HEADER = struct.Struct("=BxHiII")    # family, type, index, flags, change
+RTATTR_HEADER = struct.Struct("=HH")        # len, type
+
+LinkEvent = namedtuple("LinkEvent", ["timestamp", "interface", "carrier", "index"])
+
+# Cassette pseudo-argv under which netlink datagrams are recorded
+LINK_SOURCE_KEY = ["#RTNETLINK"]
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def parse_link_messages(data):
+    """
+    Parses a netlink datagram into RTM_NEWLINK carrier records.
+
+    Args:
+        data (bytes): Raw datagram received on a NETLINK_ROUTE socket.
+
+    Returns:
+        list: (index, interface, carrier) tuples, one per RTM_NEWLINK message.
+    """
+    records = []
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        msg_len, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if msg_len < NLMSG_HEADER.size:
+            break
+        body = offset + NLMSG_HEADER.size
+        if msg_type == RTM_NEWLINK and body + IFINFO_HEADER.size <= offset + msg_len:
+            _, _, index, flags, _ = IFINFO_HEADER.unpack_from(data, body)
+            name, carrier = None, bool(flags & IFF_LOWER_UP)
+
+            attr = body + IFINFO_HEADER.size
+            while attr + RTATTR_HEADER.size <= offset + msg_len:
+                attr_len, attr_type = RTATTR_HEADER.unpack_from(data, attr)
+                if attr_len < RTATTR_HEADER.size:
+                    break
+                payload = data[attr + RTATTR_HEADER.size:attr + attr_len]
+                if attr_type == IFLA_IFNAME:
+                    name = payload.split(b"\0", 1)[0].decode(errors="replace")
+                elif attr_type == IFLA_CARRIER and payload:
+                    carrier = bool(payload[0])
+                attr += _align(attr_len)
+
+            if name:
+                records.append((index, name, carrier))
+        offset += _align(msg_len)
+    return records
+
+
+def build_link_message(index, interface, carrier):
+    """
+    Builds an RTM_NEWLINK datagram, e.g. to record fixtures for ReplayLinkSource.
+
+    Args:
+        index (int): Interface index.
+        interface (str): Interface name.
+        carrier (bool): Carrier state to encode.
+
+    Returns:
+        bytes: A single netlink message.
+    """
+    name = interface.encode() + b"\0"
+    attrs = RTATTR_HEADER.pack(RTATTR_HEADER.size + len(name), IFLA_IFNAME) + name
+    attrs += b"\0" * (_align(len(attrs)) - len(attrs))
+    attrs += RTATTR_HEADER.pack(RTATTR_HEADER.size + 1, IFLA_CARRIER) + bytes([int(carrier)]) + b"\0" * 3
+    body = IFINFO_HEADER.pack(0, 1, index, IFF_LOWER_UP if carrier else 0, 0) + attrs
+    return NLMSG_HEADER.pack(NLMSG_HEADER.size + len(body), RTM_NEWLINK, 0, 0, 0) + body
+
+
+class NetlinkLinkSource:
+    """
+    Receives RTM_NEWLINK notifications from the kernel (RTMGRP_LINK multicast group).
+    """
+
+    def __init__(self, poll_interval=0.2):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self.sock.bind((0, RTMGRP_LINK))
+        self.sock.settimeout(poll_interval)
+
+    def recv(self):
+        """
+        Returns:
+            bytes: Next datagram, or None if nothing arrived within the poll interval.
+        """
+        try:
+            return self.sock.recv(65536)
+        except socket.timeout:
+            return None
+
+    def close(self):
+        self.sock.close()
+
+
+class RecordingLinkSource:
+    """
+    Wraps a live link source and saves every datagram it receives to a CommandCassette,
+    with the delay since the previous one, for ReplayLinkSource.from_cassette().
+    """
+
+    def __init__(self, source, cassette):
+        self.source = source
+        self.cassette = cassette
+        self.last = time.monotonic()
+
+    def recv(self):
+        data = self.source.recv()
+        if data:
+            now = time.monotonic()
+            delay, self.last = now - self.last, now
+            self.cassette.capture(LINK_SOURCE_KEY, lambda: {'delay': round(delay, 6), 'datagram': data.hex()})
+        return data
+
+    def close(self):
+        self.source.close()
+
+
+class ReplayLinkSource:
+    """
+    Replays recorded netlink datagrams in place of a live NETLINK_ROUTE socket.
+    """
+
+    def __init__(self, messages, interval=0.0, poll_interval=0.05, delays=None):
+        """
+        Args:
+            messages (list): Raw datagrams (see build_link_message) replayed in order.
+            interval (float): Delay in seconds before each datagram is delivered.
+            poll_interval (float): Idle wait in seconds once the recording is exhausted.
+            delays (list): Per-datagram delays overriding `interval`, as recorded.
+        """
+        self.messages = list(messages)
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.delays = list(delays) if delays is not None else None
+
+    @classmethod
+    def from_cassette(cls, cassette, poll_interval=0.05):
+        """
+        Builds a source from the datagrams a RecordingLinkSource saved to the cassette,
+        delivered with the recorded spacing.
+        """
+        messages, delays = [], []
+        while True:
+            entry = cassette.capture(LINK_SOURCE_KEY, None, repeat=False)
+            if entry is None:
+                break
+            messages.append(bytes.fromhex(entry['datagram']))
+            delays.append(entry['delay'])
+        return cls(messages, poll_interval=poll_interval, delays=delays)
+
+    def recv(self):
+        if not self.messages:
+            time.sleep(self.poll_interval)
+            return None
+        delay = self.delays.pop(0) if self.delays else self.interval
+        if delay:
+            time.sleep(delay)
+        return self.messages.pop(0)
+
+    def close(self):
+        self.messages = []
+
+
+class LinkEventListener:
+    """
+    Background RTNETLINK subscriber that records carrier transitions as timestamped
+    LinkEvent tuples (CLOCK_MONOTONIC) the moment the kernel reports them.
+    """
+
+    def __init__(self, source=None):
+        """
+        Args:
+            source: Object with recv()/close(); defaults to a live NetlinkLinkSource.
+        """
+        self.source = source if source is not None else NetlinkLinkSource()
+        self.carrier_state = {}
+        self.link_events = []
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """
+        Starts the receive thread. Returns the listener for chaining.
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self._receive_loop, name="link-event-listener", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the receive thread and closes the event source.
+        """
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        self.source.close()
+
+    def _receive_loop(self):
+        while self.running:
+            try:
+                data = self.source.recv()
+            except OSError as e:
+                print(f"❌ Netlink receive failed: {e}")
+                break
+            if not data:
+                continue
+            now = time.monotonic()
+            with self.condition:
+                for index, interface, carrier in parse_link_messages(data):
+                    # RTM_NEWLINK fires for any attribute change; keep carrier transitions only
+                    if self.carrier_state.get(interface) == carrier:
+                        continue
+                    self.carrier_state[interface] = carrier
+                    self.link_events.append(LinkEvent(now, interface, carrier, index))
+                self.condition.notify_all()
+
+    def events(self, since=0.0, carrier=None):
+        """
+        Args:
+            since (float): Only return events at or after this monotonic timestamp.
+            carrier (bool): If set, only return transitions to this carrier state.
+
+        Returns:
+            list: LinkEvent tuples in arrival order.
+        """
+        with self.condition:
+            return [event for event in self.link_events
+                    if event.timestamp >= since and (carrier is None or event.carrier == carrier)]
+
+    def wait_for(self, predicate, timeout):
+        """
+        Blocks until predicate(events) is true or the timeout expires.
+
+        Args:
+            predicate (callable): Called with the full event list under the lock.
+            timeout (float): Maximum wait in seconds.
+
+        Returns:
+            bool: True if the predicate was satisfied.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: predicate(self.link_events), timeout=timeout)
+
+    def wait_for_carrier(self, interfaces, carrier, since, timeout):
+        """
+        Waits until every interface reported the given carrier state after `since`.
+
+        Returns:
+            bool: True if all interfaces transitioned before the timeout.
+        """
+        pending = set(interfaces)
+        return self.wait_for(
+            lambda events: pending <= {e.interface for e in events if e.timestamp >= since and e.carrier == carrier},
+            timeout)
+
 # --------------------------------------------------------------------------------------------------
 
 class InterfaceManager(CommonFuntion):
@@ -11,8 +295,9 @@ class InterfaceManager(CommonFuntion):
     Provides functionality to check interface status and bring DOWN interfaces UP.
     """
 
-    def __init__(self):
+    def __init__(self, sysfs_root="/sys"):
         self.interFaceDetails = []
+        self.sysfs_root = sysfs_root
 
 
     def interface_details(self,search=""):
@@ -67,18 +352,156 @@ class InterfaceManager(CommonFuntion):
             else:
                 print(f"❌ Failed to bring up interface {interface}")
 
-    def process_all_interfaces(self):
+    def process_all_interfaces(self, batched=True, up_timeout=2.0):
         """
         Checks all interfaces and brings any DOWN interfaces UP.
         Stores only UP interfaces in self.interFaceDetails.
+
+        Args:
+            batched (bool): Bring all DOWN interfaces up from one snapshot with a single
+                            `ip -batch` call and one admin-state wait; False keeps the
+                            per-interface path.
+            up_timeout (float): Maximum wait in seconds for the admin state in batched mode.
         """
         print("\n🔄 Processing all interfaces...")
-        for interface_det in self.interface_details():
-            self.bring_interface_up(interface_det)
+        if batched:
+            self.bring_interfaces_up(self.interface_details(), up_timeout)
+        else:
+            for interface_det in self.interface_details():
+                self.bring_interface_up(interface_det)
 
         self.interFaceDetails = [val for val in self.interface_details() if val['status'].upper() == "UP"]
         print(f"\n📋 Final UP Interfaces: {self.interFaceDetails}")
 
+    def bring_interfaces_up(self, snapshot, up_timeout=2.0):
+        """
+        Brings every DOWN interface of an `interface_details()` snapshot UP in one batch,
+        then waits for the whole set to be administratively up (IFF_UP).
+
+        Carrier is not waited for: an uncabled port never gets it and would hold the
+        whole batch for the full timeout. Ports without carrier are reported DOWN by
+        the next `ip -br a` and are not probed, as with the per-interface path.
+
+        Args:
+            snapshot (list): Dictionaries with 'name' and 'status' of each interface.
+            up_timeout (float): Maximum wait in seconds for IFF_UP to be set.
+
+        Returns:
+            list: Names of the interfaces that were brought up.
+        """
+        down = [det['name'] for det in snapshot if det['status'].lower() == "down"]
+        if not down:
+            return []
+
+        print(f"\n🔌 Bringing up {len(down)} DOWN interfaces: {down}")
+        if not self.set_links_state(down, "up"):
+            print(f"❌ Failed to bring up interfaces {down}")
+            return []
+
+        if self.wait_for_states(self.admin_states, down, True, up_timeout):
+            print(f"✅ All {len(down)} interfaces are administratively up")
+        else:
+            still_down = [name for name, up in self.admin_states(down).items() if not up]
+            print(f"⚠️ Still administratively down after {up_timeout}s: {still_down}")
+        return down
+
+    def set_links_state(self, interfaces, state):
+        """
+        Sets the administrative state of several interfaces with a single `ip -batch` call.
+
+        Args:
+            interfaces (list): Interface names.
+            state (str): "up" or "down".
+
+        Returns:
+            bool: True if the batch succeeded.
+        """
+        if not interfaces:
+            return True
+        with tempfile.NamedTemporaryFile("w", prefix="ip-batch-", suffix=".txt", delete=False) as batch:
+            batch.write("".join(f"link set dev {interface} {state}\n" for interface in interfaces))
+        try:
+            success, _ = self.run_command(["ip", "-force", "-batch", batch.name],
+                                          f"Setting {len(interfaces)} interfaces {state}")
+            return success
+        finally:
+            os.unlink(batch.name)
+            # run_command invalidates before the batch runs; a concurrent `ip -br a` may
+            # have cached the old state while it ran
+            self.command_cache.invalidate()
+
+    def carrier_states(self, interfaces):
+        """
+        Reads the carrier state of each interface from sysfs.
+
+        Args:
+            interfaces (list): Interface names.
+
+        Returns:
+            dict: Interface name to True/False, or None if the carrier cannot be read
+                  (e.g. the interface is administratively down).
+        """
+        def read():
+            states = {}
+            for interface in interfaces:
+                try:
+                    with open(os.path.join(self.sysfs_root, "class", "net", interface, "carrier")) as f:
+                        states[interface] = f.read().strip() == "1"
+                except OSError:
+                    states[interface] = None
+            return states
+
+        # Carrier changes during discovery, so every read is recorded rather than snapshotted
+        return self.cassette.capture(["#sysfs-carrier", *interfaces], read,
+                                     default=dict.fromkeys(interfaces))
+
+    def admin_states(self, interfaces):
+        """
+        Reads the administrative state (IFF_UP in the sysfs flags) of each interface.
+
+        Args:
+            interfaces (list): Interface names.
+
+        Returns:
+            dict: Interface name to True/False, or None if the flags cannot be read.
+        """
+        def read():
+            states = {}
+            for interface in interfaces:
+                try:
+                    with open(os.path.join(self.sysfs_root, "class", "net", interface, "flags")) as f:
+                        states[interface] = bool(int(f.read().strip(), 16) & IFF_UP)
+                except (OSError, ValueError):
+                    states[interface] = None
+            return states
+
+        return self.cassette.capture(["#sysfs-flags", *interfaces], read, default=dict.fromkeys(interfaces))
+
+    def wait_for_carrier_state(self, interfaces, carrier=True, timeout=10.0, poll_interval=0.05):
+        """
+        Polls sysfs until every interface reports the requested carrier state.
+
+        Returns:
+            bool: True if all interfaces reached the state before the timeout.
+        """
+        return self.wait_for_states(self.carrier_states, interfaces, carrier, timeout, poll_interval)
+
+    def wait_for_states(self, read_states, interfaces, expected, timeout, poll_interval=0.05):
+        """
+        Polls `read_states(interfaces)` until every interface reports the expected state.
+
+        Returns:
+            bool: True if all interfaces reached the state before the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            states = read_states(interfaces)
+            if all(bool(state) == expected for state in states.values()):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+
 
 
 # --------------------------------------------------------------------------------------------------
@@ -86,15 +509,57 @@ class InterfaceManager(CommonFuntion):
 class PairingManagerInfo(InterfaceManager):
     """
     Extends InterfaceManager to include PCI bus and device pairing information
-    for network interfaces using `lshw -c network -businfo`.
+    for network interfaces, read from sysfs (NicInventory) with `lshw -c network -businfo`
+    as a fallback.
     Also includes logic to extract NIC link events and pair interfaces based on activity.
     """
 
-    def __init__(self):
-        super().__init__()
+    # Strategies accepted by fetchingPairDetailsFromInterface()
+    PAIRING_MODES = ("sequential", "concurrent", "group", "lldp")
+
+    def __init__(self, pairing_mode="sequential", link_listener=None, sysfs_root=None, kmsg_path=None,
+                 ethtool=None):
+        """
+        Args:
+            pairing_mode (str): One of PAIRING_MODES.
+            link_listener (LinkEventListener): Injected listener; netlink (or the cassette) otherwise.
+            sysfs_root (str): sysfs tree to read; defaults to PAIRING_SYSFS_ROOT or /sys.
+            kmsg_path (str): Kernel log device; defaults to PAIRING_KMSG_PATH or /dev/kmsg.
+            ethtool (EthtoolIoctl): Injected ioctl layer; opened (through the cassette) otherwise.
+
+        With a command cassette recording, the sysfs inventory, ethtool ioctls, carrier
+        reads, kernel log reads and netlink events are saved next to the commands; when
+        replaying they are all served from it, so discovery never touches the host.
+        """
+        sysfs_root = sysfs_root or os.environ.get("PAIRING_SYSFS_ROOT", "/sys")
+        self.replay_sysfs = None
+        if self.cassette.mode != "off":
+            snapshot = self.cassette.capture(["#sysfs", "snapshot"], NicInventory(sysfs_root).snapshot)
+            if self.cassette.replaying and snapshot is not None:
+                self.replay_sysfs = tempfile.mkdtemp(prefix="dpdkCrafter-sysfs-")
+                sysfs_root = NicInventory.restore(snapshot, self.replay_sysfs)
+        super().__init__(sysfs_root)
+        # Only an ioctl socket opened here is closed by close(); a passed-in one belongs to the caller
+        self.owns_ethtool = ethtool is None
+        if ethtool is None:
+            try:
+                ethtool = EthtoolIoctl(CassetteEthtoolBackend(self.cassette) if self.cassette.mode != "off" else None)
+            except OSError as e:
+                print(f"⚠️ In-process ethtool unavailable, using the ethtool CLI: {e}")
+        self.ethtool = ethtool
+        self.inventory = NicInventory(sysfs_root, ethtool=ethtool)
+        self.nic_records = []
         self.bus_info = []
         self.pairingInterface = []
         self.mapped_bus_pairs = []
+        self.topology = TopologyGraph()
+        self.ambiguous_links = []
+        self.lldp_neighbors = {}
+        self.remote_peers = {}
+        self.pairing_mode = pairing_mode if pairing_mode in self.PAIRING_MODES else "sequential"
+        self.link_listener = link_listener
+        self.kmsg_path = kmsg_path or os.environ.get("PAIRING_KMSG_PATH", "/dev/kmsg")
+        self.kmsg_reader = None
 
         # Fetch bus info on initialization
         try:
@@ -105,12 +570,20 @@ class PairingManagerInfo(InterfaceManager):
     def busInfo(self):
         """
         Fetches and parses PCI bus info for network interfaces.
+        Reads sysfs first and only shells out to `lshw` if sysfs reports nothing.
 
         Returns:
             list: List of dictionaries with 'bus', 'device', 'description'.
         """
         print("\n🔍 Fetching PCI Bus Info...\n")
         try:
+            self.nic_records = self.inventory.collect()
+            if self.nic_records:
+                self.bus_info = [{key: record[key] for key in ('bus', 'device', 'description')}
+                                 for record in self.nic_records]
+                print(f"🧾 Bus Info (sysfs):\n{self.inventory.format_table(self.nic_records)}\n")
+                return self.bus_info
+
             success, output = self.run_command(['lshw', '-c', 'network', '-businfo'], "Fetching Bus Info", check_output=True)
             if not success:
                 return []
@@ -131,6 +604,7 @@ class PairingManagerInfo(InterfaceManager):
 
             self.bus_info = parsed_info
             print(f"🧾 Bus Info Parsed:\n{self.bus_info}\n")
+            return self.bus_info
         except Exception as e:
             print(f"❌ Error parsing bus info: {e}")
 
@@ -169,6 +643,7 @@ class PairingManagerInfo(InterfaceManager):
         """
         Creates non-repeating interface pairs from the input list.
         Only adds a pair if it doesn't already exist in either order.
+        Kept for callers of the list-based API; pairing itself goes through TopologyGraph.
 
         Args:
             interface_list (list): List of interface names.
@@ -179,32 +654,558 @@ class PairingManagerInfo(InterfaceManager):
         """
         try:
             updated_pairs = existing_pairs.copy()
+            seen = {frozenset(pair) for pair in updated_pairs}
             for i in range(0, len(interface_list) - 1, 2):
-                pair = [interface_list[i], interface_list[i + 1]]
-                reverse_pair = [interface_list[i + 1], interface_list[i]]
-                if pair not in updated_pairs and reverse_pair not in updated_pairs:
-                    updated_pairs.append(pair)
+                key = frozenset((interface_list[i], interface_list[i + 1]))
+                if key not in seen:
+                    seen.add(key)
+                    updated_pairs.append([interface_list[i], interface_list[i + 1]])
             return updated_pairs
         except Exception as e:
             print(f"❌ Error updating interface pairs: {e}")
             return existing_pairs
 
+    def extract_link_events(self, log_data):
+        """
+        Extracts timestamped NIC link-down events from dmesg output.
+
+        Args:
+            log_data (str): dmesg output with the default "[seconds.micro]" prefix.
+
+        Returns:
+            list: (timestamp, interface) tuples sorted by timestamp.
+        """
+        try:
+            pattern = r'^\[\s*(\d+\.\d+)\].*?\b(\w+): NIC Link is Down\b'
+            return sorted((float(ts), name) for ts, name in re.findall(pattern, log_data, re.MULTILINE))
+        except Exception as e:
+            print(f"❌ Error extracting link events: {e}")
+            return []
+
+    def open_kernel_log(self):
+        """
+        Opens a shared non-destructive /dev/kmsg reader.
+
+        Returns:
+            KmsgReader: Reader positioned at the end of the log, or None to fall back to `dmesg -c`.
+        """
+        if self.kmsg_reader is None:
+            try:
+                if self.cassette.replaying:
+                    if not self.cassette.capture(["#kmsg", "open"], None, default=False):
+                        raise OSError("the recording fell back to dmesg -c")
+                    self.kmsg_reader = CassetteKmsgReader(self.cassette)
+                else:
+                    reader = KmsgReader(self.kmsg_path)
+                    self.cassette.capture(["#kmsg", "open"], lambda: True)
+                    self.kmsg_reader = CassetteKmsgReader(self.cassette, reader) if self.cassette.recording else reader
+            except OSError as e:
+                print(f"⚠️ {self.kmsg_path} unavailable, falling back to dmesg -c: {e}")
+        return self.kmsg_reader
+
+    def close_kernel_log(self):
+        if self.kmsg_reader is not None:
+            self.kmsg_reader.close()
+            self.kmsg_reader = None
+
+    def close(self):
+        """
+        Releases the kernel log reader, the ethtool ioctl socket opened by this object and
+        the sysfs tree restored for replay.
+        """
+        self.close_kernel_log()
+        if self.owns_ethtool and self.ethtool is not None:
+            self.ethtool.close()
+            self.ethtool = None
+            self.inventory.ethtool = None
+        if self.replay_sysfs is not None:
+            shutil.rmtree(self.replay_sysfs, ignore_errors=True)
+            self.replay_sysfs = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def kernel_log_cursor(self):
+        """
+        Marks the current end of the kernel log.
+
+        Returns:
+            int: kmsg sequence cursor, or None when falling back to clearing with `dmesg -c`.
+        """
+        if self.kmsg_reader is not None:
+            return self.kmsg_reader.cursor()
+        self.run_command(["dmesg", "-c"], "Clearing dmesg buffer")
+        return None
+
+    def kernel_log_since(self, cursor):
+        """
+        Returns:
+            str: Kernel log records written after `cursor`, in dmesg format.
+        """
+        if self.kmsg_reader is not None:
+            return self.kmsg_reader.text_since(cursor)
+        success, output = self.run_command(["dmesg", "-c"], "Reading dmesg buffer", check_output=True)
+        return output if success else ""
+
+    def kernel_clock_offset(self):
+        """
+        Estimates the offset between the kernel log clock and CLOCK_MONOTONIC by
+        writing a marker record to kmsg_path and reading back its timestamp.
+
+        The measurement is recorded to the command cassette together with the monotonic
+        time it was taken at; on replay the offset is shifted by how much later the
+        replay reached this point, so recorded kernel timestamps line up with its resets.
+
+        Returns:
+            float: Seconds to add to a monotonic time to get a dmesg timestamp (0.0 if unknown).
+        """
+        measured = self.cassette.capture(
+            ["#kmsg", "clock-offset"],
+            lambda: {'offset': self.measure_kernel_clock_offset(), 'monotonic': time.monotonic()})
+        if measured is None:
+            return 0.0
+        if self.cassette.replaying:
+            return measured['offset'] + measured['monotonic'] - time.monotonic()
+        return measured['offset']
+
+    def measure_kernel_clock_offset(self):
+        """
+        Returns:
+            float: Offset measured against the live kernel log (0.0 if unknown).
+        """
+        marker = f"dpdkCrafter-clock-{time.monotonic_ns()}"
+        # Read the live log directly so the calibration does not end up in a recording
+        reader = self.kmsg_reader.reader if isinstance(self.kmsg_reader, CassetteKmsgReader) else self.kmsg_reader
+        try:
+            cursor = reader.cursor() if reader is not None else None
+            before = time.monotonic()
+            with open(self.kmsg_path, "w") as kmsg:
+                kmsg.write(marker + "\n")
+            after = time.monotonic()
+            if reader is not None:
+                success, output = True, reader.text_since(cursor)
+            else:
+                success, output = self.run_command(["dmesg"], "Reading kernel clock marker", check_output=True)
+            if success:
+                match = re.search(r'^\[\s*(\d+\.\d+)\].*' + re.escape(marker), output, re.MULTILINE)
+                if match:
+                    return float(match.group(1)) - (before + after) / 2
+        except Exception as e:
+            print(f"⚠️ Kernel clock calibration unavailable, assuming no offset: {e}")
+        return 0.0
+
+    def attribute_link_events(self, resets, events, latency=3.0, pair_window=0.1):
+        """
+        Attributes link-down events to the reset that caused them.
+
+        Each reset is anchored on the first link-down event of the reset interface itself
+        within `latency` seconds of the reset (renegotiation can be slow). Both ends of a
+        cable drop together, so the peer is the event closest to that anchor within
+        `pair_window`. Matching is global and closest-first, and every event is used at
+        most once, so resets whose events overlap in time do not steal each other's peers.
+
+        Args:
+            resets (list): (timestamp, interface) tuples in the order resets were issued.
+            events (list): (timestamp, interface) link-down tuples sorted by timestamp.
+            latency (float): Maximum delay in seconds between a reset and its own link-down.
+            pair_window (float): Maximum distance in seconds between the two ends of a cable.
+
+        Returns:
+            list: [source, peer] links in reset order.
+        """
+        anchors, used = {}, set()
+        for idx, (reset_ts, source) in enumerate(resets):
+            anchor = next((event for event, (ts, name) in enumerate(events)
+                           if event not in used and name == source
+                           and reset_ts - pair_window <= ts <= reset_ts + latency), None)
+            if anchor is not None:
+                anchors[idx] = anchor
+                used.add(anchor)
+
+        candidates = sorted((abs(events[event][0] - events[anchor][0]), idx, event)
+                            for idx, anchor in anchors.items()
+                            for event, (ts, name) in enumerate(events)
+                            if event != anchor and name != resets[idx][1]
+                            and abs(ts - events[anchor][0]) <= pair_window)
+        peers, claimed = {}, set()
+        for _, idx, event in candidates:
+            if idx not in peers and event not in claimed:
+                peers[idx] = event
+                claimed.add(event)
+        return [[resets[idx][1], events[peers[idx]][1]] for idx in sorted(peers)]
+
+    def reset_waves(self, interfaces, wave_size):
+        """
+        Splits interfaces into interleaved reset waves (wave w = interfaces[w::count]), so
+        neighbouring ports, which are often cabled to each other, land in different waves.
+
+        Returns:
+            list: Lists of interface names, at least two waves when there are two ports.
+        """
+        if not interfaces:
+            return []
+        count = min(len(interfaces), max(2, math.ceil(len(interfaces) / wave_size)))
+        return [interfaces[wave::count] for wave in range(count)]
+
+    def resolve_topology(self, graph):
+        """
+        Resolves a TopologyGraph into pairingInterface and reports links it refused to guess.
+
+        Args:
+            graph (TopologyGraph): Graph filled by one of the pairing strategies.
+
+        Returns:
+            list: Interface pairs in first-observation order.
+        """
+        self.topology = graph
+        result = graph.resolve()
+        self.pairingInterface = result['pairs']
+        self.ambiguous_links = result['ambiguous']
+
+        print("\n🔗 Final Interface Pairings:")
+        for pair in self.pairingInterface:
+            print(f"  ✅ {pair[0]} ↔ {pair[1]}")
+        for ports in result['multi_peer']:
+            print(f"  ⚠️ Multi-peer / switch-connected ports (not paired): {ports}")
+        for source, peer, evidence in result['ambiguous']:
+            print(f"  ⚠️ Ambiguous link ignored: {source} ↔ {peer} (evidence {evidence})")
+        return self.pairingInterface
+
+    def reset_link(self, interface):
+        """
+        Restarts autonegotiation on an interface (ETHTOOL_NWAY_RST), forking
+        `ethtool -r` only when the ioctl is unavailable.
+
+        Returns:
+            bool: True if the reset was issued.
+        """
+        try:
+            if self.ethtool is not None:
+                try:
+                    return self.ethtool.nway_reset(interface)
+                except OSError as e:
+                    print(f"⚠️ nway reset ioctl failed on {interface}, retrying with ethtool -r: {e}")
+            success, _ = self.run_command(["ethtool", "-r", interface], f"Resetting {interface}")
+            return success
+        finally:
+            # The ioctl bypasses run_command, so cached link state is dropped here
+            self.command_cache.invalidate()
+
+    def start_link_listener(self):
+        """
+        Starts the RTNETLINK link-event listener unless one was injected.
+
+        Returns:
+            LinkEventListener: Running listener, or None to fall back to dmesg scraping.
+        """
+        if self.link_listener is None:
+            try:
+                self.link_listener = LinkEventListener(self.link_source())
+            except (OSError, AttributeError) as e:
+                print(f"⚠️ Netlink link events unavailable, falling back to dmesg: {e}")
+                return None
+        if not self.link_listener.running:
+            self.link_listener.start()
+        return self.link_listener
+
+    def link_source(self):
+        """
+        Returns:
+            Link event source: the live netlink socket, wrapped to record its datagrams when
+            the cassette is recording, or the recorded datagrams when it is replaying.
+        """
+        if self.cassette.replaying:
+            return ReplayLinkSource.from_cassette(self.cassette)
+        source = NetlinkLinkSource()
+        return RecordingLinkSource(source, self.cassette) if self.cassette.recording else source
+
+    def stop_link_listener(self):
+        if self.link_listener is not None:
+            self.link_listener.stop()
+            self.link_listener = None
+
     def fetchingPairDetailsFromInterface(self):
         """
-        Processes all UP interfaces and attempts to fetch pairing details using `ethtool` and `dmesg`.
+        Runs the pairing strategy selected by `pairing_mode` and updates pairingInterface.
+        Link events come from netlink when available and from dmesg otherwise.
+        """
+        listener = self.start_link_listener()
+        if listener is None:
+            self.open_kernel_log()
+        try:
+            if self.pairing_mode == "concurrent":
+                return self.fetchingPairDetailsConcurrently(listener=listener)
+            if self.pairing_mode == "group":
+                return self.fetchingPairDetailsByGroupTesting()
+            if self.pairing_mode == "lldp":
+                return self.fetchingPairDetailsByLldp()
+            return self.fetchingPairDetailsSequentially(listener=listener)
+        finally:
+            self.stop_link_listener()
+            self.close_kernel_log()
+
+    def fetchingPairDetailsConcurrently(self, wave_size=8, wave_gap=0.25, latency=3.0, pair_window=0.1,
+                                        listener=None):
+        """
+        Resets all UP interfaces in overlapping waves and pairs them from one batch of link events.
+
+        Each wave resets up to `wave_size` ports at once from a thread pool; the next wave
+        follows `wave_gap` seconds later without waiting for earlier links to come back.
+        Link-down events are attributed to their reset by attribute_link_events(), so
+        wall time is about len(waves) * wave_gap + latency instead of N * (fork + 2s sleep).
+
+        Args:
+            wave_size (int): Ports reset together in one wave.
+            wave_gap (float): Delay in seconds between the start of consecutive waves.
+            latency (float): Maximum time in seconds for a reset port to report link-down.
+            pair_window (float): Maximum distance in seconds between the two ends of a cable.
+            listener (LinkEventListener): Netlink event source; dmesg is read if None.
+        """
+        try:
+            interfaces = [details['name'] for details in self.interFaceDetails]
+            waves = self.reset_waves(interfaces, wave_size)
+
+            if listener is None:
+                cursor = self.kernel_log_cursor()
+                offset = self.kernel_clock_offset()
+            else:
+                offset = 0.0
+
+            def timed_reset(interface):
+                issued = time.monotonic() + offset
+                return issued, self.reset_link(interface)
+
+            print(f"🌊 Resetting {len(interfaces)} interfaces in {len(waves)} waves every {wave_gap}s...\n")
+            futures = []
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=max(1, min(len(interfaces), 16))) as pool:
+                for idx, wave in enumerate(waves):
+                    delay = start + idx * wave_gap - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    futures.extend((interface, pool.submit(timed_reset, interface)) for interface in wave)
+
+            resets = []
+            for interface, future in futures:
+                try:
+                    issued, success = future.result()
+                except Exception as e:
+                    issued, success = None, False
+                    print(f"❌ Error resetting {interface}: {e}")
+                if success:
+                    resets.append((issued, interface))
+                else:
+                    print(f"⚠️ Reset of {interface} failed, it is not probed.")
+            resets.sort()
+            probed = [interface for _, interface in resets]
+
+            if listener is None:
+                print(f"😴 Sleeping for {latency} seconds to let link events settle...\n")
+                time.sleep(latency)
+                events = self.extract_link_events(self.kernel_log_since(cursor))
+            else:
+                print(f"⏳ Waiting up to {latency} seconds for link-down events...\n")
+                listener.wait_for_carrier(probed, False, start, latency)
+                time.sleep(pair_window)  # let trailing peer events arrive
+                events = [(e.timestamp, e.interface) for e in listener.events(since=start, carrier=False)]
+            graph = TopologyGraph()
+            for interface in interfaces:
+                graph.add_node(interface)
+            for source, peer in self.attribute_link_events(resets, events, latency, pair_window):
+                graph.add_link(source, peer)
+            self.resolve_topology(graph)
+        except Exception as e:
+            print(f"❌ Error in fetchingPairDetailsConcurrently: {e}")
+
+    def group_test_rounds(self, interfaces):
+        """
+        Builds the bit-coded toggle schedule for group-testing pairing.
+
+        Interface i carries code i. For every bit b there are two rounds: one toggles
+        the interfaces whose bit b is 1, the other the complement, so every interface
+        is left untouched in exactly one round per bit and can observe its peer's bit.
+
+        Args:
+            interfaces (list): Interface names; list position is the code.
+
+        Returns:
+            list: (bit, complement, toggled_interfaces) tuples, 2 * ceil(log2 N) in total.
+        """
+        bits = max(1, math.ceil(math.log2(len(interfaces)))) if interfaces else 0
+        return [(bit, complement, [name for idx, name in enumerate(interfaces) if ((idx >> bit) & 1) ^ complement])
+                for bit in range(bits) for complement in (0, 1)]
+
+    def decode_group_test(self, interfaces, observations):
+        """
+        Decodes each interface's peer from the carrier losses seen in every round.
+
+        An untouched interface loses carrier exactly when its peer was toggled, which
+        gives one bit of the peer's code per round. A decoded code that equals the
+        interface's own code means no peer in the set; only mutually consistent
+        decodes are paired.
+
+        Args:
+            interfaces (list): Interface names; list position is the code.
+            observations (list): (bit, complement, lost_set) tuples per round.
+
+        Returns:
+            tuple: (links, ambiguous) where links are mutually consistent [interface, peer]
+                   decodes and ambiguous lists interfaces whose decode was not.
+        """
+        peer_codes = [0] * len(interfaces)
+        for bit, complement, lost in observations:
+            for idx, name in enumerate(interfaces):
+                if ((idx >> bit) & 1) ^ complement:
+                    continue  # toggled this round, nothing to observe
+                peer_bit = complement ^ 1 if name in lost else complement
+                peer_codes[idx] |= peer_bit << bit
+
+        links, ambiguous = [], []
+        for idx, name in enumerate(interfaces):
+            peer = peer_codes[idx]
+            if peer == idx:
+                continue  # never lost carrier: no peer among the probed interfaces
+            if peer < len(interfaces) and peer_codes[peer] == idx:
+                links.append([name, interfaces[peer]])
+            else:
+                ambiguous.append(name)
+        return links, ambiguous
+
+    def fetchingPairDetailsByGroupTesting(self, settle=0.5, link_timeout=10.0):
+        """
+        Pairs interfaces in 2 * ceil(log2 N) rounds instead of N probes.
+
+        Each round administratively downs one bit-coded subset in a single `ip -batch`
+        call, records which untouched interfaces lost carrier, then restores the subset
+        and waits for carrier to return before the next round.
+
+        Args:
+            settle (float): Time in seconds for peers to notice the carrier loss.
+            link_timeout (float): Maximum wait in seconds for links to come back up.
+        """
+        try:
+            candidates = [details['name'] for details in self.interFaceDetails]
+            interfaces = [name for name, carrier in self.carrier_states(candidates).items() if carrier]
+            rounds = self.group_test_rounds(interfaces)
+            print(f"🧮 Group testing {len(interfaces)} interfaces in {len(rounds)} rounds...\n")
+
+            observations = []
+            for bit, complement, toggled in rounds:
+                self.set_links_state(toggled, "down")
+                time.sleep(settle)
+                untouched = [name for name in interfaces if name not in toggled]
+                lost = {name for name, carrier in self.carrier_states(untouched).items() if not carrier}
+                observations.append((bit, complement, lost))
+                print(f"   🔁 Round bit={bit} complement={complement}: {len(toggled)} toggled, lost carrier: {sorted(lost)}")
+
+                self.set_links_state(toggled, "up")
+                if not self.wait_for_carrier_state(interfaces, True, link_timeout):
+                    print("⚠️ Some links did not recover before the timeout.")
+
+            links, ambiguous = self.decode_group_test(interfaces, observations)
+            if ambiguous:
+                print(f"⚠️ Inconsistent group-test decode (not paired): {ambiguous}")
+
+            graph = TopologyGraph()
+            for interface in interfaces:
+                graph.add_node(interface)
+            for interface, peer in links:
+                graph.add_link(interface, peer)
+            self.resolve_topology(graph)
+        except Exception as e:
+            print(f"❌ Error in fetchingPairDetailsByGroupTesting: {e}")
+
+    def fetchingPairDetailsByLldp(self, timeout=5.0, announce=True):
+        """
+        Pairs interfaces passively from LLDP neighbor information, without resetting links.
+
+        Neighbors already learned by lldpad are read first (all ports concurrently);
+        ports still unknown are captured from raw LLDP frames on AF_PACKET sockets.
+        Ports whose neighbor is on another host are kept in remote_peers.
+
+        Args:
+            timeout (float): Maximum wait in seconds for raw LLDP frames.
+            announce (bool): Send one LLDPDU per port so local peers answer immediately.
+        """
+        try:
+            interfaces = [details['name'] for details in self.interFaceDetails]
+            collector = LldpNeighborCollector(self.sysfs_root)
+
+            neighbors = collector.query_lldptool(interfaces)
+            missing = [interface for interface in interfaces if interface not in neighbors]
+            if missing:
+                print(f"📡 Capturing LLDP frames on {len(missing)} interfaces for up to {timeout}s...\n")
+                try:
+                    neighbors.update(collector.capture(missing, timeout, announce))
+                except OSError as e:
+                    print(f"⚠️ Raw LLDP capture unavailable: {e}")
+
+            links, self.remote_peers = collector.map_peers(neighbors, interfaces)
+            self.lldp_neighbors = neighbors
+            for interface, peer in self.remote_peers.items():
+                print(f"  🌐 {interface} → {peer['system_name'] or peer['chassis_id']} port {peer['port_id']}")
+
+            graph = TopologyGraph()
+            for interface in interfaces:
+                graph.add_node(interface)
+            for interface, peer in links:
+                graph.add_link(interface, peer)
+            self.resolve_topology(graph)
+        except Exception as e:
+            print(f"❌ Error in fetchingPairDetailsByLldp: {e}")
+
+    def fetchingPairDetailsSequentially(self, timeout=2.0, listener=None):
+        """
+        Resets one UP interface at a time and pairs it with the other interface that lost
+        carrier. With a netlink listener each probe returns as soon as both link-down
+        events arrive; otherwise it falls back to the dmesg scraping probe.
+
+        Args:
+            timeout (float): Maximum wait in seconds for the link events of one probe.
+            listener (LinkEventListener): Netlink event source; dmesg is used if None.
+        """
+        if listener is None:
+            return self.fetchingPairDetailsFromDmesg()
+        try:
+            graph = TopologyGraph()
+            for details in self.interFaceDetails:
+                try:
+                    interface = details['name']
+                    print(f"🔍 Processing Interface: {interface} | Status: {details['status']}")
+
+                    def probe_complete(events):
+                        # Done once the reset interface and at least one peer lost carrier
+                        downs = {e.interface for e in events if e.timestamp >= since and not e.carrier}
+                        return interface in downs and len(downs) > 1
+
+                    since = time.monotonic()
+                    self.reset_link(interface)
+                    listener.wait_for(probe_complete, timeout)
+
+                    graph.add_observation(interface, [e.interface for e in listener.events(since=since, carrier=False)])
+                except Exception as e:
+                    print(f"❌ Error processing interface {details.get('name', 'unknown')}: {e}")
+
+            self.resolve_topology(graph)
+        except Exception as e:
+            print(f"❌ Error in fetchingPairDetailsSequentially: {e}")
+
+    def fetchingPairDetailsFromDmesg(self):
+        """
+        Processes all UP interfaces and attempts to fetch pairing details using `ethtool` and
+        the kernel log (read incrementally from /dev/kmsg, or `dmesg -c` as a fallback).
         Extracts interface names from NIC link messages and avoids redundant processing.
         Updates the pairingInterface list with interfaces that show link activity.
         """
         try:
-            print("\n🧹 Clearing dmesg buffer before starting...\n")
-            self.run_command(["dmesg", "-c"], "Clearing dmesg buffer")
-            self.run_command(["dmesg", "-c"], "Clearing again for safety")
-
             print("😴 Sleeping for 3 seconds before starting NIC link checks...\n")
             time.sleep(3)
             print("✅ Awake and starting interface pairing check!\n")
 
-            pairingInterface = []
+            graph = TopologyGraph()
             interFaceDetails = self.interFaceDetails
 
             for details in interFaceDetails:
@@ -214,36 +1215,101 @@ class PairingManagerInfo(InterfaceManager):
 
                     print(f"🔍 Processing Interface: {interface} | Status: {status}")
 
-                    self.run_command(["ethtool", "-r", interface], f"Resetting {interface}")
-                    success, output = self.run_command(["dmesg", "-c"], f"Checking NIC link for {interface}", check_output=True)
-
-                    if success:
-                        interface_pair = self.extract_interface_names(output)
-                        pairingInterface = self.update_interface_pairs(interface_pair, pairingInterface)
+                    cursor = self.kernel_log_cursor()
+                    self.reset_link(interface)
 
-                    print("😴 Sleeping for 2 seconds before next interface...\n")
+                    print("😴 Sleeping for 2 seconds to collect NIC link messages...\n")
                     time.sleep(2)
+
+                    # Evidence is anchored on the reset port: every other port with link messages
+                    # in this probe counts towards it, and resolve() reports what stays ambiguous
+                    observed = self.extract_interface_names(self.kernel_log_since(cursor))
+                    graph.add_observation(interface, observed)
                     print("✅ Continuing to next interface...\n")
-                    print("🧹 Clearing dmesg buffer...\n")
                 except Exception as e:
                     print(f"❌ Error processing interface {details.get('name', 'unknown')}: {e}")
 
-            # Final cleanup
-            self.run_command(["dmesg", "-c"], "Clearing dmesg buffer after")
-            self.run_command(["dmesg", "-c"], "Final clear")
-
-            print("😴 Sleeping for 2 seconds before final output...\n")
-            time.sleep(2)
             print("✅ Final pairing complete!\n")
 
-            print("\n🔗 Final Interface Pairings:")
-            self.pairingInterface = pairingInterface
-            for pair in pairingInterface:
-                print(f"  ✅ {pair[0]} ↔ {pair[1]}")
+            self.resolve_topology(graph)
         except Exception as e:
-            print(f"❌ Error in fetchingPairDetailsFromInterface: {e}")
+            print(f"❌ Error in fetchingPairDetailsFromDmesg: {e}")
 
 
+    def firmware_versions(self):
+        """
+        Adds 'firmware_version' to every inventory record, read in bulk through the
+        ethtool ioctl layer and from `ethtool -i` only for ports it could not read.
+
+        Returns:
+            dict: Interface name to firmware version string.
+        """
+        versions = {}
+        if self.ethtool is not None:
+            details = self.ethtool.collect([record['device'] for record in self.nic_records])
+            for record in self.nic_records:
+                if details.get(record['device'], {}).get('driver'):
+                    record['firmware_version'] = versions[record['device']] = details[record['device']]['firmware_version']
+        pending = [record for record in self.nic_records if record['device'] not in versions]
+        results = self.run_commands_concurrently([
+            {'command': ["ethtool", "-i", record['device']], 'check_output': True, 'timeout': 10,
+             'description': f"Reading firmware version of {record['device']}"}
+            for record in pending
+        ]) if pending else []
+        for record, (success, output) in zip(pending, results):
+            match = re.search(r'^firmware-version:\s*(.*)$', output, re.MULTILINE) if success else None
+            record['firmware_version'] = versions[record['device']] = match.group(1).strip() if match else ""
+        return versions
+
+    def hardware_fingerprint(self, cache):
+        """
+        Returns:
+            str: Fingerprint of the NIC inventory (BDFs, MACs, driver and firmware versions).
+        """
+        if any('firmware_version' not in record for record in self.nic_records):
+            self.firmware_versions()
+        return cache.fingerprint(self.nic_records)
+
+    def loadCachedTopology(self, cache):
+        """
+        Reuses a cached topology if the hardware fingerprint matches and every cached
+        interface still has carrier; no link is reset.
+
+        Args:
+            cache (TopologyCache): Topology cache to read.
+
+        Returns:
+            dict: mapInterfaceToBus() result, or None if discovery has to run.
+        """
+        try:
+            if not self.nic_records:
+                return None
+            topology = cache.load(self.hardware_fingerprint(cache))
+            if not topology:
+                return None
+
+            pairs = topology.get("interface_connection", [])
+            cached_interfaces = [interface for pair in pairs for interface in pair]
+            states = self.carrier_states(cached_interfaces)
+            down = [interface for interface, carrier in states.items() if not carrier]
+            if down:
+                print(f"♻️ Cached topology rejected, no carrier on: {down}")
+                return None
+
+            print(f"⚡ Reusing cached topology ({len(pairs)} pairs), skipping link-flap discovery.")
+            self.pairingInterface = [list(pair) for pair in pairs]
+            return self.mapInterfaceToBus()
+        except Exception as e:
+            print(f"❌ Error loading cached topology: {e}")
+            return None
+
+    def saveTopology(self, cache, topology):
+        """
+        Stores a freshly discovered mapInterfaceToBus() result under the current fingerprint.
+        """
+        if self.nic_records and topology.get("interface_connection"):
+            cache.save(self.hardware_fingerprint(cache), topology)
+
     def mapInterfaceToBus(self):
         """
         Maps each interface pair to their corresponding PCI bus addresses using bus_info.
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+from collections import deque
+from script_container.execution.tracing import redact_argv, redact_credentials
+
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CommandCassette:
+    """
+    Record/replay store for command results.
+
+    In "record" mode every command run through CommonFuntion is executed normally
+    and its argv, output, exit code and duration are appended to a JSONL cassette.
+    URL credentials are redacted before anything is written (cassettes are shared as
+    CI fixtures), and replay matches on the redacted argv.
+    In "replay" mode nothing is executed: results are served from the cassette in
+    the order they were recorded, optionally sleeping for (a fraction of) the
+    recorded duration so timings stay realistic.
+    """
+
+    def __init__(self, path=None, mode="off", latency=0.0):
+        """
+        Args:
+            path (str): JSONL cassette file.
+            mode (str): "off", "record" or "replay".
+            latency (float): Replay only; multiplier applied to each recorded duration
+                             (0 = instant, 1 = real time).
+        """
+        self.path = path
+        self.mode = mode if (path and mode in CASSETTE_MODES) else "off"
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.file = None
+        self.tapes = {}
+        self.misses = []
+        if self.mode == "replay":
+            self.load()
+
+    @classmethod
+    def from_environment(cls):
+        """
+        Builds the cassette from COMMAND_CASSETTE, COMMAND_CASSETTE_MODE and
+        COMMAND_CASSETTE_LATENCY.
+        """
+        return cls(
+            path=os.environ.get("COMMAND_CASSETTE") or None,
+            mode=os.environ.get("COMMAND_CASSETTE_MODE", "off").lower(),
+            latency=float(os.environ.get("COMMAND_CASSETTE_LATENCY", "0") or 0),
+        )
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(command, check_output):
+        return json.dumps([redact_argv(command), bool(check_output)])
+
+    def load(self):
+        """
+        Loads the cassette into one FIFO tape per (argv, check_output).
+        """
+        self.tapes = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.tapes.setdefault(self.key(entry['argv'], entry['check_output']), deque()).append(entry)
+        except OSError as e:
+            print(f"❌ Error loading command cassette {self.path}: {e}")
+
+    def record(self, command, check_output, success, output, exit_code, duration):
+        """
+        Appends one result to the cassette; the file is truncated on the first write.
+        """
+        entry = {
+            'argv': redact_argv(command),
+            'check_output': bool(check_output),
+            'success': success,
+            'output': redact_credentials(output),
+            'exit_code': exit_code,
+            'duration': round(duration, 6),
+        }
+        with self.lock:
+            if self.file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self.file = open(self.path, "w", buffering=1)
+            self.file.write(json.dumps(entry) + "\n")
+
+    def replay(self, command, check_output, repeat=True):
+        """
+        Returns the next recorded result for the command. The last recording of a
+        command is repeated once its tape runs out.
+
+        Args:
+            repeat (bool): If False, an exhausted tape returns None instead of repeating
+                           (for streams such as kernel log reads and netlink datagrams).
+
+        Returns:
+            dict: Recorded entry, or None if the command was never recorded.
+        """
+        with self.lock:
+            tape = self.tapes.get(self.key(command, check_output))
+            if not tape:
+                if repeat or tape is None:
+                    self.misses.append(redact_argv(command))
+                return None
+            entry = tape.popleft() if (len(tape) > 1 or not repeat) else tape[0]
+        if self.latency > 0:
+            time.sleep(entry['duration'] * self.latency)
+        return entry
+
+    def capture(self, key, read, default=None, repeat=True):
+        """
+        Reads host state that does not come from a command (sysfs, ioctls, kernel log,
+        netlink) through the cassette: recorded as a JSON value under a pseudo-argv
+        starting with "#" when recording, served from it when replaying.
+
+        Args:
+            key (list): Pseudo-argv naming the read, e.g. ["#sysfs-carrier", "ens1f0"].
+            read (callable): Performs the real read; its result must be JSON serialisable.
+            default: Replay only; value returned when the read was never recorded.
+            repeat (bool): Replay only; see replay().
+
+        Returns:
+            The value read, or the recorded one.
+        """
+        if self.replaying:
+            entry = self.replay(key, True, repeat=repeat)
+            return json.loads(entry['output']) if entry else default
+        value = read()
+        if self.recording:
+            self.record(key, True, True, json.dumps(value), 0, 0.0)
+        return value
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+# Persistent state main() reuses between runs; the benchmark points each at a fresh directory
+BENCHMARK_STATE_PATHS = {
+    'STEP_JOURNAL_PATH': "steps.json",
+    'TOPOLOGY_CACHE_PATH': "topology.json",
+    'GIT_MIRROR_PATH': "git",
+    'SNAPSHOT_PATH': "snapshots",
+    'EXTRACTION_CACHE_PATH': "extracted",
+    'DRIVER_CACHE_PATH': "drivers",
+}
+
+
+def benchmark_replay(cassette_path, runs=5, latency=0.0):
+    """
+    Runs mainExecutionScript.main() end-to-end against a recorded cassette and times it.
+
+    Each run gets an empty step journal, topology cache and git / snapshot / extraction /
+    driver caches in a temporary directory, so every run replays the whole pipeline
+    instead of skipping the steps the previous run completed.
+
+    Args:
+        cassette_path (str): Cassette recorded with COMMAND_CASSETTE_MODE=record.
+        runs (int): Number of timed runs.
+        latency (float): Replay latency multiplier.
+
+    Returns:
+        dict: Per-run wall times in seconds and commands missing from the cassette.
+    """
+    from script_container.execution.constant import CommonFuntion
+    from mainExecutionScript import main
+
+    cassette_path = os.path.abspath(cassette_path)
+    saved_env = {name: os.environ.get(name) for name in BENCHMARK_STATE_PATHS}
+    cwd = os.getcwd()
+    timings, misses = [], []
+    try:
+        for _ in range(runs):
+            state_dir = tempfile.mkdtemp(prefix="dpdkCrafter-bench-")
+            os.environ.update({name: os.path.join(state_dir, path) for name, path in BENCHMARK_STATE_PATHS.items()})
+            CommonFuntion.cassette = CommandCassette(cassette_path, "replay", latency)
+            CommonFuntion.command_cache.invalidate()
+            try:
+                start = time.perf_counter()
+                main()
+                timings.append(time.perf_counter() - start)
+            finally:
+                os.chdir(cwd)
+                shutil.rmtree(state_dir, ignore_errors=True)
+            misses = CommonFuntion.cassette.misses
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return {'runs': timings, 'best': min(timings), 'misses': misses}
+
+
+if __name__ == "__main__":
+    # python -m script_container.execution.cassette <cassette.jsonl> [runs] [latency]
+    result = benchmark_replay(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+                              float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,176 @@
+import os
+import signal
+import asyncio
+import subprocess
+from script_container.execution.tracing import TRACER, redact_argv
+
+
+# asyncio StreamReader limit for streamed output; longer lines are read in chunks
+STREAM_LIMIT = 65536
+
+
+class AsyncCommandExecutor:
+    """
+    Runs many commands at once under a concurrency cap, keeping the
+    `(success, output)` contract of CommonFuntion.run_command.
+
+    Every command starts in its own session, so a timeout or cancellation kills the
+    whole process group (e.g. `make` and its compiler children), not just the parent.
+    """
+
+    def __init__(self, max_concurrency=8, timeout=None):
+        """
+        Args:
+            max_concurrency (int): Maximum number of commands running at the same time.
+            timeout (float): Default per-command timeout in seconds (None = no limit).
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.processes = set()
+        self.tasks = set()
+        self.semaphore = None
+        self.loop = None
+        self.free_lanes = []
+
+    def _kill_group(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def run(self, command, description="", check_output=False, timeout=None, capture=None):
+        """
+        Runs one command.
+
+        Args:
+            command (list): Command and arguments as a list.
+            description (str): Description for logging.
+            check_output (bool): If True, returns command output (stderr merged into stdout).
+            timeout (float): Per-command timeout in seconds; defaults to the executor timeout.
+            capture (StreamCapture): Stream the output line by line into it instead of
+                                     buffering; the result output is then its tail.
+
+        Returns:
+            tuple: (success: bool, output: str)
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.free_lanes = list(range(self.max_concurrency, 0, -1))
+        timeout = self.timeout if timeout is None else timeout
+
+        async with self.semaphore:
+            # Each running command gets its own trace lane so overlapping spans don't nest
+            lane = self.free_lanes.pop()
+            try:
+                with TRACER.span(description.strip() or " ".join(command), "command",
+                                 lane=lane, argv=list(command)) as span:
+                    return await self._execute(command, description, check_output, timeout, span, capture)
+            finally:
+                self.free_lanes.append(lane)
+
+    async def _stream(self, process, capture):
+        while True:
+            try:
+                line = await process.stdout.readline()
+            except ValueError:
+                continue  # line longer than STREAM_LIMIT; asyncio already discarded it
+            if not line:
+                break
+            capture.feed(line.decode(errors="replace"))
+        await process.wait()
+        return None, None
+
+    async def _execute(self, command, description, check_output, timeout, span, capture=None):
+        print(f"\n🔧 Executing: {description}")
+        piped = check_output or capture is not None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=subprocess.PIPE if piped else None,
+                stderr=subprocess.STDOUT if piped else None,
+                start_new_session=True,
+                limit=STREAM_LIMIT,
+            )
+        except OSError as e:
+            print(f"❌ Error during '{description}': {e}")
+            span['exit_code'] = -1
+            return False, str(e)
+
+        self.processes.add(process)
+        try:
+            reader = self._stream(process, capture) if capture is not None else process.communicate()
+            stdout, _ = await asyncio.wait_for(reader, timeout)
+        except asyncio.TimeoutError:
+            self._kill_group(process)
+            await process.wait()
+            message = f"Command '{redact_argv(command)}' timed out after {timeout} seconds"
+            print(f"❌ Error during '{description}': {message}")
+            span.update(exit_code=process.returncode, timed_out=True)
+            return False, message
+        except asyncio.CancelledError:
+            self._kill_group(process)
+            raise
+        finally:
+            self.processes.discard(process)
+            if capture is not None:
+                capture.close()
+
+        if capture is not None:
+            span.update(exit_code=process.returncode, output_bytes=capture.byte_count, lines=capture.line_count)
+            if process.returncode != 0:
+                error = subprocess.CalledProcessError(process.returncode, redact_argv(command))
+                print(f"❌ Error during '{description}': {error}")
+                print(f"📄 Last {len(capture.tail_buffer)} lines of output:\n{capture.tail()}")
+                return False, f"{error}\n{capture.tail()}"
+            return True, capture.tail()
+
+        span.update(exit_code=process.returncode, output_bytes=len(stdout) if stdout is not None else None)
+        if process.returncode != 0:
+            error = subprocess.CalledProcessError(process.returncode, redact_argv(command))
+            print(f"❌ Error during '{description}': {error}")
+            return False, str(error)
+        return True, stdout.decode(errors="replace") if check_output else ""
+
+    async def run_many(self, commands):
+        """
+        Runs independent commands concurrently.
+
+        Args:
+            commands (list): Items accepted by run(): a command list, or a dict with
+                             'command' and optional 'description', 'check_output', 'timeout'.
+
+        Returns:
+            list: (success, output) tuples in the order of `commands`; cancelled
+                  commands report (False, "cancelled").
+        """
+        async def guarded(spec):
+            spec = spec if isinstance(spec, dict) else {'command': spec}
+            try:
+                return await self.run(**spec)
+            except asyncio.CancelledError:
+                return False, "cancelled"
+
+        self.loop = asyncio.get_running_loop()
+        tasks = [asyncio.ensure_future(guarded(spec)) for spec in commands]
+        self.tasks.update(tasks)
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            self.tasks.difference_update(tasks)
+
+    def cancel(self):
+        """
+        Cancels every pending command and kills the process groups still running.
+        Safe to call from any thread.
+        """
+        for process in list(self.processes):
+            self._kill_group(process)
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(lambda: [task.cancel() for task in list(self.tasks)])
+
+    def run_all(self, commands):
+        """
+        Synchronous entry point for run_many(), for callers outside an event loop.
+        """
+        self.semaphore = None  # asyncio primitives are bound to the loop that first uses them
+        return asyncio.run(self.run_many(commands))
@@ -1,8 +1,16 @@
 import os
+import time
+import hashlib
 import platform
+import threading
 import subprocess
 import traceback
 from functools import wraps
+from script_container.execution.command_executor import AsyncCommandExecutor
+from script_container.execution.tracing import TRACER, redact_argv, redact_credentials
+from script_container.execution.cassette import CommandCassette
+from script_container.execution.output_stream import StreamCapture, MAX_LINE_LENGTH
+from script_container.execution.shell_backend import ShellCoprocess, is_small_command
 # --------------------------------------------------------------------------------------------------
 #                               Constant : dut_ports_config.py   (START)
 # --------------------------------------------------------------------------------------------------
@@ -56,9 +64,97 @@ port_config_fail = "🚫 Maximum attempts reached. Authentication failed.\n"
 
 
 
+# Idempotent, read-only commands whose output may be reused: argv prefix -> TTL in seconds
+READ_ONLY_COMMAND_TTLS = {
+    ("ip", "-br", "a"): 5.0,
+    ("lshw", "-c", "network", "-businfo"): 300.0,
+    ("ethtool", "-i"): 60.0,
+    ("uname", "-r"): 3600.0,
+}
+
+# Commands that change system state and therefore invalidate every cached result
+MUTATING_COMMAND_PREFIXES = (
+    ("ip", "link", "set"),
+    ("ip", "-force", "-batch"),
+    ("ip", "-batch"),
+    ("ethtool", "-r"),
+    ("modprobe",),
+    ("rmmod",),
+    ("make", "install"),
+    ("apt", "install"),
+    ("apt-get", "install"),
+    ("pip3", "install"),
+    ("nvmupdate64e",),
+    ("./nvmupdate64e",),
+)
+
+
+class CommandCache:
+    """
+    TTL cache for the output of read-only commands, keyed by argv and environment.
+    Shared by every CommonFuntion subclass so repeated inventory queries across
+    PairingManagerInfo and DutPortConfig only run once.
+    """
+
+    def __init__(self, read_only=READ_ONLY_COMMAND_TTLS, mutating=MUTATING_COMMAND_PREFIXES):
+        self.read_only = dict(read_only)
+        self.mutating = tuple(mutating)
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _matches(command, prefix):
+        return tuple(command[:len(prefix)]) == prefix
+
+    def ttl_for(self, command):
+        """
+        Returns:
+            float: TTL of the longest matching read-only prefix, or None if not cacheable.
+        """
+        matches = [prefix for prefix in self.read_only if self._matches(command, prefix)]
+        return self.read_only[max(matches, key=len)] if matches else None
+
+    def is_mutating(self, command):
+        return any(self._matches(command, prefix) for prefix in self.mutating)
+
+    def key(self, command):
+        env = hashlib.sha256(repr(sorted(os.environ.items())).encode()).hexdigest()
+        return tuple(command), os.getcwd(), env
+
+    def get(self, command):
+        """
+        Returns:
+            tuple: Cached (success, output), or None on a miss or an expired entry.
+        """
+        key = self.key(command)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            return entry[1]
+
+    def put(self, command, result, ttl):
+        with self.lock:
+            self.entries[self.key(command)] = (time.monotonic() + ttl, result)
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+
+
 class CommonFuntion:
 
+    # Shared across all instances; see CommandCache
+    command_cache = CommandCache()
+
+    # Record/replay of command results, configured by COMMAND_CASSETTE*; see CommandCassette
+    cassette = CommandCassette.from_environment()
 
+    # SHELL_BACKEND=coprocess runs small commands (see SMALL_COMMAND_PREFIXES) in one long-lived shell
+    shell_backend = ShellCoprocess() if os.environ.get("SHELL_BACKEND", "subprocess").lower() == "coprocess" else None
 
     def check_os(self):
         """
@@ -98,29 +194,289 @@ class CommonFuntion:
             "detailed_info": detailed_info
         }
 
-    def run_command(self, command, description="", check_output=False):
+    def run_command(self, command, description="", check_output=False, timeout=None):
         """
         Executes a shell command.
 
+        Output of read-only commands (READ_ONLY_COMMAND_TTLS) run with check_output is
+        served from the shared command cache until its TTL expires; any mutating
+        command (MUTATING_COMMAND_PREFIXES) invalidates the cache. Every call is
+        recorded as a "command" span on the process tracer. With a cassette in record
+        mode results are saved; in replay mode they are served without executing.
+
         Args:
             command (list): Command and arguments as a list.
             description (str): Description for logging.
             check_output (bool): If True, returns command output.
+            timeout (float): Maximum run time in seconds (None = no limit); on expiry the
+                             command is killed and reported as failed.
 
         Returns:
             tuple: (success: bool, output: str)
         """
+        with TRACER.span(description.strip() or " ".join(command), "command", argv=list(command)) as span:
+            ttl = self.command_cache.ttl_for(command) if check_output else None
+            if ttl is not None:
+                cached = self.command_cache.get(command)
+                if cached is not None:
+                    print(f"\n♻️ Cached: {description}")
+                    span.update(cached=True, exit_code=0, output_bytes=len(cached[1]))
+                    return cached
+            elif self.command_cache.is_mutating(command):
+                self.command_cache.invalidate()
+
+            if self.cassette.replaying:
+                entry = self.cassette.replay(command, check_output)
+                if entry is None:
+                    print(f"❌ Error during '{description}': no recorded result for {redact_argv(command)}")
+                    return False, f"Command '{redact_argv(command)}' not found in cassette"
+                print(f"\n📼 Replaying: {description}")
+                success, output, exit_code = entry['success'], entry['output'], entry['exit_code']
+                span.update(replayed=True, exit_code=exit_code, output_bytes=len(output))
+                if not success:
+                    print(f"❌ Error during '{description}': {output}")
+            else:
+                started = time.perf_counter()
+                success, output, exit_code = self._execute_command(command, description, check_output, span,
+                                                                   timeout)
+                if self.cassette.recording:
+                    self.cassette.record(command, check_output, success, output, exit_code,
+                                         time.perf_counter() - started)
+
+            if success and ttl is not None:
+                self.command_cache.put(command, (True, output), ttl)
+            return success, output
+
+    def _execute_command(self, command, description, check_output, span, timeout=None):
+        """
+        Runs the command for run_command().
+
+        Returns:
+            tuple: (success: bool, output: str, exit_code: int)
+        """
+        if self.shell_backend is not None and is_small_command(command):
+            try:
+                print(f"\n🔧 Executing: {description}")
+                exit_code, output = self.shell_backend.run(command, timeout)
+                return self._shell_result(command, description, check_output, exit_code, output, span)
+            except OSError as e:
+                print(f"⚠️ Shell coprocess failed ({e}), falling back to subprocess")
+
         try:
             print(f"\n🔧 Executing: {description}")
             if check_output:
-                result = subprocess.check_output(command, stderr=subprocess.STDOUT, text=True)
-                return True, result
+                result = subprocess.check_output(command, stderr=subprocess.STDOUT, text=True, timeout=timeout)
+                span.update(exit_code=0, output_bytes=len(result))
+                return True, result, 0
             else:
-                subprocess.run(command, check=True)
-                return True, ""
+                subprocess.run(command, check=True, timeout=timeout)
+                span['exit_code'] = 0
+                return True, "", 0
+        except subprocess.TimeoutExpired as e:
+            message = f"Command '{redact_argv(command)}' timed out after {e.timeout} seconds"
+            print(f"❌ Error during '{description}': {message}")
+            span.update(exit_code=-1, timed_out=True)
+            return False, message, -1
         except subprocess.CalledProcessError as e:
-            print(f"❌ Error during '{description}': {e}")
-            return False, str(e)
+            span.update(exit_code=e.returncode, output_bytes=len(e.output or ""))
+            error = redact_credentials(str(e))
+            print(f"❌ Error during '{description}': {error}")
+            return False, error, e.returncode
+
+    def _shell_result(self, command, description, check_output, exit_code, output, span):
+        """
+        Converts a coprocess (exit_code, output) into the run_command() result. Output of
+        commands run without check_output is printed, as it would have reached the terminal.
+        A timed-out command (exit_code None) fails with the timeout message.
+        """
+        if exit_code is None:
+            print(f"❌ Error during '{description}': {output}")
+            span.update(exit_code=-1, timed_out=True, backend="coprocess")
+            return False, output, -1
+        span.update(exit_code=exit_code, output_bytes=len(output), backend="coprocess")
+        if not check_output and output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        if exit_code != 0:
+            error = subprocess.CalledProcessError(exit_code, redact_argv(command), output)
+            print(f"❌ Error during '{description}': {error}")
+            return False, str(error), exit_code
+        return True, output if check_output else "", 0
+
+    def run_commands_batched(self, commands, timeout=None):
+        """
+        Executes small commands one after another. With the coprocess backend they are
+        sent to the shell in a single write instead of one fork+exec each.
+
+        Args:
+            commands (list): Command lists, or dicts with 'command' and optional
+                             'description', 'check_output', 'timeout'.
+            timeout (float): Default per-command timeout in seconds (None = no limit).
+
+        Returns:
+            list: (success: bool, output: str) tuples in the order of `commands`.
+        """
+        specs = [spec if isinstance(spec, dict) else {'command': spec} for spec in commands]
+        if (self.shell_backend is None or self.cassette.replaying
+                or not all(is_small_command(spec['command']) for spec in specs)):
+            return [self.run_command(spec['command'], spec.get('description', ""), spec.get('check_output', False),
+                                     spec.get('timeout', timeout))
+                    for spec in specs]
+
+        if any(self.command_cache.is_mutating(spec['command']) for spec in specs):
+            self.command_cache.invalidate()
+        started = time.perf_counter()
+        try:
+            raw_results = self.shell_backend.run_batch([spec['command'] for spec in specs],
+                                                       [spec.get('timeout', timeout) for spec in specs])
+        except OSError as e:
+            print(f"⚠️ Shell coprocess failed ({e}), falling back to subprocess")
+            return [self.run_command(spec['command'], spec.get('description', ""), spec.get('check_output', False),
+                                     spec.get('timeout', timeout))
+                    for spec in specs]
+        elapsed = (time.perf_counter() - started) / len(specs)
+
+        results = []
+        for spec, (exit_code, output) in zip(specs, raw_results):
+            command, description = spec['command'], spec.get('description', "")
+            with TRACER.span(description.strip() or " ".join(command), "command", argv=list(command)) as span:
+                print(f"\n🔧 Executing: {description}")
+                success, output, exit_code = self._shell_result(command, description, spec.get('check_output', False),
+                                                                exit_code, output, span)
+            if self.cassette.recording:
+                self.cassette.record(command, spec.get('check_output', False), success, output, exit_code, elapsed)
+            results.append((success, output))
+        return results
+
+    def run_command_streaming(self, command, description="", handlers=(), tail_lines=200, capture=None):
+        """
+        Executes a command with a long or noisy output without buffering it.
+
+        stdout and stderr are read line by line and passed to `handlers` (see
+        output_stream: EchoHandler, ProgressHandler, PatternAlertHandler); only the
+        last `tail_lines` lines are kept, so memory stays constant.
+
+        Args:
+            command (list): Command and arguments as a list.
+            description (str): Description for logging.
+            handlers (list): Callables taking one output line.
+            tail_lines (int): Number of trailing lines kept for the result / error report.
+            capture (StreamCapture): Use this capture instead of building one from
+                                     `handlers` and `tail_lines`.
+
+        Returns:
+            tuple: (success: bool, output: str) where output is the tail of the output,
+                   prefixed with the error on failure.
+        """
+        capture = capture if capture is not None else StreamCapture(handlers, tail_lines)
+        with TRACER.span(description.strip() or " ".join(command), "command", argv=list(command)) as span:
+            if self.command_cache.is_mutating(command):
+                self.command_cache.invalidate()
+
+            if self.cassette.replaying:
+                entry = self.cassette.replay(command, False)
+                if entry is None:
+                    print(f"❌ Error during '{description}': no recorded result for {redact_argv(command)}")
+                    return False, f"Command '{redact_argv(command)}' not found in cassette"
+                print(f"\n📼 Replaying: {description}")
+                capture.feed_text(entry['output'])
+                capture.close()
+                span.update(replayed=True, exit_code=entry['exit_code'], output_bytes=capture.byte_count)
+                return entry['success'], capture.tail()
+
+            print(f"\n🔧 Executing: {description}")
+            started = time.perf_counter()
+            try:
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                           text=True, errors="replace")
+            except OSError as e:
+                # Missing binary, permission denied, ...: report it like a failed command
+                capture.close()
+                message = f"Command '{redact_argv(command)}' could not be started: {e}"
+                print(f"❌ Error during '{description}': {message}")
+                span.update(exit_code=-1)
+                if self.cassette.recording:
+                    self.cassette.record(command, False, False, message, -1, time.perf_counter() - started)
+                return False, message
+            with process:
+                for line in iter(lambda: process.stdout.readline(MAX_LINE_LENGTH), ""):
+                    capture.feed(line)
+            capture.close()
+            span.update(exit_code=process.returncode, output_bytes=capture.byte_count, lines=capture.line_count)
+
+            success, output = process.returncode == 0, capture.tail()
+            if self.cassette.recording:
+                self.cassette.record(command, False, success, output, process.returncode,
+                                     time.perf_counter() - started)
+            if not success:
+                error = subprocess.CalledProcessError(process.returncode, redact_argv(command))
+                print(f"❌ Error during '{description}': {error}")
+                print(f"📄 Last {len(capture.tail_buffer)} lines of output:\n{output}")
+                return False, f"{error}\n{output}"
+            return True, output
+
+    def run_commands_concurrently(self, commands, max_concurrency=8, timeout=None):
+        """
+        Executes independent commands at the same time.
+
+        Args:
+            commands (list): Command lists, or dicts with 'command' and optional
+                             'description', 'check_output', 'timeout', and 'capture'
+                             (a StreamCapture to stream the output through).
+            max_concurrency (int): Maximum number of commands running at once.
+            timeout (float): Per-command timeout in seconds; the whole process group is killed on expiry.
+
+        Returns:
+            list: (success: bool, output: str) tuples in the order of `commands`;
+                  cacheable read-only commands are served as in run_command().
+        """
+        specs = [spec if isinstance(spec, dict) else {'command': spec} for spec in commands]
+        if any(self.command_cache.is_mutating(spec['command']) for spec in specs):
+            self.command_cache.invalidate()
+
+        results, pending = [None] * len(specs), []
+        for idx, spec in enumerate(specs):
+            ttl = self.command_cache.ttl_for(spec['command']) if spec.get('check_output') else None
+            cached = self.command_cache.get(spec['command']) if ttl is not None else None
+            if cached is not None:
+                print(f"\n♻️ Cached: {spec.get('description', '')}")
+                results[idx] = cached
+            else:
+                pending.append((idx, ttl))
+
+        if self.cassette.replaying:
+            outputs = [self.run_command_streaming(specs[idx]['command'], specs[idx].get('description', ""),
+                                                  capture=specs[idx]['capture'])
+                       if specs[idx].get('capture') is not None else
+                       self.run_command(specs[idx]['command'], specs[idx].get('description', ""),
+                                        specs[idx].get('check_output', False))
+                       for idx, _ in pending]
+        else:
+            # With the coprocess backend small commands go to the shell as one batch
+            # while the rest run in parallel subprocesses
+            batched = [item for item in pending
+                       if self.shell_backend is not None and specs[item[0]].get('capture') is None
+                       and is_small_command(specs[item[0]]['command'])]
+            forked = [item for item in pending if item not in batched]
+            by_index = dict(zip([idx for idx, _ in batched],
+                                self.run_commands_batched([specs[idx] for idx, _ in batched], timeout)
+                                if batched else []))
+
+            started = time.perf_counter()
+            forked_outputs = (AsyncCommandExecutor(max_concurrency, timeout).run_all([specs[idx] for idx, _ in forked])
+                              if forked else [])
+            if self.cassette.recording:
+                # The batch ran in parallel, so each command is recorded with the batch wall time
+                elapsed = time.perf_counter() - started
+                for (idx, _), (success, output) in zip(forked, forked_outputs):
+                    self.cassette.record(specs[idx]['command'], specs[idx].get('check_output', False),
+                                         success, output, 0 if success else 1, elapsed)
+            by_index.update(zip([idx for idx, _ in forked], forked_outputs))
+            outputs = [by_index[idx] for idx, _ in pending]
+        for (idx, ttl), result in zip(pending, outputs):
+            if ttl is not None and result[0]:
+                self.command_cache.put(specs[idx]['command'], result, ttl)
+            results[idx] = result
+        return results
         
 
 
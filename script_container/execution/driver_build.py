@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.tracing import TRACER
+from script_container.execution.step_journal import file_digest
+from script_container.execution.output_stream import ProgressHandler, PatternAlertHandler
+
+
+DEFAULT_DRIVER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dpdkCrafter", "drivers")
+DRIVER_MANIFEST = "manifest.json"
+
+# Where `make install` of an out-of-tree Intel driver puts its artifacts ({kernel} = uname -r)
+INSTALL_ROOTS = ("lib/modules/{kernel}/updates", "lib/firmware/updates")
+
+
+def build_jobs():
+    """
+    Returns:
+        int: Parallel make jobs, DRIVER_BUILD_JOBS or the number of cores this process may use.
+    """
+    if os.environ.get("DRIVER_BUILD_JOBS"):
+        return max(1, int(os.environ["DRIVER_BUILD_JOBS"]))
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class DriverBuildCache(CommonFuntion):
+    """
+    Builds out-of-tree drivers once per (source tarball, kernel, compiler).
+
+    On a miss the source is copied to a scratch directory, built with `make -j<cores>`
+    and installed with `make install`; every file that install wrote under
+    INSTALL_ROOTS (modules, possibly compressed or signed, DDP packages and their
+    symlinks) is stored in the cache with its checksum. On a hit those files are copied
+    straight into place and `depmod` is run: no apt, no compiler, no make.
+
+    The cache directory can live on shared storage so a fleet of identical hosts
+    builds each kernel/driver combination only once.
+    """
+
+    def __init__(self, cache_root=DEFAULT_DRIVER_CACHE_PATH, install_root="/", jobs=None):
+        """
+        Args:
+            cache_root (str): Directory holding one folder per build key.
+            install_root (str): Filesystem root the artifacts are installed under.
+            jobs (int): Parallel make jobs, defaults to build_jobs().
+        """
+        self.cache_root = cache_root
+        self.install_root = install_root
+        self.jobs = jobs or build_jobs()
+
+    def compiler_version(self):
+        compiler = os.environ.get("CC", "gcc")
+        success, output = self.run_command([compiler, "--version"], f"Reading {compiler} version", check_output=True)
+        return output.splitlines()[0].strip() if success and output.strip() else compiler
+
+    def build_key(self, source_digest, kernel, compiler):
+        """
+        Returns:
+            str: Short hash of everything the built modules depend on.
+        """
+        return hashlib.sha256(json.dumps([source_digest, kernel, compiler]).encode()).hexdigest()[:16]
+
+    def entry_path(self, source_dir, key):
+        return os.path.join(self.cache_root, f"{os.path.basename(source_dir.rstrip('/'))}-{key}")
+
+    def install(self, source_dir, source_digest, kernel=None):
+        """
+        Installs the driver from the cache, building it first on a miss.
+
+        Args:
+            source_dir (str): Top-level driver source directory (containing src/Makefile).
+            source_digest (str): SHA-256 of the driver tarball.
+            kernel (str): Target kernel release, defaults to the running one.
+
+        Returns:
+            bool: True if the driver is installed for the kernel.
+        """
+        kernel = kernel or os.uname().release
+        compiler = self.compiler_version()
+        key = self.build_key(source_digest, kernel, compiler)
+        entry = self.entry_path(source_dir, key)
+
+        with TRACER.span(f"Driver {os.path.basename(source_dir.rstrip('/'))}", "driver",
+                         kernel=kernel, key=key) as span:
+            if os.path.isfile(os.path.join(entry, DRIVER_MANIFEST)):
+                span['cache'] = "hit"
+                print(f"♻️ Driver already built for {kernel} with {compiler}, installing cached artifacts.")
+                if self.install_cached(entry, kernel):
+                    return True
+                print("⚠️ Cached driver build unusable, rebuilding.")
+            span['cache'] = "miss"
+            return self.build_and_install(source_dir, entry, kernel, compiler, source_digest)
+
+    def build_and_install(self, source_dir, entry, kernel, compiler, source_digest):
+        """
+        Builds in a scratch copy of the source, runs `make install` and caches what it installed.
+        """
+        if shutil.which("make") is None:
+            from script_container.execution.provisioning import PackageProvisioner
+            if not PackageProvisioner().provision(["make"], [])['success']:
+                return False
+
+        build_dir = f"{entry}.build.{os.getpid()}"
+        try:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            shutil.copytree(source_dir, build_dir, symlinks=True)
+        except OSError as e:
+            print(f"❌ Error preparing driver build directory: {e}")
+            return False
+
+        try:
+            src_dir = os.path.join(build_dir, "src")
+            success, _ = self.run_command_streaming(
+                ["make", "-C", src_dir, f"-j{self.jobs}"], f"Running make -j{self.jobs}",
+                [ProgressHandler("make", unit="lines"), PatternAlertHandler()])
+            if not success:
+                return False
+            installed_after = time.time() - 1
+            success, _ = self.run_command_streaming(
+                ["make", "install", "-C", src_dir], "Running make install",
+                [ProgressHandler("make install", unit="lines"), PatternAlertHandler()])
+            if not success:
+                return False
+            modules = sorted({name for _, _, files in os.walk(src_dir) for name in files if name.endswith(".ko")})
+            self.store(entry, kernel, compiler, source_digest, modules, installed_after)
+            return True
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def installed_artifacts(self, kernel, modules, since):
+        """
+        Returns:
+            list: Paths relative to install_root written by `make install` (modified after
+                  `since`) or named like one of the built modules ("ice.ko", "ice.ko.zst").
+        """
+        found = []
+        for root in INSTALL_ROOTS:
+            top = os.path.join(self.install_root, root.format(kernel=kernel))
+            for dirpath, dirnames, filenames in os.walk(top):
+                for name in filenames + [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                    path = os.path.join(dirpath, name)
+                    if os.lstat(path).st_mtime >= since or any(name.startswith(module) for module in modules):
+                        found.append(os.path.relpath(path, self.install_root))
+        return sorted(found)
+
+    def store(self, entry, kernel, compiler, source_digest, modules, since):
+        """
+        Copies the installed artifacts into the cache and writes the manifest last, so
+        only complete entries are ever used.
+        """
+        tmp_entry = f"{entry}.{os.getpid()}.tmp"
+        files, links = {}, {}
+        try:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            for relpath in self.installed_artifacts(kernel, modules, since):
+                source = os.path.join(self.install_root, relpath)
+                target = os.path.join(tmp_entry, "root", relpath)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if os.path.islink(source):
+                    links[relpath] = os.readlink(source)
+                    continue
+                shutil.copy2(source, target)
+                files[relpath] = file_digest(target)
+            if not any(os.path.basename(path).split(".ko")[0] + ".ko" in modules for path in files):
+                print("⚠️ make install left no module under the install roots, not caching this build.")
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+                return
+            manifest = {'source_digest': source_digest, 'kernel': kernel, 'compiler': compiler,
+                        'modules': modules, 'built_at': time.time(), 'files': files, 'links': links}
+            with open(os.path.join(tmp_entry, DRIVER_MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(tmp_entry, entry)
+            print(f"📦 Cached {len(files)} driver artifact(s) for {kernel} in {entry}")
+        except OSError as e:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            print(f"⚠️ Could not cache driver build: {e}")
+
+    def install_cached(self, entry, kernel):
+        """
+        Verifies the cached artifacts, copies them into place and refreshes module dependencies.
+
+        Returns:
+            bool: True if every artifact was installed and depmod succeeded.
+        """
+        try:
+            with open(os.path.join(entry, DRIVER_MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            for relpath, digest in manifest['files'].items():
+                cached = os.path.join(entry, "root", relpath)
+                if file_digest(cached) != digest:
+                    print(f"❌ Cached driver artifact {relpath} failed checksum verification.")
+                    return False
+            for relpath in manifest['files']:
+                target = os.path.join(self.install_root, relpath)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_target = f"{target}.{os.getpid()}.tmp"
+                shutil.copy2(os.path.join(entry, "root", relpath), tmp_target)
+                os.replace(tmp_target, target)
+            for relpath, link in manifest['links'].items():
+                target = os.path.join(self.install_root, relpath)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if os.path.lexists(target):
+                    os.remove(target)
+                os.symlink(link, target)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Error installing cached driver: {e}")
+            return False
+        print(f"📦 Installed {len(manifest['files'])} cached driver artifact(s): {', '.join(manifest['modules'])}")
+        success, _ = self.run_command(["depmod", "-a", kernel], f"Updating module dependencies for {kernel}")
+        return success
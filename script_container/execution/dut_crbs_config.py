@@ -43,9 +43,10 @@ class DutCrbsConfig(CommonFuntion):
         print("\n--------------------------------------------------------------------------------------------------\n")
 
         if os.path.exists(file_name):
-            self.run_command(["chmod","777",file_name],"giving a file access for READ, WRITE and DELETE")
-            time.sleep(1)
-            self.run_command(["rm","-rf",file_name],f"Deleting existing File name  :=> {file_name}")
+            self.run_commands_batched([
+                {'command': ["chmod","777",file_name], 'description': "giving a file access for READ, WRITE and DELETE"},
+                {'command': ["rm","-rf",file_name], 'description': f"Deleting existing File name  :=> {file_name}"},
+            ])
         
 
         # Creating crbs.cfg File
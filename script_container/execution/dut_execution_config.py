@@ -1,6 +1,5 @@
 import re
 import os
-import time
 import traceback
 from script_container.execution.constant import CommonFuntion, handle_exceptions
 
@@ -61,9 +60,10 @@ class ExecutionCfgUpdate(CommonFuntion):
             print("\n" + "-" * 100 + "\n")
 
             if os.path.exists(self.file_name):
-                self.run_command(["chmod", "777", self.file_name], "Setting file access permissions")
-                time.sleep(1)
-                self.run_command(["rm", "-rf", self.file_name], f"Deleting existing file: {self.file_name}")
+                self.run_commands_batched([
+                    {'command': ["chmod", "777", self.file_name], 'description': "Setting file access permissions"},
+                    {'command': ["rm", "-rf", self.file_name], 'description': f"Deleting existing file: {self.file_name}"},
+                ])
 
             with open(self.file_name, "w", encoding='utf-8') as f:
                 f.write(pair_text)
@@ -11,6 +11,8 @@ from script_container.execution.constant import (port_config_prompt_update,
 
 # Importing Common Method :
 from script_container.execution.constant import CommonFuntion
+from script_container.execution.nic_inventory import NicInventory
+from script_container.execution.ethtool_ioctl import EthtoolIoctl
 
 
 class DutPortConfig(CommonFuntion):
@@ -76,6 +78,21 @@ class DutPortConfig(CommonFuntion):
         return None
 
 
+    def port_inventory_table(self):
+        """
+        Renders the sysfs inventory enriched with firmware and link state from the ethtool
+        ioctl layer; the ioctl socket is opened once for the whole table and closed after.
+
+        Returns:
+            str: Formatted inventory table.
+        """
+        try:
+            ethtool = EthtoolIoctl()
+        except OSError:
+            return NicInventory().format_table()
+        with ethtool:
+            return NicInventory(ethtool=ethtool).format_table()
+
     def write_ports_config(self,pair_text, file_name="ports.cfg"):
         """
         Write the given pair_text content to a configuration file.
@@ -89,43 +106,38 @@ class DutPortConfig(CommonFuntion):
         # Removing Exiting file if File is available
         
         if os.path.exists(file_name):
-            self.run_command(
-            ["chmod", "777", file_name],
-            f"\n\n🔧 Allowing READ, WRITE, and EXECUTE permissions for all users on ➡️ {file_name}"
-            )
-            self.run_command(
-            ["rm", "-rf", file_name],
-            f"\n\n🔧 Removing Existing file : ➡️ {file_name}"
-            )
+            self.run_commands_batched([
+                {'command': ["chmod", "777", file_name],
+                 'description': f"\n\n🔧 Allowing READ, WRITE, and EXECUTE permissions for all users on ➡️ {file_name}"},
+                {'command': ["rm", "-rf", file_name],
+                 'description': f"\n\n🔧 Removing Existing file : ➡️ {file_name}"},
+            ])
 
         with open(file_name, "w") as f:
             f.write(pair_text)
         print(f"✅ File '{file_name}' has been created with the provided port configuration.")
 
 
-        # 🔐 Step 1: Set full permissions on the configuration file
-        self.run_command(
-            ["chmod", "777", file_name],
-            f"\n\n🔧 Allowing READ, WRITE, and EXECUTE permissions for all users on ➡️ {file_name}"
-        )
+        # 🔐 Steps 1, 2 and 4 are independent: set permissions, fetch interface details
+        # and read back the configuration file concurrently
+        _, (_, interfaces_output), (_, file_output) = self.run_commands_concurrently([
+            {'command': ["chmod", "777", file_name],
+             'description': f"\n\n🔧 Allowing READ, WRITE, and EXECUTE permissions for all users on ➡️ {file_name}"},
+            {'command': ["ip", "-br", "a"], 'check_output': True,
+             'description': "\n\n📡 Fetching brief interface details..."},
+            {'command': ["cat", file_name], 'check_output': True,
+             'description': "\n\n📑 Showing contents of the updated configuration file for double verification..."},
+        ])
 
-        # 🌐 Step 2: Retrieve brief interface details
-        self.run_command(
-            ["ip", "-br", "a"],
-            "\n\n📡 Fetching brief interface details..."
-        )
+        # 🌐 Step 2: Brief interface details
+        print(interfaces_output)
 
         # 🧠 Step 3: Get detailed network hardware info with bus mapping
-        self.run_command(
-            ["lshw", "-c", "network", "-businfo"],
-            "\n\n🔍 Fetching detailed bus information for network interfaces..."
-        )
+        print("\n\n🔍 Fetching detailed bus information for network interfaces...")
+        print(self.port_inventory_table())
 
         # 📄 Step 4: Display the updated configuration file for verification
-        self.run_command(
-            ["cat", file_name],
-            "\n\n📑 Showing contents of the updated configuration file for double verification..."
-        )
+        print(file_output)
 
         # 😴 Step 5: Pause briefly to allow user to verify
         print("\n\n😴 Sleeping for 3 seconds to allow verification of the updated configuration...\n")
@@ -172,17 +184,24 @@ class DutPortConfig(CommonFuntion):
             # 📝 Step 6: Write the configuration to file
             file_name = self.write_ports_config(updated_text)
 
-            # 📦 Step 7: Set file permissions
-            self.run_command(["chmod", "777", file_name], f"🔧 Setting full permissions on ➡️ {file_name}")
+            # 📦 Steps 7, 8 and 10 run concurrently: permissions, interface details, file contents
+            _, (_, interfaces_output), (_, file_output) = self.run_commands_concurrently([
+                {'command': ["chmod", "777", file_name], 'description': f"🔧 Setting full permissions on ➡️ {file_name}"},
+                {'command': ["ip", "-br", "a"], 'check_output': True,
+                 'description': "📡 Retrieving network interface details"},
+                {'command': ["cat", file_name], 'check_output': True,
+                 'description': "📑 Displaying updated configuration file for verification"},
+            ])
 
-            # 🌐 Step 8: Get network interface details
-            self.run_command(["ip", "-br", "a"], "📡 Retrieving network interface details")
+            # 🌐 Step 8: Network interface details
+            print(interfaces_output)
 
             # 🧠 Step 9: Fetch bus information
-            self.run_command(["lshw", "-c", "network", "-businfo"], "🔍 Fetching bus information for network interfaces")
+            print("🔍 Fetching bus information for network interfaces")
+            print(self.port_inventory_table())
 
-            # 📄 Step 10: Display the updated configuration file
-            self.run_command(["cat", file_name], "📑 Displaying updated configuration file for verification")
+            # 📄 Step 10: Updated configuration file
+            print(file_output)
 
             # 😴 Step 11: Pause for verification
             print("😴 Sleeping for 3 seconds to allow verification...\n")
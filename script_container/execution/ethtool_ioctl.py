@@ -0,0 +1,214 @@
+import os
+import errno
+import fcntl
+import ctypes
+import socket
+import struct
+
+
+SIOCETHTOOL = 0x8946
+
+# ethtool commands (linux/ethtool.h)
+ETHTOOL_GSET = 0x00000001
+ETHTOOL_GDRVINFO = 0x00000003
+ETHTOOL_NWAY_RST = 0x00000009
+ETHTOOL_GLINK = 0x0000000a
+ETHTOOL_GLINKSETTINGS = 0x0000004c
+
+DRVINFO = struct.Struct("=I32s32s32s32s32s12sIIIII")
+ETHTOOL_VALUE = struct.Struct("=II")
+LINK_SETTINGS_HEADER = struct.Struct("=IIBBBBBBBbBBBB28x")
+ETHTOOL_CMD = struct.Struct("=IIIHBBBBBBIIHBBI8x")
+
+SPEED_UNKNOWN = 0xFFFFFFFF
+DUPLEX_NAMES = {0x00: "half", 0x01: "full"}
+
+
+class SocketEthtoolBackend:
+    """
+    Issues SIOCETHTOOL ioctls on an AF_INET datagram socket.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def ioctl(self, interface, buffer):
+        """
+        Runs one ethtool command; the kernel reads and writes `buffer` in place.
+
+        Args:
+            interface (str): Interface name.
+            buffer (bytearray): Command structure starting with the u32 command number.
+
+        Raises:
+            OSError: If the driver rejects the command or the interface does not exist.
+        """
+        data = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+        ifreq = struct.pack("16sP", interface.encode()[:15], ctypes.addressof(data))
+        ifreq += b"\0" * (40 - len(ifreq))
+        fcntl.ioctl(self.sock.fileno(), SIOCETHTOOL, ifreq)
+
+    def close(self):
+        self.sock.close()
+
+
+class CassetteEthtoolBackend:
+    """
+    Routes ethtool ioctls through a CommandCassette: when recording, each command runs on
+    the real socket and the buffer the kernel returned (or the errno) is saved; when
+    replaying, the saved buffer is copied back without touching the host.
+    """
+
+    def __init__(self, cassette, backend=None):
+        """
+        Args:
+            cassette (CommandCassette): Cassette in record or replay mode.
+            backend: Real backend used while recording; defaults to SocketEthtoolBackend.
+        """
+        self.cassette = cassette
+        self.backend = None
+        if not cassette.replaying:
+            self.backend = backend if backend is not None else SocketEthtoolBackend()
+
+    def _run(self, interface, buffer):
+        try:
+            self.backend.ioctl(interface, buffer)
+        except OSError as e:
+            return {'errno': e.errno or errno.EIO, 'buffer': ""}
+        return {'errno': 0, 'buffer': bytes(buffer).hex()}
+
+    def ioctl(self, interface, buffer):
+        # The request buffer is part of the key: the GLINKSETTINGS handshake sends the same
+        # command twice with different contents
+        key = ["#SIOCETHTOOL", interface, bytes(buffer).hex()]
+        result = self.cassette.capture(key, lambda: self._run(interface, buffer))
+        if result is None:
+            raise OSError(errno.ENODEV, f"ethtool ioctl on {interface} not found in cassette")
+        if result['errno']:
+            raise OSError(result['errno'], os.strerror(result['errno']))
+        buffer[:] = bytes.fromhex(result['buffer'])
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+
+class EthtoolIoctl:
+    """
+    In-process replacement for the `ethtool` CLI calls used during setup: driver info,
+    link settings, link-detected state and autonegotiation restart, without forking.
+    """
+
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: Object with ioctl(interface, buffer); defaults to SocketEthtoolBackend.
+                     Pass a fake to exercise the parsing without NICs.
+        """
+        self.backend = backend if backend is not None else SocketEthtoolBackend()
+
+    @staticmethod
+    def _text(raw):
+        return raw.split(b"\0", 1)[0].decode(errors="replace")
+
+    def driver_info(self, interface):
+        """
+        ETHTOOL_GDRVINFO, equivalent of `ethtool -i`.
+
+        Returns:
+            dict: 'driver', 'version', 'firmware_version', 'bus_info', 'expansion_rom_version'.
+        """
+        buffer = bytearray(DRVINFO.size)
+        struct.pack_into("=I", buffer, 0, ETHTOOL_GDRVINFO)
+        self.backend.ioctl(interface, buffer)
+        fields = DRVINFO.unpack(bytes(buffer))
+        return {
+            'driver': self._text(fields[1]),
+            'version': self._text(fields[2]),
+            'firmware_version': self._text(fields[3]),
+            'bus_info': self._text(fields[4]),
+            'expansion_rom_version': self._text(fields[5]),
+        }
+
+    def link_settings(self, interface):
+        """
+        ETHTOOL_GLINKSETTINGS (with the ETHTOOL_GSET fallback for old drivers).
+
+        Returns:
+            dict: 'speed' in Mb/s (None if unknown), 'duplex', 'autoneg', 'port'.
+        """
+        try:
+            # Handshake: nwords=0 makes the kernel answer with -(required nwords)
+            buffer = bytearray(LINK_SETTINGS_HEADER.size)
+            struct.pack_into("=I", buffer, 0, ETHTOOL_GLINKSETTINGS)
+            self.backend.ioctl(interface, buffer)
+            nwords = -LINK_SETTINGS_HEADER.unpack(bytes(buffer))[9]
+            if nwords <= 0:
+                raise OSError("link settings handshake failed")
+
+            buffer = bytearray(LINK_SETTINGS_HEADER.size + 3 * nwords * 4)
+            struct.pack_into("=I", buffer, 0, ETHTOOL_GLINKSETTINGS)
+            struct.pack_into("=b", buffer, 15, nwords)
+            self.backend.ioctl(interface, buffer)
+            _, speed, duplex, port, _, autoneg = LINK_SETTINGS_HEADER.unpack_from(bytes(buffer))[:6]
+        except OSError:
+            buffer = bytearray(ETHTOOL_CMD.size)
+            struct.pack_into("=I", buffer, 0, ETHTOOL_GSET)
+            self.backend.ioctl(interface, buffer)
+            fields = ETHTOOL_CMD.unpack(bytes(buffer))
+            speed = fields[3] | (fields[12] << 16)
+            duplex, port, autoneg = fields[4], fields[5], fields[8]
+
+        return {
+            'speed': None if speed in (0, SPEED_UNKNOWN, 0xFFFF) else speed,
+            'duplex': DUPLEX_NAMES.get(duplex, "unknown"),
+            'autoneg': bool(autoneg),
+            'port': port,
+        }
+
+    def link_detected(self, interface):
+        """
+        ETHTOOL_GLINK, the "Link detected" line of `ethtool <iface>`.
+        """
+        buffer = bytearray(ETHTOOL_VALUE.pack(ETHTOOL_GLINK, 0))
+        self.backend.ioctl(interface, buffer)
+        return bool(ETHTOOL_VALUE.unpack(bytes(buffer))[1])
+
+    def nway_reset(self, interface):
+        """
+        ETHTOOL_NWAY_RST, equivalent of `ethtool -r`.
+        """
+        self.backend.ioctl(interface, bytearray(ETHTOOL_VALUE.pack(ETHTOOL_NWAY_RST, 0)))
+        return True
+
+    def collect(self, interfaces):
+        """
+        Reads driver info, link settings and link state for many interfaces in one pass.
+
+        Returns:
+            dict: Interface name to merged info dict; interfaces the driver rejects
+                  map to whatever could be read (possibly empty).
+        """
+        results = {}
+        for interface in interfaces:
+            info = {}
+            for query in (self.driver_info, self.link_settings):
+                try:
+                    info.update(query(interface))
+                except OSError as e:
+                    print(f"⚠️ ethtool {query.__name__} failed on {interface}: {e}")
+            try:
+                info['link_detected'] = self.link_detected(interface)
+            except OSError as e:
+                print(f"⚠️ ethtool link_detected failed on {interface}: {e}")
+            results[interface] = info
+        return results
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
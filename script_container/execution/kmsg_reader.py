@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import deque, namedtuple
+
+
+KmsgRecord = namedtuple("KmsgRecord", ["seq", "timestamp", "priority", "message"])
+
+
+class KmsgReader:
+    """
+    Non-destructive kernel log reader built on /dev/kmsg.
+
+    Unlike `dmesg -c` it never clears the ring buffer: the reader starts at the end
+    of the log and each caller keeps its own cursor (the last sequence number it
+    has seen), so several probes can share one reader without clobbering each other.
+    """
+
+    def __init__(self, path="/dev/kmsg", history=4096):
+        """
+        Args:
+            path (str): Kernel log device, or a regular file in the same record format
+                        ("prio,seq,usec,flags;message") standing in for it.
+            history (int): Number of records kept in memory for cursors to read from.
+        """
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        os.lseek(self.fd, 0, os.SEEK_END)
+        self.records = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.partial = b""
+        self.last_seq = -1
+
+    @staticmethod
+    def parse_record(line):
+        """
+        Parses one "prio,seq,usec,flags;message" record.
+
+        Returns:
+            KmsgRecord: Parsed record, or None for continuation lines and malformed input.
+        """
+        header, sep, message = line.partition(";")
+        if not sep or line.startswith(" "):
+            return None
+        fields = header.split(",")
+        if len(fields) < 3:
+            return None
+        try:
+            prefix, seq, usec = int(fields[0]), int(fields[1]), int(fields[2])
+        except ValueError:
+            return None
+        return KmsgRecord(seq, usec / 1_000_000, prefix & 7, message)
+
+    def poll(self):
+        """
+        Reads every record that became available since the last poll.
+
+        Returns:
+            list: New KmsgRecord tuples.
+        """
+        new_records = []
+        with self.lock:
+            while True:
+                try:
+                    chunk = os.read(self.fd, 8192)
+                except BlockingIOError:
+                    break
+                except BrokenPipeError:
+                    continue  # records were overwritten before we read them; resume with the next one
+                if not chunk:
+                    break
+                data = self.partial + chunk
+                lines = data.split(b"\n")
+                self.partial = lines.pop()
+                for line in lines:
+                    record = self.parse_record(line.decode(errors="replace"))
+                    if record and record.seq > self.last_seq:
+                        self.records.append(record)
+                        new_records.append(record)
+                        self.last_seq = record.seq
+        return new_records
+
+    def cursor(self):
+        """
+        Returns:
+            int: Sequence number of the newest record; pass it to read_since() later.
+        """
+        self.poll()
+        return self.last_seq
+
+    def read_since(self, cursor):
+        """
+        Args:
+            cursor (int): Value previously returned by cursor().
+
+        Returns:
+            list: KmsgRecord tuples logged after the cursor.
+        """
+        self.poll()
+        with self.lock:
+            return [record for record in self.records if record.seq > cursor]
+
+    def text_since(self, cursor):
+        """
+        Renders records after the cursor in dmesg format ("[seconds.micro] message"),
+        so existing dmesg parsers can run on the incremental stream.
+        """
+        return "".join(f"[{record.timestamp:12.6f}] {record.message}\n" for record in self.read_since(cursor))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CassetteKmsgReader:
+    """
+    KmsgReader stand-in that routes cursor and text reads through a CommandCassette:
+    when recording it wraps a live reader and saves what it returned, when replaying it
+    serves the saved reads without opening the kernel log.
+    """
+
+    def __init__(self, cassette, reader=None):
+        """
+        Args:
+            cassette (CommandCassette): Cassette in record or replay mode.
+            reader (KmsgReader): Live reader; required when recording.
+        """
+        self.cassette = cassette
+        self.reader = reader
+
+    def cursor(self):
+        return self.cassette.capture(["#kmsg", "cursor"], self.reader.cursor if self.reader else None, default=-1)
+
+    def text_since(self, cursor):
+        return self.cassette.capture(["#kmsg", "text"], lambda: self.reader.text_since(cursor),
+                                     default="", repeat=False)
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
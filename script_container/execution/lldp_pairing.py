@@ -0,0 +1,285 @@
+import os
+import re
+import time
+import select
+import socket
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from script_container.execution.constant import CommonFuntion
+
+
+ETH_P_LLDP = 0x88CC
+LLDP_MULTICAST = bytes.fromhex("0180c200000e")
+PACKET_ADD_MEMBERSHIP = 1
+PACKET_MR_MULTICAST = 0
+PACKET_OUTGOING = 4
+
+# LLDP TLV types (IEEE 802.1AB)
+TLV_END, TLV_CHASSIS_ID, TLV_PORT_ID, TLV_TTL, TLV_PORT_DESCRIPTION, TLV_SYSTEM_NAME = range(6)
+SUBTYPE_CHASSIS_MAC = 4
+SUBTYPE_PORT_MAC = 3
+SUBTYPE_LOCAL = 7
+
+
+def _format_id(subtype, value, mac_subtype):
+    if subtype == mac_subtype and len(value) == 6:
+        return ":".join(f"{byte:02x}" for byte in value)
+    return value.decode(errors="replace")
+
+
+def parse_lldp_frame(frame):
+    """
+    Parses an Ethernet frame carrying an LLDPDU.
+
+    Args:
+        frame (bytes): Raw frame starting at the destination MAC (802.1Q tags allowed).
+
+    Returns:
+        dict: {'source_mac', 'chassis_id', 'port_id', 'port_id_subtype', 'port_description',
+               'system_name', 'ttl'}, or None if the frame is not LLDP.
+    """
+    if len(frame) < 14:
+        return None
+    offset = 12
+    ethertype = struct.unpack_from("!H", frame, offset)[0]
+    while ethertype == 0x8100 and len(frame) >= offset + 6:
+        offset += 4
+        ethertype = struct.unpack_from("!H", frame, offset)[0]
+    if ethertype != ETH_P_LLDP:
+        return None
+
+    neighbor = {
+        'source_mac': ":".join(f"{byte:02x}" for byte in frame[6:12]),
+        'chassis_id': "", 'port_id': "", 'port_id_subtype': 0,
+        'port_description': "", 'system_name': "", 'ttl': 0,
+    }
+    offset += 2
+    while offset + 2 <= len(frame):
+        header = struct.unpack_from("!H", frame, offset)[0]
+        tlv_type, tlv_len = header >> 9, header & 0x1FF
+        value = frame[offset + 2:offset + 2 + tlv_len]
+        offset += 2 + tlv_len
+        if tlv_type == TLV_END:
+            break
+        if tlv_type == TLV_CHASSIS_ID and value:
+            neighbor['chassis_id'] = _format_id(value[0], value[1:], SUBTYPE_CHASSIS_MAC)
+        elif tlv_type == TLV_PORT_ID and value:
+            neighbor['port_id_subtype'] = value[0]
+            neighbor['port_id'] = _format_id(value[0], value[1:], SUBTYPE_PORT_MAC)
+        elif tlv_type == TLV_TTL and len(value) >= 2:
+            neighbor['ttl'] = struct.unpack_from("!H", value)[0]
+        elif tlv_type == TLV_PORT_DESCRIPTION:
+            neighbor['port_description'] = value.decode(errors="replace")
+        elif tlv_type == TLV_SYSTEM_NAME:
+            neighbor['system_name'] = value.decode(errors="replace")
+    return neighbor
+
+
+def build_lldp_frame(port_mac, port_description, system_name, ttl=120):
+    """
+    Builds an LLDPDU announcing a local port (chassis = system name, port ID = port MAC).
+
+    Args:
+        port_mac (str): MAC address of the sending port ("aa:bb:cc:dd:ee:ff").
+        port_description (str): Usually the interface name.
+        system_name (str): Usually the host name.
+        ttl (int): Time-to-live in seconds advertised to the neighbor.
+
+    Returns:
+        bytes: Ethernet frame ready to send on an AF_PACKET socket.
+    """
+    def tlv(tlv_type, value):
+        return struct.pack("!H", (tlv_type << 9) | len(value)) + value
+
+    mac = bytes.fromhex(port_mac.replace(":", ""))
+    body = (tlv(TLV_CHASSIS_ID, bytes([SUBTYPE_LOCAL]) + system_name.encode())
+            + tlv(TLV_PORT_ID, bytes([SUBTYPE_PORT_MAC]) + mac)
+            + tlv(TLV_TTL, struct.pack("!H", ttl))
+            + tlv(TLV_PORT_DESCRIPTION, port_description.encode())
+            + tlv(TLV_SYSTEM_NAME, system_name.encode())
+            + tlv(TLV_END, b""))
+    return LLDP_MULTICAST + mac + struct.pack("!H", ETH_P_LLDP) + body
+
+
+def read_pcap(path):
+    """
+    Reads frames from a classic libpcap file (microsecond or nanosecond, either byte order).
+
+    Returns:
+        list: Raw frames in capture order.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic = data[:4]
+    if magic in (b"\xd4\xc3\xb2\xa1", b"\x4d\x3c\xb2\xa1"):
+        endian = "<"
+    elif magic in (b"\xa1\xb2\xc3\xd4", b"\xa1\xb2\x3c\x4d"):
+        endian = ">"
+    else:
+        raise ValueError(f"{path} is not a pcap file")
+
+    frames, offset = [], 24
+    while offset + 16 <= len(data):
+        _, _, incl_len, _ = struct.unpack_from(endian + "IIII", data, offset)
+        offset += 16
+        frames.append(data[offset:offset + incl_len])
+        offset += incl_len
+    return frames
+
+
+class LldpNeighborCollector(CommonFuntion):
+    """
+    Collects LLDP neighbors on many ports at once without resetting any link, either
+    from lldpad (`lldptool`) or from raw LLDP frames on AF_PACKET sockets.
+
+    Note: E810 ports consume LLDP in firmware unless the `fw-lldp-agent` private flag
+    is turned off, in which case neither lldpad nor raw sockets see the frames.
+    """
+
+    def __init__(self, sysfs_root="/sys"):
+        self.sysfs_root = sysfs_root
+
+    def local_macs(self, interfaces):
+        """
+        Returns:
+            dict: Interface name to lowercase MAC address, read from sysfs.
+        """
+        macs = {}
+        for interface in interfaces:
+            try:
+                with open(os.path.join(self.sysfs_root, "class", "net", interface, "address")) as f:
+                    macs[interface] = f.read().strip().lower()
+            except OSError:
+                pass
+        return macs
+
+    def parse_lldptool_output(self, output):
+        """
+        Parses `lldptool -t -n -i <iface>` neighbor TLV output.
+
+        Returns:
+            dict: Neighbor fields as in parse_lldp_frame(), or None if no neighbor is known.
+        """
+        sections = dict(re.findall(r'^(\S[^\n]*?) TLV\n\s+([^\n]*)', output, re.MULTILINE))
+        if "Chassis ID" not in sections or "Port ID" not in sections:
+            return None
+
+        def strip_subtype(value):
+            # "MAC: 3c:fd:fe:aa:bb:cc" / "Ifname: ens1f0" / "Local: abc"
+            return value.split(":", 1)[1].strip() if re.match(r'^[A-Za-z ]+:', value) else value.strip()
+
+        port_value = sections["Port ID"]
+        return {
+            'source_mac': "",
+            'chassis_id': strip_subtype(sections["Chassis ID"]).lower(),
+            'port_id': strip_subtype(port_value).lower() if port_value.startswith("MAC") else strip_subtype(port_value),
+            'port_id_subtype': SUBTYPE_PORT_MAC if port_value.startswith("MAC") else SUBTYPE_LOCAL,
+            'port_description': sections.get("Port Description", "").strip(),
+            'system_name': sections.get("System Name", "").strip(),
+            'ttl': int(re.sub(r'\D', "", sections.get("Time to Live", "")) or 0),
+        }
+
+    def query_lldptool(self, interfaces):
+        """
+        Reads the neighbors lldpad has already learned, querying all ports concurrently.
+
+        Returns:
+            dict: Interface name to neighbor dict for ports with a known neighbor.
+        """
+        def query(interface):
+            try:
+                success, output = self.run_command(["lldptool", "-t", "-n", "-i", interface],
+                                                   f"Reading LLDP neighbor of {interface}", check_output=True)
+            except OSError as e:
+                # lldptool / lldpad not installed: leave the port to the raw frame capture
+                print(f"⚠️ lldptool unavailable for {interface}: {e}")
+                return interface, None
+            return interface, self.parse_lldptool_output(output) if success else None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(interfaces), 16))) as pool:
+            return {interface: neighbor for interface, neighbor in pool.map(query, interfaces) if neighbor}
+
+    def capture(self, interfaces, timeout=5.0, announce=True):
+        """
+        Listens for LLDP frames on all interfaces at once via AF_PACKET sockets.
+
+        With `announce` every port first sends its own LLDPDU, so ports cabled to each
+        other on this host discover their peers immediately instead of waiting for
+        lldpad's 30 second transmit interval.
+
+        Args:
+            interfaces (list): Interfaces to listen on.
+            timeout (float): Maximum time in seconds to wait for every port to hear a neighbor.
+            announce (bool): Transmit one LLDPDU per port before listening.
+
+        Returns:
+            dict: Interface name to neighbor dict for ports that received LLDP.
+        """
+        macs = self.local_macs(interfaces)
+        sockets, neighbors = {}, {}
+        try:
+            for interface in interfaces:
+                sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_LLDP))
+                sock.bind((interface, ETH_P_LLDP))
+                mreq = struct.pack("iHH8s", socket.if_nametoindex(interface), PACKET_MR_MULTICAST, 6, LLDP_MULTICAST)
+                sock.setsockopt(socket.SOL_PACKET, PACKET_ADD_MEMBERSHIP, mreq)
+                sock.setblocking(False)
+                sockets[sock] = interface
+
+            if announce:
+                hostname = socket.gethostname()
+                for sock, interface in sockets.items():
+                    if interface in macs:
+                        sock.send(build_lldp_frame(macs[interface], interface, hostname))
+
+            deadline = time.monotonic() + timeout
+            while len(neighbors) < len(sockets):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                readable, _, _ = select.select(list(sockets), [], [], remaining)
+                for sock in readable:
+                    frame, address = sock.recvfrom(9000)
+                    if address[2] == PACKET_OUTGOING:
+                        continue  # our own announcement looped back
+                    neighbor = parse_lldp_frame(frame)
+                    if neighbor:
+                        neighbors.setdefault(sockets[sock], neighbor)
+        finally:
+            for sock in sockets:
+                sock.close()
+        return neighbors
+
+    def neighbors_from_pcap(self, path):
+        """
+        Returns:
+            list: Neighbor dicts parsed from the LLDP frames of a recorded pcap sample.
+        """
+        return [neighbor for neighbor in map(parse_lldp_frame, read_pcap(path)) if neighbor]
+
+    def map_peers(self, neighbors, interfaces):
+        """
+        Splits neighbors into links between local ports and ports cabled to other hosts.
+
+        Args:
+            neighbors (dict): Interface name to neighbor dict.
+            interfaces (list): Local interfaces that may appear as peers.
+
+        Returns:
+            tuple: (links, remote) where links are [interface, local_peer] pairs matched by
+                   port MAC and remote maps interface to {'chassis_id', 'port_id', 'system_name'}.
+        """
+        mac_to_interface = {mac: interface for interface, mac in self.local_macs(interfaces).items()}
+        links, remote = [], {}
+        for interface in interfaces:
+            neighbor = neighbors.get(interface)
+            if not neighbor:
+                continue
+            peer = mac_to_interface.get(neighbor['port_id'].lower())
+            if peer is None and neighbor['system_name'] == socket.gethostname():
+                peer = neighbor['port_description'] if neighbor['port_description'] in interfaces else None
+            if peer and peer != interface:
+                links.append([interface, peer])
+            else:
+                remote[interface] = {key: neighbor[key] for key in ('chassis_id', 'port_id', 'system_name')}
+        return links, remote
@@ -0,0 +1,262 @@
+import os
+import re
+import time
+import fnmatch
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.tracing import TRACER
+from script_container.execution.bus_info_details import LinkEventListener
+
+
+# Modules that use another module without showing up in its holders/ directory
+KNOWN_DEPENDENTS = {
+    "ice": ("irdma",),
+}
+
+PCI_ADDRESS = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-7]$")
+
+
+class KernelModuleManager(CommonFuntion):
+    """
+    Loads a freshly installed kernel module only when it differs from the loaded one.
+
+    The loaded module's /sys/module/<mod>/srcversion (and version) is compared with
+    `modinfo` of the installed file; an identical module is left alone, so the links
+    of every port it drives stay up. A reload unloads the dependents first (from
+    holders/ and KNOWN_DEPENDENTS, deepest first), reloads the module, restores the
+    dependents that were loaded, and then waits for the netdevs of the PCI functions
+    the module drives, woken by RTNETLINK events rather than by fixed sleeps.
+    """
+
+    def __init__(self, sysfs_root="/sys", listener_factory=LinkEventListener):
+        """
+        Args:
+            sysfs_root (str): Root of the sysfs tree; point it at a fixture tree for testing.
+            listener_factory (callable): Returns an unstarted LinkEventListener; None polls sysfs.
+        """
+        self.sysfs_root = sysfs_root
+        self.listener_factory = listener_factory
+
+    def _read(self, *parts, default=None):
+        try:
+            with open(os.path.join(*parts), "r") as f:
+                return f.read().strip()
+        except OSError:
+            return default
+
+    def _listdir(self, *parts):
+        try:
+            return sorted(os.listdir(os.path.join(*parts)))
+        except OSError:
+            return []
+
+    # ----------------------------------------------------------------------------------------------
+    #                                   Versions and dependency graph
+    # ----------------------------------------------------------------------------------------------
+
+    def is_loaded(self, module):
+        # Built-in modules also have /sys/module/<mod>, but no initstate
+        return self._read(self.sysfs_root, "module", module, "initstate") == "live"
+
+    def loaded_version(self, module):
+        """
+        Returns:
+            dict: {'version', 'srcversion'} of the loaded module (values may be None),
+                  or None if the module is not loaded.
+        """
+        if not self.is_loaded(module):
+            return None
+        return {'version': self._read(self.sysfs_root, "module", module, "version"),
+                'srcversion': self._read(self.sysfs_root, "module", module, "srcversion")}
+
+    def installed_version(self, module, kernel=None):
+        """
+        Returns:
+            dict: {'version', 'srcversion', 'alias'} of the module file modprobe would load
+                  for `kernel`, or None if modinfo cannot find it.
+        """
+        success, output = self.run_command(["modinfo", "-k", kernel or os.uname().release, module],
+                                           f"Reading installed {module} module info", check_output=True)
+        if not success:
+            return None
+        fields = re.findall(r"^(version|srcversion|alias):\s*(.*)$", output, re.MULTILINE)
+        info = {'version': None, 'srcversion': None, 'alias': []}
+        for key, value in fields:
+            if key == "alias":
+                info['alias'].append(value.strip())
+            else:
+                info[key] = value.strip()
+        return info
+
+    def needs_reload(self, loaded, installed):
+        """
+        Returns:
+            bool: True unless both sides report the same srcversion (or, without srcversion,
+                  the same version). Unknown versions are treated as different.
+        """
+        if loaded is None or installed is None:
+            return True
+        if loaded['srcversion'] and installed['srcversion']:
+            return loaded['srcversion'] != installed['srcversion']
+        return not loaded['version'] or loaded['version'] != installed['version']
+
+    def dependents(self, module):
+        """
+        Returns:
+            list: Loaded modules that must be removed before `module`, deepest first.
+        """
+        order, seen = [], set()
+
+        def visit(name):
+            for holder in self._listdir(self.sysfs_root, "module", name, "holders") + list(KNOWN_DEPENDENTS.get(name, ())):
+                if holder not in seen and self.is_loaded(holder):
+                    seen.add(holder)
+                    visit(holder)
+                    order.append(holder)
+
+        visit(module)
+        return order
+
+    # ----------------------------------------------------------------------------------------------
+    #                                   Devices and netdevs
+    # ----------------------------------------------------------------------------------------------
+
+    def bound_devices(self, module):
+        """
+        Returns:
+            list: PCI addresses currently bound to the module's driver.
+        """
+        return [entry for entry in self._listdir(self.sysfs_root, "bus", "pci", "drivers", module)
+                if PCI_ADDRESS.match(entry)]
+
+    def claimable_devices(self, aliases):
+        """
+        Returns:
+            list: Unbound PCI devices whose modalias matches one of the module aliases, i.e.
+                  the devices a first load will bind (vfio-pci bound ports are left out).
+        """
+        patterns = [alias for alias in aliases if alias.startswith("pci:")]
+        devices = []
+        for address in self._listdir(self.sysfs_root, "bus", "pci", "devices"):
+            if os.path.exists(os.path.join(self.sysfs_root, "bus", "pci", "devices", address, "driver")):
+                continue
+            modalias = self._read(self.sysfs_root, "bus", "pci", "devices", address, "modalias", default="")
+            if modalias and any(fnmatch.fnmatchcase(modalias, pattern) for pattern in patterns):
+                devices.append(address)
+        return devices
+
+    def netdevs(self, devices):
+        """
+        Returns:
+            dict: PCI address to its netdev names (empty list while not created yet).
+        """
+        return {address: self._listdir(self.sysfs_root, "bus", "pci", "devices", address, "net")
+                for address in devices}
+
+    def wait_for_netdevs(self, devices, listener=None, timeout=60.0, poll_interval=0.1):
+        """
+        Waits until every PCI device has a netdev. With a listener, sysfs is re-checked on
+        each RTNETLINK event; otherwise it is polled.
+
+        Returns:
+            dict: PCI address to netdev names at the end of the wait.
+        """
+        def ready(_events=None):
+            return all(self.netdevs(devices).values())
+
+        if devices:
+            if listener is not None:
+                listener.wait_for(ready, timeout)
+            else:
+                deadline = time.monotonic() + timeout
+                while not ready() and time.monotonic() < deadline:
+                    time.sleep(poll_interval)
+        return self.netdevs(devices)
+
+    # ----------------------------------------------------------------------------------------------
+    #                                   Reload
+    # ----------------------------------------------------------------------------------------------
+
+    def _restore(self, modules):
+        for name in modules:
+            if not self.is_loaded(name):
+                self.run_command(["modprobe", name], f"Restoring {name} module")
+
+    def ensure_current(self, module, kernel=None, timeout=60.0):
+        """
+        Makes the installed version of `module` the loaded one, touching nothing when it already is.
+
+        Args:
+            module (str): Module name, e.g. "ice".
+            kernel (str): Kernel the module was installed for, defaults to the running one.
+            timeout (float): Maximum wait in seconds for the netdevs after a (re)load.
+
+        Returns:
+            dict: {'action': 'unchanged' | 'loaded' | 'reloaded' | 'failed',
+                   'version': installed version, 'netdevs': {pci address: [netdev, ...]}}
+        """
+        loaded = self.loaded_version(module)
+        installed = self.installed_version(module, kernel)
+        result = {'action': "unchanged", 'version': (installed or {}).get('version'), 'netdevs': {}}
+
+        if loaded is not None and not self.needs_reload(loaded, installed):
+            print(f"✅ {module} {loaded['version'] or ''} ({loaded['srcversion']}) is already loaded, not reloading.")
+            result['netdevs'] = self.netdevs(self.bound_devices(module))
+            return result
+
+        devices = self.bound_devices(module) if loaded is not None else \
+            self.claimable_devices((installed or {}).get('alias', []))
+        dependents = self.dependents(module) if loaded is not None else []
+        if loaded is not None:
+            print(f"🔁 Reloading {module}: loaded {loaded['version']} ({loaded['srcversion']}), "
+                  f"installed {result['version']} ({(installed or {}).get('srcversion')}).")
+
+        listener = None
+        if self.listener_factory is not None:
+            try:
+                listener = self.listener_factory().start()
+            except OSError as e:
+                print(f"⚠️ Netlink unavailable ({e}), polling sysfs for netdevs.")
+
+        with TRACER.span(f"Reloading {module}", "module", module=module, dependents=dependents) as span:
+            try:
+                removed = []
+                for name in dependents + ([module] if loaded is not None else []):
+                    success, _ = self.run_command(["rmmod", name], f"Removing {name} module")
+                    if not success:
+                        # The old module stays loaded; put back what was already removed
+                        print(f"❌ Could not remove {name}, {module} was not reloaded.")
+                        self._restore(reversed(removed))
+                        result['action'] = "failed"
+                        return result
+                    removed.append(name)
+                success, _ = self.run_command(["modprobe", module], f"Loading {module} module")
+                if not success:
+                    result['action'] = "failed"
+                    return result
+                self._restore(reversed(dependents))
+
+                now_loaded = self.loaded_version(module)
+                if installed and installed['srcversion'] and \
+                        (now_loaded or {}).get('srcversion') != installed['srcversion']:
+                    print(f"❌ {module} srcversion is {(now_loaded or {}).get('srcversion')} after loading, "
+                          f"expected {installed['srcversion']}.")
+                    result['action'] = "failed"
+                    return result
+
+                started = time.monotonic()
+                result['netdevs'] = self.wait_for_netdevs(devices, listener, timeout)
+                span['netdev_wait'] = round(time.monotonic() - started, 3)
+            finally:
+                if listener is not None:
+                    listener.stop()
+                # Netdevs are recreated (and renamed by udev) after modprobe returns, so
+                # drop any `ip -br a` / `ethtool -i` output cached while they settled
+                self.command_cache.invalidate()
+
+        result['action'] = "reloaded" if loaded is not None else "loaded"
+        missing = [address for address, names in result['netdevs'].items() if not names]
+        if missing:
+            print(f"⚠️ No netdev after {timeout:.0f}s for {', '.join(missing)}")
+        else:
+            print(f"✅ {module} {result['action']}, {len(devices)} netdev(s) ready.")
+        return result
@@ -0,0 +1,230 @@
+import os
+
+
+# pci.ids locations used by pciutils / hwdata on Ubuntu and RHEL
+PCI_IDS_PATHS = (
+    "/usr/share/misc/pci.ids",
+    "/usr/share/hwdata/pci.ids",
+    "/usr/share/pci.ids",
+)
+
+# sysfs attributes captured by NicInventory.snapshot() for record/replay
+SNAPSHOT_NET_ATTRIBUTES = ("address", "carrier", "operstate", "flags", "ifindex")
+SNAPSHOT_PCI_ATTRIBUTES = ("vendor", "device", "subsystem_vendor", "subsystem_device", "numa_node")
+
+
+class NicInventory:
+    """
+    Builds the network device inventory straight from sysfs, as a fast in-process
+    replacement for `lshw -c network -businfo`.
+
+    Each record carries the same 'bus', 'device' and 'description' keys that
+    PairingManagerInfo.busInfo() parses out of lshw, plus MAC, driver, NUMA node
+    and PCI IDs. With an EthtoolIoctl it also carries firmware version, link speed
+    and link-detected state, read in one in-process pass.
+    """
+
+    def __init__(self, sysfs_root="/sys", pci_ids_paths=PCI_IDS_PATHS, ethtool=None):
+        """
+        Args:
+            sysfs_root (str): Root of the sysfs tree; point it at a fixture tree for testing.
+            pci_ids_paths (tuple): Candidate pci.ids files used to resolve device descriptions.
+            ethtool (EthtoolIoctl): Optional ioctl layer used to add firmware and link details.
+        """
+        self.sysfs_root = sysfs_root
+        self.pci_ids_paths = pci_ids_paths
+        self.ethtool = ethtool
+        self.records = []
+
+    def _read(self, *parts, default=""):
+        try:
+            with open(os.path.join(*parts), "r") as f:
+                return f.read().strip()
+        except OSError:
+            return default
+
+    def pci_names(self, ids):
+        """
+        Resolves PCI device names from pci.ids, scanning only the vendors that are needed.
+
+        Args:
+            ids (set): (vendor, device) pairs as 4-digit lowercase hex strings.
+
+        Returns:
+            dict: Mapping of (vendor, device) to device name.
+        """
+        vendors = {vendor for vendor, _ in ids}
+        names = {}
+        path = next((p for p in self.pci_ids_paths if os.path.exists(p)), None)
+        if not path or not ids:
+            return names
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            vendor = None
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                if line[0] != "\t":
+                    if line.startswith("C "):
+                        break  # device classes follow the vendor list
+                    vendor = line[:4] if line[:4] in vendors else None
+                elif vendor and line[1] != "\t":
+                    device = line[1:5]
+                    if (vendor, device) in ids:
+                        names[(vendor, device)] = line[5:].strip()
+        return names
+
+    def collect(self):
+        """
+        Walks /sys/class/net and reads PCI attributes for every PCI-backed netdev.
+
+        Returns:
+            list: Records sorted by PCI address, e.g.
+                {'bus': 'pci@0000:ca:00.0', 'device': 'ens802f0np0',
+                 'description': 'Ethernet Controller E810-C for QSFP', 'mac': '...',
+                 'driver': 'ice', 'driver_version': '1.13.7', 'numa_node': 1,
+                 'vendor_id': '8086', 'device_id': '1592',
+                 'subsystem_vendor_id': '8086', 'subsystem_device_id': '0002'}
+        """
+        net_root = os.path.join(self.sysfs_root, "class", "net")
+        pci_root = os.path.join(self.sysfs_root, "bus", "pci", "devices")
+        records = []
+
+        try:
+            interfaces = sorted(os.listdir(net_root))
+        except OSError as e:
+            print(f"❌ Error reading {net_root}: {e}")
+            return []
+
+        for interface in interfaces:
+            device_link = os.path.join(net_root, interface, "device")
+            if not os.path.islink(device_link):
+                continue  # virtual interface (lo, bridges, bonds, ...)
+            pci_address = os.path.basename(os.readlink(device_link))
+            pci_path = os.path.join(pci_root, pci_address)
+            if not os.path.exists(os.path.join(pci_path, "vendor")):
+                continue  # not a PCI function (e.g. USB NIC)
+
+            driver_link = os.path.join(pci_path, "driver")
+            driver = os.path.basename(os.readlink(driver_link)) if os.path.islink(driver_link) else ""
+            numa_node = self._read(pci_path, "numa_node", default="-1")
+            records.append({
+                'bus': f"pci@{pci_address}",
+                'device': interface,
+                'description': "",
+                'mac': self._read(net_root, interface, "address"),
+                'driver': driver,
+                'driver_version': self._read(self.sysfs_root, "module", driver, "version") if driver else "",
+                'numa_node': int(numa_node) if numa_node.lstrip("-").isdigit() else -1,
+                'vendor_id': self._read(pci_path, "vendor").replace("0x", ""),
+                'device_id': self._read(pci_path, "device").replace("0x", ""),
+                'subsystem_vendor_id': self._read(pci_path, "subsystem_vendor").replace("0x", ""),
+                'subsystem_device_id': self._read(pci_path, "subsystem_device").replace("0x", ""),
+            })
+
+        if self.ethtool is not None:
+            details = self.ethtool.collect([record['device'] for record in records])
+            for record in records:
+                info = details.get(record['device'], {})
+                record['firmware_version'] = info.get('firmware_version', "")
+                record['speed'] = info.get('speed')
+                record['link_detected'] = info.get('link_detected')
+
+        names = self.pci_names({(r['vendor_id'], r['device_id']) for r in records})
+        for record in records:
+            record['description'] = names.get(
+                (record['vendor_id'], record['device_id']),
+                f"Ethernet device {record['vendor_id']}:{record['device_id']}")
+
+        self.records = sorted(records, key=lambda r: r['bus'])
+        return self.records
+
+    def snapshot(self):
+        """
+        Captures the sysfs attributes read by collect(), the carrier checks and the LLDP
+        collector, so a recorded run can be replayed on another host.
+
+        Returns:
+            dict: 'files' (path relative to the sysfs root to content) and 'links'
+                  (path to link target, both relative to the sysfs root).
+        """
+        files, links = {}, {}
+
+        def capture(*parts):
+            try:
+                with open(os.path.join(self.sysfs_root, *parts), "r") as f:
+                    files["/".join(parts)] = f.read()
+            except OSError:
+                pass  # absent, or unreadable in the current state (e.g. carrier of a DOWN port)
+
+        net_root = os.path.join(self.sysfs_root, "class", "net")
+        try:
+            interfaces = sorted(os.listdir(net_root))
+        except OSError as e:
+            print(f"❌ Error reading {net_root}: {e}")
+            return {'files': files, 'links': links}
+
+        for interface in interfaces:
+            for attribute in SNAPSHOT_NET_ATTRIBUTES:
+                capture("class", "net", interface, attribute)
+            device_link = os.path.join(net_root, interface, "device")
+            if not os.path.islink(device_link):
+                continue
+            pci_address = os.path.basename(os.readlink(device_link))
+            links[f"class/net/{interface}/device"] = f"bus/pci/devices/{pci_address}"
+            for attribute in SNAPSHOT_PCI_ATTRIBUTES:
+                capture("bus", "pci", "devices", pci_address, attribute)
+            driver_link = os.path.join(self.sysfs_root, "bus", "pci", "devices", pci_address, "driver")
+            if os.path.islink(driver_link):
+                driver = os.path.basename(os.readlink(driver_link))
+                links[f"bus/pci/devices/{pci_address}/driver"] = f"bus/pci/drivers/{driver}"
+                capture("module", driver, "version")
+        return {'files': files, 'links': links}
+
+    @staticmethod
+    def restore(snapshot, directory):
+        """
+        Rebuilds a sysfs tree captured by snapshot() under `directory`.
+
+        Returns:
+            str: `directory`, to be used as sysfs_root.
+        """
+        for path, content in snapshot.get('files', {}).items():
+            target = os.path.join(directory, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w") as f:
+                f.write(content)
+        for path, target in snapshot.get('links', {}).items():
+            link = os.path.join(directory, path)
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            os.symlink(os.path.join(directory, target), link)
+        return directory
+
+    def bus_info(self):
+        """
+        Returns:
+            list: Records reduced to the 'bus', 'device', 'description' keys of busInfo().
+        """
+        return [{key: record[key] for key in ('bus', 'device', 'description')} for record in self.collect()]
+
+    def format_table(self, records=None):
+        """
+        Renders the inventory as an lshw-style table for console display.
+
+        Args:
+            records (list): Records to render; collected from sysfs if omitted.
+
+        Returns:
+            str: Table text.
+        """
+        records = self.collect() if records is None else records
+        rows = [("Bus info", "Device", "Driver", "NUMA", "MAC", "Firmware", "Speed", "Link", "Description")]
+        for r in records:
+            speed = f"{r['speed']}Mb/s" if r.get('speed') else "-"
+            link = {True: "yes", False: "no"}.get(r.get('link_detected'), "-")
+            rows.append((r['bus'], r['device'], r['driver'], str(r['numa_node']), r['mac'],
+                         r.get('firmware_version') or "-", speed, link, r['description']))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+        lines = ["  ".join(col.ljust(width) for col, width in zip(row, widths)) + "  " + row[-1] for row in rows]
+        lines.insert(1, "=" * len(lines[0]))
+        return "\n".join(lines)
@@ -0,0 +1,150 @@
+import re
+import time
+from collections import deque
+
+
+# Longest line handed to handlers; longer lines are split so memory stays bounded
+MAX_LINE_LENGTH = 65536
+
+
+class StreamCapture:
+    """
+    Line-by-line sink for the output of a streamed command.
+
+    Each line goes through the pluggable handlers and then into a fixed-size ring
+    buffer, so only the last `tail_lines` lines are ever held in memory no matter
+    how much the command prints (`tar -xvf`, `make`, `nvmupdate64e`, `./dts`).
+    """
+
+    def __init__(self, handlers=(), tail_lines=200):
+        """
+        Args:
+            handlers (list): Callables taking one line (without the trailing newline).
+            tail_lines (int): Number of most recent lines kept for error reports.
+        """
+        self.handlers = list(handlers)
+        self.tail_buffer = deque(maxlen=tail_lines)
+        self.line_count = 0
+        self.byte_count = 0
+
+    def feed(self, line):
+        line = line.rstrip("\r\n")
+        self.line_count += 1
+        self.byte_count += len(line) + 1
+        for handler in self.handlers:
+            try:
+                handler(line)
+            except Exception as e:
+                print(f"⚠️ Output handler {type(handler).__name__} failed: {e}")
+        self.tail_buffer.append(line)
+
+    def feed_text(self, text):
+        """
+        Feeds an already captured block of output (e.g. a replayed recording).
+        """
+        for line in text.splitlines():
+            self.feed(line)
+
+    def close(self):
+        for handler in self.handlers:
+            if hasattr(handler, "close"):
+                handler.close()
+
+    def tail(self):
+        """
+        Returns:
+            str: The buffered last lines, newline-joined.
+        """
+        return "\n".join(self.tail_buffer)
+
+
+class EchoHandler:
+    """
+    Prints every line, optionally prefixed, for commands the operator wants to watch.
+    """
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+
+    def __call__(self, line):
+        print(f"{self.prefix}{line}")
+
+
+class ProgressHandler:
+    """
+    Periodic progress line instead of the full output: reports the latest percentage
+    found in the output, or else the number of lines seen (e.g. files unpacked by tar).
+    """
+
+    PERCENT = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+
+    def __init__(self, description, unit="lines", interval=5.0):
+        """
+        Args:
+            description (str): Label printed with each progress report.
+            unit (str): What one output line represents ("files", "lines", ...).
+            interval (float): Minimum seconds between two reports.
+        """
+        self.description = description
+        self.unit = unit
+        self.interval = interval
+        self.count = 0
+        self.percent = None
+        self.last_report = time.monotonic()
+
+    def __call__(self, line):
+        self.count += 1
+        match = self.PERCENT.search(line)
+        if match:
+            self.percent = float(match.group(1))
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        if self.percent is not None:
+            print(f"⏳ {self.description}: {self.percent:.0f}%")
+        else:
+            print(f"⏳ {self.description}: {self.count} {self.unit}")
+
+    def close(self):
+        print(f"📦 {self.description}: {self.count} {self.unit} total")
+
+
+class PatternAlertHandler:
+    """
+    Flags lines matching error/warning patterns as they stream by and keeps a
+    bounded sample of them for the final report.
+    """
+
+    DEFAULT_PATTERNS = {
+        'error': r'\berror\b|\bfailed\b|\bfatal\b',
+        'warning': r'\bwarning\b',
+    }
+
+    def __init__(self, patterns=None, keep=20, echo=True):
+        """
+        Args:
+            patterns (dict): Alert name to regular expression (matched case-insensitively).
+            keep (int): Matching lines kept per alert name.
+            echo (bool): Print each matching line immediately.
+        """
+        patterns = self.DEFAULT_PATTERNS if patterns is None else patterns
+        self.patterns = {name: re.compile(regex, re.IGNORECASE) for name, regex in patterns.items()}
+        self.counts = {name: 0 for name in patterns}
+        self.matches = {name: deque(maxlen=keep) for name in patterns}
+        self.echo = echo
+
+    def __call__(self, line):
+        for name, pattern in self.patterns.items():
+            if pattern.search(line):
+                self.counts[name] += 1
+                self.matches[name].append(line)
+                if self.echo:
+                    print(f"🚨 [{name}] {line}")
+
+    def close(self):
+        found = {name: count for name, count in self.counts.items() if count}
+        if found:
+            print("🚨 Alerts: " + ", ".join(f"{name}={count}" for name, count in found.items()))
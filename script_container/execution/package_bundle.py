@@ -0,0 +1,438 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import platform
+from urllib.parse import unquote
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.step_journal import file_digest
+from script_container.execution.provisioning import PackageProvisioner
+from script_container.execution.output_stream import ProgressHandler, PatternAlertHandler
+
+
+BUNDLE_MANIFEST = "manifest.json"
+BUNDLE_FORMAT = 1
+
+# Control fields read from every bundled .deb to work out what a host actually needs
+DEB_CONTROL_FIELDS = ("Package", "Version", "Depends", "Pre-Depends", "Provides")
+
+
+def os_release(path="/etc/os-release"):
+    """
+    Returns:
+        dict: KEY=value pairs of os-release with quotes stripped.
+    """
+    release = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep:
+                    release[key] = value.strip('"')
+    except OSError:
+        pass
+    return release
+
+
+def deb_name_version(filename):
+    """
+    Splits an `apt-get download` file name ("libfoo_1%3a2.0-1_amd64.deb").
+
+    Returns:
+        tuple: (package name, version) with the epoch colon decoded.
+    """
+    name, _, rest = os.path.basename(filename).partition("_")
+    return name, unquote(rest.rpartition("_")[0])
+
+
+def _order(char):
+    # dpkg ordering: "~" sorts before everything, even the end of the string; letters before symbols
+    if char == "~":
+        return -1
+    if char.isalpha():
+        return ord(char)
+    return ord(char) + 256 if char else 0
+
+
+def _compare_fragment(a, b):
+    i = j = 0
+    while i < len(a) or j < len(b):
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _order(a[i]) if i < len(a) and not a[i].isdigit() else 0
+            bc = _order(b[j]) if j < len(b) and not b[j].isdigit() else 0
+            if ac != bc:
+                return ac - bc
+            i, j = i + 1, j + 1
+        start_i, start_j = i, j
+        while i < len(a) and a[i].isdigit():
+            i += 1
+        while j < len(b) and b[j].isdigit():
+            j += 1
+        diff = int(a[start_i:i] or 0) - int(b[start_j:j] or 0)
+        if diff:
+            return diff
+    return 0
+
+
+def compare_deb_versions(a, b):
+    """
+    Compares two Debian versions ([epoch:]upstream[-revision]) like `dpkg --compare-versions`.
+
+    Returns:
+        int: Negative if a < b, 0 if equal, positive if a > b.
+    """
+    def split(version):
+        epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+        upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "")
+        return int(epoch or 0), upstream, revision
+
+    (epoch_a, upstream_a, revision_a), (epoch_b, upstream_b, revision_b) = split(a), split(b)
+    return (epoch_a - epoch_b) or _compare_fragment(upstream_a, upstream_b) or \
+        _compare_fragment(revision_a, revision_b)
+
+
+def parse_deb_relations(field):
+    """
+    Parses a Depends-style field ("libc6 (>= 2.34), debconf | debconf-2.0").
+
+    Returns:
+        list: One list of (name, operator, version) alternatives per comma-separated
+              group; operator and version are None for unversioned relations.
+    """
+    groups = []
+    for group in (field or "").split(","):
+        alternatives = []
+        for alternative in group.split("|"):
+            # Architecture qualifiers ("python3:any") do not matter for a same-arch bundle
+            match = re.match(r'^\s*([^\s(:]+)(?::\S+)?\s*(?:\(\s*([<>=]+)\s*([^\s)]+)\s*\))?', alternative)
+            if match:
+                alternatives.append(match.groups())
+        if alternatives:
+            groups.append(alternatives)
+    return groups
+
+
+def deb_version_satisfies(version, operator, required):
+    """
+    Returns:
+        bool: True if `version` meets the relation (`operator` None means any version).
+    """
+    if operator is None:
+        return True
+    if not version:
+        return False
+    comparison = compare_deb_versions(version, required)
+    return {'<<': comparison < 0, '<=': comparison <= 0, '<': comparison <= 0, '=': comparison == 0,
+            '>=': comparison >= 0, '>>': comparison > 0, '>': comparison >= 0}.get(operator, False)
+
+
+class PackageBundle(CommonFuntion):
+    """
+    Offline package bundle: the full `.deb` dependency closure of the apt packages plus
+    a pip wheelhouse, with a manifest of SHA-256 checksums.
+
+    One networked host runs build(); every other bench runs install() from the bundle
+    directory (local disk or NFS) without touching the network.
+
+    Layout:
+        <bundle>/manifest.json   version, platform, package lists, file checksums
+        <bundle>/debs/*.deb
+        <bundle>/wheels/*.whl / *.tar.gz
+    """
+
+    def __init__(self, provisioner=None):
+        """
+        Args:
+            provisioner (PackageProvisioner): Source of the installed-package state used to
+                                              install only what a host is missing.
+        """
+        self.provisioner = provisioner if provisioner is not None else PackageProvisioner()
+
+    @staticmethod
+    def platform_id():
+        release = os_release()
+        return f"{release.get('ID', 'linux')}-{release.get('VERSION_CODENAME') or release.get('VERSION_ID', '')}-{platform.machine()}"
+
+    @staticmethod
+    def bundle_version(apt_packages, pip_packages, platform_id):
+        """
+        Returns:
+            str: Short hash identifying a bundle built from these lists for this platform.
+        """
+        payload = json.dumps([sorted(apt_packages), sorted(pip_packages), platform_id])
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def resolve_apt_closure(self, apt_packages):
+        """
+        Resolves the recursive Depends/PreDepends closure of the packages.
+
+        Returns:
+            list: Real (non-virtual) package names, sorted.
+        """
+        success, output = self.run_command(
+            ["apt-cache", "depends", "--recurse", "--no-recommends", "--no-suggests", "--no-conflicts",
+             "--no-breaks", "--no-replaces", "--no-enhances"] + list(apt_packages),
+            "Resolving apt dependency closure", check_output=True)
+        if not success:
+            return []
+        # Package names are the unindented lines; virtual packages are printed as <name>
+        return sorted({line.strip() for line in output.splitlines()
+                       if line and not line[0].isspace() and not line.startswith("<")})
+
+    def build(self, output_dir, apt_packages, pip_packages, python_version=None):
+        """
+        Downloads the bundle into <output_dir>/<platform>-<version>.
+
+        Args:
+            output_dir (str): Directory that receives the versioned bundle.
+            apt_packages (list): apt packages to bundle (dependencies are added).
+            pip_packages (list): pip requirements to bundle (dependencies are added by pip).
+            python_version (str): Target interpreter version for the wheels ("3.12"),
+                                  defaults to this interpreter.
+
+        Returns:
+            str: Bundle directory, or None if a download failed.
+        """
+        platform_id = self.platform_id()
+        version = self.bundle_version(apt_packages, pip_packages, platform_id)
+        bundle_dir = os.path.abspath(os.path.join(output_dir, f"{platform_id}-{version}"))
+        # Built in a fresh directory and renamed into place: files left by an earlier or
+        # interrupted build never end up in the manifest
+        build_dir = f"{bundle_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(build_dir, ignore_errors=True)
+        try:
+            return self._build_into(build_dir, bundle_dir, version, platform_id, apt_packages, pip_packages,
+                                    python_version)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def _build_into(self, build_dir, bundle_dir, version, platform_id, apt_packages, pip_packages, python_version):
+        debs_dir, wheels_dir = os.path.join(build_dir, "debs"), os.path.join(build_dir, "wheels")
+        os.makedirs(debs_dir)
+        os.makedirs(wheels_dir)
+
+        closure = self.resolve_apt_closure(apt_packages)
+        if not closure:
+            print("❌ Could not resolve the apt dependency closure.")
+            return None
+        print(f"📦 Bundling {len(closure)} .deb packages for {len(apt_packages)} requested apt packages.")
+
+        # apt-get download writes into the current directory; env -C keeps our cwd untouched
+        success, _ = self.run_command_streaming(
+            ["env", "-C", debs_dir, "apt-get", "download"] + closure, "Downloading .deb closure",
+            [ProgressHandler("apt-get download", unit="packages"), PatternAlertHandler({'error': r'^E:'})])
+        if not success:
+            return None
+
+        python_version = python_version or f"{sys.version_info.major}.{sys.version_info.minor}"
+        success, _ = self.run_command_streaming(
+            ["pip3", "download", "--dest", wheels_dir, "--python-version", python_version, "--only-binary=:all:"]
+            + list(pip_packages), "Downloading Python wheelhouse",
+            [ProgressHandler("pip download", unit="lines"), PatternAlertHandler({'error': r'^ERROR:'})])
+        if not success:
+            # Some requirements only ship sdists; fetch them for this interpreter instead
+            success, _ = self.run_command_streaming(
+                ["pip3", "download", "--dest", wheels_dir] + list(pip_packages), "Downloading Python packages",
+                [ProgressHandler("pip download", unit="lines"), PatternAlertHandler({'error': r'^ERROR:'})])
+            if not success:
+                return None
+
+        files = {}
+        for path in sorted(glob.glob(os.path.join(debs_dir, "*")) + glob.glob(os.path.join(wheels_dir, "*"))):
+            files[os.path.relpath(path, build_dir)] = file_digest(path)
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'version': version,
+            'platform': platform_id,
+            'python_version': python_version,
+            'created_at': time.time(),
+            'apt_packages': list(apt_packages),
+            'apt_closure': closure,
+            'pip_packages': list(pip_packages),
+            'files': files,
+            'content_digest': hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest(),
+        }
+        with open(os.path.join(build_dir, BUNDLE_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+        os.rename(build_dir, bundle_dir)
+        print(f"✅ Package bundle {version} written to {bundle_dir} ({len(files)} files).")
+        return bundle_dir
+
+    def load_manifest(self, bundle_dir):
+        with open(os.path.join(bundle_dir, BUNDLE_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+
+    def verify(self, bundle_dir):
+        """
+        Checks every file of the bundle against its manifest checksum.
+
+        Returns:
+            list: Relative paths that are missing or corrupted (empty when the bundle is intact).
+        """
+        manifest = self.load_manifest(bundle_dir)
+        return [path for path, digest in manifest['files'].items()
+                if file_digest(os.path.join(bundle_dir, path)) != digest]
+
+    def deb_controls(self, bundle_dir, paths):
+        """
+        Reads DEB_CONTROL_FIELDS of bundled .debs with `dpkg-deb --field`, concurrently.
+
+        Args:
+            bundle_dir (str): Bundle directory.
+            paths (list): .deb paths relative to the bundle.
+
+        Returns:
+            dict: Relative path to {field: value}; Package and Version fall back to the
+                  file name when a .deb cannot be read.
+        """
+        results = self.run_commands_concurrently([
+            {'command': ["dpkg-deb", "--field", os.path.join(bundle_dir, path)] + list(DEB_CONTROL_FIELDS),
+             'check_output': True, 'description': f"Reading control fields of {os.path.basename(path)}"}
+            for path in paths])
+        controls = {}
+        for path, (success, output) in zip(paths, results):
+            name, version = deb_name_version(path)
+            # Folded lines of long fields start with a space and continue the previous field
+            fields = dict(re.findall(r'^(\S+):\s*(.*(?:\n\s.*)*)', output if success else "", re.MULTILINE))
+            controls[path] = {'Package': fields.get('Package', name), 'Version': fields.get('Version', version),
+                              **{key: " ".join(fields.get(key, "").split())
+                                 for key in ("Depends", "Pre-Depends", "Provides")}}
+        return controls
+
+    @staticmethod
+    def select_debs(controls, packages, installed):
+        """
+        Picks the bundled .debs needed to install `packages`: the packages themselves and,
+        recursively, each dependency the host does not satisfy yet (missing, or installed
+        at a version outside the required range). Packages that are already installed
+        and satisfy their dependents are left alone, even if the bundle has a newer
+        version, so base packages such as libc6 are not upgraded as a side effect.
+
+        Args:
+            controls (dict): Result of deb_controls().
+            packages (list): Package names to install.
+            installed (dict): Package name to installed version (with Provides).
+
+        Returns:
+            list: Relative .deb paths to hand to apt, sorted.
+        """
+        bundled, provided = {}, {}
+        for path, control in controls.items():
+            bundled.setdefault(control['Package'], (path, control['Version']))
+            for (name, _, version), *_ in parse_deb_relations(control.get('Provides')):
+                provided.setdefault(name, (path, version))
+
+        selected, chosen = set(), {}
+
+        def satisfied(name, operator, version):
+            for available in (chosen, installed):
+                if name in available and deb_version_satisfies(available[name], operator, version):
+                    return True
+            return False
+
+        queue = list(packages)
+        while queue:
+            name = queue.pop(0)
+            path, version = bundled.get(name) or provided.get(name) or (None, None)
+            if path is None:
+                print(f"⚠️ {name} is not in the bundle, leaving it to apt.")
+                continue
+            if path in selected:
+                continue
+            selected.add(path)
+            control = controls[path]
+            chosen[control['Package']] = control['Version']
+            for (provided_name, _, provided_version), *_ in parse_deb_relations(control.get('Provides')):
+                chosen.setdefault(provided_name, provided_version or control['Version'])
+
+            for group in parse_deb_relations(control.get('Pre-Depends')) + parse_deb_relations(control.get('Depends')):
+                if any(satisfied(*alternative) for alternative in group):
+                    continue
+                # First alternative the bundle can satisfy; apt reports the rest
+                for alternative, operator, version in group:
+                    candidate = bundled.get(alternative) or provided.get(alternative)
+                    if candidate and deb_version_satisfies(candidate[1], operator, version):
+                        queue.append(alternative)
+                        break
+        return sorted(selected)
+
+    def install(self, bundle_dir, apt_packages=None, pip_packages=None):
+        """
+        Installs the packages a host is missing from the bundle, without network access.
+
+        Args:
+            bundle_dir (str): Bundle directory created by build().
+            apt_packages (list): apt packages to ensure; defaults to the bundle's list.
+            pip_packages (list): pip requirements to ensure; defaults to the bundle's list.
+
+        Returns:
+            bool: True if everything needed was installed.
+        """
+        try:
+            manifest = self.load_manifest(bundle_dir)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error reading package bundle {bundle_dir}: {e}")
+            return False
+        if manifest.get('platform') != self.platform_id():
+            print(f"❌ Bundle is for {manifest.get('platform')}, this host is {self.platform_id()}.")
+            return False
+        corrupted = self.verify(bundle_dir)
+        if corrupted:
+            print(f"❌ Bundle {manifest['version']} failed checksum verification: {corrupted}")
+            return False
+
+        apt_packages = manifest['apt_packages'] if apt_packages is None else apt_packages
+        pip_packages = manifest['pip_packages'] if pip_packages is None else pip_packages
+        plan = self.provisioner.plan(apt_packages, pip_packages)
+        print(f"📦 Installing from bundle {manifest['version']}: {plan['already_installed']} already installed, "
+              f"{len(plan['apt'])} apt and {len(plan['pip'])} pip package(s) missing.")
+
+        success = True
+        if plan['apt']:
+            # The bundle holds the full closure; only the missing packages and the dependencies
+            # this host does not satisfy are handed to apt, which orders them itself
+            controls = self.deb_controls(bundle_dir, [path for path in manifest['files'] if path.startswith("debs/")])
+            debs = [os.path.join(bundle_dir, path)
+                    for path in self.select_debs(controls, plan['apt'], self.provisioner.installed_apt_packages())]
+            print(f"📦 {len(debs)} of {len(controls)} bundled .deb packages are needed on this host.")
+            success &= self.run_command_streaming(
+                ["apt-get", "install", "-y", "--no-download"] + debs, "Installing .deb packages from bundle",
+                [ProgressHandler("apt-get install", unit="lines"), PatternAlertHandler({'error': r'^E:'})])[0]
+        if plan['pip']:
+            success &= self.run_command_streaming(
+                self.provisioner.pip_command + ["install", "--no-index", "--find-links",
+                                                os.path.join(bundle_dir, "wheels")] + plan['pip']
+                + ["--break-system-packages"], "Installing Python packages from bundle",
+                [ProgressHandler("pip install", unit="lines"), PatternAlertHandler({'error': r'^ERROR:'})])[0]
+        return success
+
+
+def latest_bundle(bundle_root):
+    """
+    Returns:
+        str: The newest bundle directory under `bundle_root` matching this platform, or None.
+    """
+    prefix = PackageBundle.platform_id() + "-"
+    candidates = [path for path in glob.glob(os.path.join(bundle_root, prefix + "*"))
+                  if os.path.isfile(os.path.join(path, BUNDLE_MANIFEST))]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+if __name__ == "__main__":
+    # python -m script_container.execution.package_bundle build|install|verify <dir>
+    from script_container.execution.setup_installation import AutomationScriptForSetupInstalltion as Setup
+
+    action, path = sys.argv[1], sys.argv[2]
+    bundle = PackageBundle()
+    if action == "build":
+        sys.exit(0 if bundle.build(path, Setup.APT_PACKAGES, Setup.PIP_PACKAGES) else 1)
+    if action == "verify":
+        bad = bundle.verify(path)
+        print(json.dumps(bad, indent=2) if bad else "✅ Bundle intact.")
+        sys.exit(1 if bad else 0)
+    sys.exit(0 if bundle.install(latest_bundle(path) or path) else 1)
@@ -0,0 +1,294 @@
+import time
+import secrets
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from script_container.execution.tracing import TRACER
+from script_container.execution.step_journal import StepJournal
+
+
+class PipelineError(Exception):
+    """
+    Raised when a pipeline is declared inconsistently or one of its steps fails.
+    """
+
+
+class PipelineStep:
+    """
+    One named unit of the setup pipeline.
+
+    Dependencies are derived from data: a step runs once every step producing one
+    of its `inputs` has finished. `resources` name process-wide state the step
+    needs exclusively (e.g. "cwd" for steps that os.chdir(), "apt" for the dpkg lock).
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), resources=(), enabled=True, fingerprint=None,
+                 verify=None):
+        """
+        Args:
+            name (str): Step name shown in logs, traces and the timing report.
+            func (callable): Called with the shared context dict; returns a dict with
+                             the declared outputs (or None if it declares none). A step
+                             fails by raising or by returning False.
+            inputs (list): Context keys the step reads.
+            outputs (list): Context keys the step writes.
+            resources (list): Exclusive resources held while the step runs.
+            enabled (bool): Disabled steps are skipped; their dependents still run.
+            fingerprint (callable): Called with the context; returns JSON-serializable data
+                                    describing everything the step's work depends on
+                                    (checksums, URLs, package lists...). Steps with a
+                                    fingerprint are skipped when the journal has them
+                                    completed with the same inputs. Returning None means
+                                    the inputs cannot be determined right now: the step
+                                    runs, is not journaled, and its dependents run too.
+            verify (callable): Called with the recorded outputs after a journal hit; returns
+                               False when they no longer exist on disk (workspace deleted,
+                               archive removed...), which runs the step again.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.resources = tuple(resources)
+        self.enabled = enabled
+        self.fingerprint = fingerprint
+        self.verify = verify
+
+
+class PipelineScheduler:
+    """
+    Runs PipelineSteps as a DAG: independent steps execute in parallel threads,
+    a failing step blocks the steps that depend on it (directly or transitively)
+    while independent branches still finish, and the report shows per-step timing
+    plus the critical path.
+    """
+
+    def __init__(self, max_workers=4, journal=None):
+        """
+        Args:
+            max_workers (int): Maximum number of steps running at once.
+            journal (StepJournal): Completed-step journal used to skip unchanged steps.
+        """
+        self.max_workers = max(1, max_workers)
+        self.journal = journal
+        self.steps = {}
+        self.producers = {}
+        self.results = {}
+        self.hashes = {}
+        self.started_at = None
+
+    def add(self, step):
+        if step.name in self.steps:
+            raise PipelineError(f"Duplicate pipeline step '{step.name}'")
+        for output in step.outputs:
+            if output in self.producers:
+                raise PipelineError(f"'{output}' is produced by both '{self.producers[output]}' and '{step.name}'")
+            self.producers[output] = step.name
+        self.steps[step.name] = step
+        return step
+
+    def dependencies(self, context=None):
+        """
+        Returns:
+            dict: Step name to the set of step names it waits for.
+
+        Raises:
+            PipelineError: If an input has no producer or the steps form a cycle.
+        """
+        context = context or {}
+        graph = {}
+        for name, step in self.steps.items():
+            graph[name] = set()
+            for key in step.inputs:
+                if key in self.producers:
+                    graph[name].add(self.producers[key])
+                elif key not in context:
+                    raise PipelineError(f"Step '{name}' needs '{key}', which no step produces")
+
+        # Kahn's algorithm, only to reject cycles before anything runs
+        remaining = {name: set(deps) for name, deps in graph.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise PipelineError(f"Dependency cycle between steps: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return graph
+
+    def _run_step(self, step, context, upstream_hashes):
+        """
+        Returns:
+            tuple: (outputs: dict, from_journal: bool)
+        """
+        with TRACER.span(step.name, "step") as span:
+            fingerprint = step.fingerprint(context) if step.fingerprint else None
+            journaled = self.journal is not None and step.fingerprint is not None
+            if step.fingerprint is not None and fingerprint is None:
+                # Unknown inputs: a one-off hash keeps this run and every dependent out of the journal
+                print(f"⚠️ Inputs of step '{step.name}' could not be determined, it will not be skipped.")
+                span['journal'] = "unknown"
+                journaled = False
+                input_hash = secrets.token_hex(32)
+            else:
+                input_hash = StepJournal.input_hash(step.name, fingerprint, upstream_hashes)
+            self.hashes[step.name] = input_hash
+
+            if journaled:
+                outputs = self.journal.completed(step.name, input_hash)
+                if outputs is not None and step.verify is not None and not step.verify(outputs):
+                    print(f"🔄 Step '{step.name}' is journaled but its outputs are missing, running it again.")
+                    span['journal'] = "stale"
+                    outputs = None
+                if outputs is not None:
+                    print(f"⏭️ Step '{step.name}' unchanged since its last successful run, skipping.")
+                    span['journal'] = "hit"
+                    return outputs, True
+
+            outputs = step.func(context)
+            # Only a normal return with the declared outputs counts as success and is journaled
+            if outputs is False:
+                raise PipelineError(f"Step '{step.name}' reported a failure")
+            outputs = outputs or {}
+            missing = [key for key in step.outputs if key not in outputs]
+            if missing:
+                raise PipelineError(f"Step '{step.name}' did not produce {', '.join(missing)}")
+            if journaled:
+                self.journal.record(step.name, input_hash, outputs)
+        return outputs, False
+
+    def run(self, context=None):
+        """
+        Executes all steps.
+
+        Args:
+            context (dict): Initial values; step outputs are merged into it.
+
+        Returns:
+            dict: The context after the run.
+
+        Raises:
+            PipelineError: If any step failed, once every step not depending on it has run;
+                           steps depending on it are reported as blocked.
+        """
+        context = context if context is not None else {}
+        graph = self.dependencies(context)
+        self.results = {name: {'status': "pending", 'start': None, 'duration': None, 'error': None}
+                        for name in self.steps}
+        self.started_at = time.perf_counter()
+        lock = threading.Lock()
+        busy_resources, running, failed = set(), {}, []
+
+        def finished(name):
+            return self.results[name]['status'] in ("done", "cached", "skipped")
+
+        def block_dependents(name):
+            stack = [name]
+            while stack:
+                current = stack.pop()
+                for other, deps in graph.items():
+                    if current in deps and self.results[other]['status'] == "pending":
+                        self.results[other]['status'] = "blocked"
+                        print(f"⛔ Step '{other}' blocked by failed step '{name}'")
+                        stack.append(other)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                for name, step in self.steps.items():
+                    result = self.results[name]
+                    if result['status'] != "pending" or not all(finished(dep) for dep in graph[name]):
+                        continue
+                    if not step.enabled:
+                        result['status'] = "skipped"
+                        self.hashes[name] = StepJournal.input_hash(name, "skipped", [])
+                        print(f"⏭️ Skipping step: {name}")
+                        continue
+                    if busy_resources.intersection(step.resources) or len(running) >= self.max_workers:
+                        continue
+                    busy_resources.update(step.resources)
+                    result.update(status="running", start=time.perf_counter() - self.started_at)
+                    print(f"\n▶️ Starting step: {name}")
+                    future = pool.submit(contextvars.copy_context().run, self._run_step, step, context,
+                                         [self.hashes[dep] for dep in graph[name]])
+                    running[future] = name
+
+                # Skipping can make more steps ready without anything running
+                if any(result['status'] == "pending" and all(finished(dep) for dep in graph[name])
+                       and not self.steps[name].enabled for name, result in self.results.items()):
+                    continue
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    step, result = self.steps[name], self.results[name]
+                    busy_resources.difference_update(step.resources)
+                    result['duration'] = time.perf_counter() - self.started_at - result['start']
+                    try:
+                        outputs, from_journal = future.result()
+                    except Exception as e:
+                        result.update(status="failed", error=e)
+                        failed.append(name)
+                        print(f"❌ Step '{name}' failed after {result['duration']:.1f}s: {e}")
+                        block_dependents(name)
+                        continue
+                    with lock:
+                        context.update(outputs)
+                    result['status'] = "cached" if from_journal else "done"
+                    if not from_journal:
+                        print(f"✅ Step '{name}' finished in {result['duration']:.1f}s")
+
+        for result in self.results.values():
+            if result['status'] == "pending":
+                result['status'] = "blocked"
+        print(self.report())
+        if failed:
+            raise PipelineError(f"Pipeline stopped, failed step(s): {', '.join(failed)}")
+        return context
+
+    def critical_path(self):
+        """
+        Walks back from the last step to finish, each time following the dependency
+        that finished last, i.e. the chain of steps that determined the total time.
+
+        Returns:
+            list: Step names from the first to the last step of the critical path.
+        """
+        graph = self.dependencies({key: None for step in self.steps.values() for key in step.inputs})
+
+        def end_time(name):
+            result = self.results.get(name, {})
+            return result['start'] + result['duration'] if result.get('duration') is not None else None
+
+        timed = [name for name in self.steps if end_time(name) is not None]
+        if not timed:
+            return []
+        path = [max(timed, key=end_time)]
+        while True:
+            previous = [dep for dep in graph[path[-1]] if end_time(dep) is not None]
+            if not previous:
+                break
+            path.append(max(previous, key=end_time))
+        return path[::-1]
+
+    def report(self):
+        """
+        Renders per-step timing, ordered by start time, and the critical path.
+        """
+        order = sorted(self.steps, key=lambda name: (self.results[name]['start'] is None,
+                                                     self.results[name]['start'] or 0))
+        critical = self.critical_path()
+        lines = ["\n📊 Pipeline Steps:", f"{'STEP':<28} {'STATUS':<9} {'START':>8} {'SECONDS':>9}", "-" * 58]
+        for name in order:
+            result = self.results[name]
+            start = "" if result['start'] is None else f"{result['start']:.1f}"
+            duration = "" if result['duration'] is None else f"{result['duration']:.1f}"
+            marker = " *" if name in critical else ""
+            lines.append(f"{name:<28} {result['status']:<9} {start:>8} {duration:>9}{marker}")
+        if critical:
+            total = sum(self.results[name]['duration'] for name in critical)
+            lines.append(f"\n🧭 Critical path ({total:.1f}s): " + " → ".join(critical))
+        return "\n".join(lines)
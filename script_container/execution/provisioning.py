@@ -0,0 +1,185 @@
+import os
+import re
+import time
+import importlib.metadata
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.output_stream import ProgressHandler, PatternAlertHandler
+
+try:
+    from packaging.requirements import Requirement
+except ImportError:  # packaging is optional; only "name" and "name==version" are understood without it
+    Requirement = None
+
+
+DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+APT_LISTS_PATH = "/var/lib/apt/lists"
+APT_UPDATE_STAMP = "/var/lib/apt/periodic/update-success-stamp"
+
+
+def canonical_name(name):
+    """
+    PEP 503 normalisation, so "PyELFTools" and "pyelftools" compare equal.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class PackageProvisioner(CommonFuntion):
+    """
+    Installs apt and pip packages as a delta against what is already present.
+
+    Installed state is read in one pass from the dpkg status database and from
+    importlib.metadata; only the missing packages are installed, in a single apt
+    transaction and a single pip call, and `apt-get update` is skipped while the
+    package lists are fresher than `apt_lists_max_age`.
+    """
+
+    def __init__(self, dpkg_status_path=DPKG_STATUS_PATH, apt_lists_path=APT_LISTS_PATH,
+                 apt_lists_max_age=24 * 3600, python_paths=None, pip_command=("pip3",)):
+        """
+        Args:
+            dpkg_status_path (str): dpkg status database (point at a fake file in tests).
+            apt_lists_path (str): Directory holding the downloaded apt package lists.
+            apt_lists_max_age (float): Seconds after which the lists are considered stale.
+            python_paths (list): Search path for installed distributions; defaults to sys.path.
+            pip_command (tuple): Command used to run pip.
+        """
+        self.dpkg_status_path = dpkg_status_path
+        self.apt_lists_path = apt_lists_path
+        self.apt_lists_max_age = apt_lists_max_age
+        self.python_paths = python_paths
+        self.pip_command = list(pip_command)
+
+    # ----------------------------------------------------------------------------------------------
+    #                                   Installed state
+    # ----------------------------------------------------------------------------------------------
+
+    def installed_apt_packages(self):
+        """
+        Parses the dpkg status database.
+
+        Returns:
+            dict: Package name to version for every package in state "install ok installed".
+        """
+        installed = {}
+        try:
+            with open(self.dpkg_status_path, encoding="utf-8", errors="replace") as f:
+                stanzas = f.read().split("\n\n")
+        except OSError as e:
+            print(f"⚠️ Could not read dpkg status {self.dpkg_status_path}: {e}")
+            return installed
+
+        for stanza in stanzas:
+            fields = dict(re.findall(r"^(Package|Status|Version|Provides):\s*(.*)$", stanza, re.MULTILINE))
+            if fields.get("Status", "").split()[-1:] != ["installed"] or "Package" not in fields:
+                continue
+            installed[fields["Package"]] = fields.get("Version", "")
+            # Virtual packages satisfied by this one ("Provides: foo (= 1.0), bar")
+            for provided in fields.get("Provides", "").split(","):
+                name = provided.strip().split(" ")[0]
+                if name:
+                    installed.setdefault(name, fields.get("Version", ""))
+        return installed
+
+    def installed_pip_packages(self):
+        """
+        Returns:
+            dict: Canonical distribution name to version.
+        """
+        distributions = (importlib.metadata.distributions(path=self.python_paths)
+                         if self.python_paths is not None else importlib.metadata.distributions())
+        return {canonical_name(dist.metadata["Name"]): dist.version
+                for dist in distributions if dist.metadata["Name"]}
+
+    def pip_requirement_satisfied(self, requirement, installed):
+        """
+        Args:
+            requirement (str): Requirement such as "pexpect==4.7.0" or "xlrd".
+            installed (dict): Result of installed_pip_packages().
+        """
+        if Requirement is not None:
+            parsed = Requirement(requirement)
+            version = installed.get(canonical_name(parsed.name))
+            return version is not None and (not parsed.specifier or parsed.specifier.contains(version, prereleases=True))
+
+        name, _, pinned = requirement.partition("==")
+        if re.search(r"[<>!~=;\[]", name):
+            return False  # needs packaging to evaluate; let pip decide
+        version = installed.get(canonical_name(name.strip()))
+        return version is not None and (not pinned or version == pinned.strip())
+
+    def apt_lists_fresh(self):
+        """
+        Returns:
+            bool: True if `apt-get update` ran successfully within apt_lists_max_age.
+        """
+        newest = 0
+        try:
+            newest = os.path.getmtime(APT_UPDATE_STAMP)
+        except OSError:
+            pass
+        try:
+            for entry in os.scandir(self.apt_lists_path):
+                if entry.is_file() and entry.name.endswith(("Packages", "InRelease", "Release")):
+                    newest = max(newest, entry.stat().st_mtime)
+        except OSError:
+            return False
+        return newest > 0 and time.time() - newest < self.apt_lists_max_age
+
+    # ----------------------------------------------------------------------------------------------
+    #                                   Plan and apply
+    # ----------------------------------------------------------------------------------------------
+
+    def plan(self, apt_packages, pip_packages):
+        """
+        Computes what has to be installed.
+
+        Returns:
+            dict: {'apt': missing apt packages, 'pip': unsatisfied pip requirements,
+                   'apt_update': whether the package lists must be refreshed first,
+                   'already_installed': count of packages that need nothing}
+        """
+        installed_apt = self.installed_apt_packages()
+        installed_pip = self.installed_pip_packages()
+        missing_apt = [package for package in apt_packages if package not in installed_apt]
+        missing_pip = [package for package in pip_packages if not self.pip_requirement_satisfied(package, installed_pip)]
+        return {
+            'apt': missing_apt,
+            'pip': missing_pip,
+            'apt_update': bool(missing_apt) and not self.apt_lists_fresh(),
+            'already_installed': len(apt_packages) + len(pip_packages) - len(missing_apt) - len(missing_pip),
+        }
+
+    def apply(self, plan, pip_extra_args=("--break-system-packages",)):
+        """
+        Installs a plan from plan(): at most one `apt-get update`, one `apt-get install`
+        and one `pip install`.
+
+        Returns:
+            bool: True if every install command succeeded.
+        """
+        print(f"📦 {plan['already_installed']} package(s) already installed, "
+              f"{len(plan['apt'])} apt and {len(plan['pip'])} pip package(s) to install.")
+        success = True
+        if plan['apt_update']:
+            success &= self.run_command(["apt-get", "update"], "Refreshing apt package lists")[0]
+        if plan['apt']:
+            success &= self.run_command_streaming(
+                ["apt-get", "install", "-y"] + plan['apt'], f"Installing {' '.join(plan['apt'])}",
+                [ProgressHandler("apt-get install", unit="lines"), PatternAlertHandler({'error': r'^E:'})])[0]
+        if plan['pip']:
+            success &= self.run_command_streaming(
+                self.pip_command + ["install"] + plan['pip'] + list(pip_extra_args),
+                f"Installing Python packages {' '.join(plan['pip'])}",
+                [ProgressHandler("pip install", unit="lines"), PatternAlertHandler({'error': r'^ERROR:'})])[0]
+        return success
+
+    def provision(self, apt_packages, pip_packages):
+        """
+        plan() followed by apply().
+
+        Returns:
+            dict: The executed plan with an added 'success' flag.
+        """
+        plan = self.plan(apt_packages, pip_packages)
+        plan['success'] = self.apply(plan)
+        return plan
@@ -1,10 +1,28 @@
 import os
-import re
+import shutil
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from script_container.execution.constant import CommonFuntion
+from script_container.execution.provisioning import PackageProvisioner, DPKG_STATUS_PATH
+from script_container.execution.package_bundle import PackageBundle, BUNDLE_MANIFEST, latest_bundle
+from script_container.execution.git_mirror import GitMirrorCache, DEFAULT_GIT_MIRROR_PATH
+from script_container.execution.source_snapshot import SourceSnapshot, DEFAULT_SNAPSHOT_PATH
+from script_container.execution.archive_cache import ExtractionCache, DEFAULT_EXTRACTION_CACHE_PATH
+from script_container.execution.driver_build import DriverBuildCache, DEFAULT_DRIVER_CACHE_PATH
+from script_container.execution.module_manager import KernelModuleManager
 
 class AutomationScriptForSetupInstalltion(CommonFuntion):
 
+    # Packages required for the DPDK / DTS setup
+    APT_PACKAGES = ["gcc", "build-essential", "meson", "ninja-build", "libnuma-dev", "python3-pip",
+                    "libpcap-dev", "libboost-all-dev", "libudev-dev", "libnl-3-dev", "libnl-genl-3-dev",
+                    "nasm", "yasm", "python3-scapy", "pkg-config", "lldpad"]
+    PIP_PACKAGES = ["xlrd", "xlwt", "pexpect==4.7.0", "pyelftools"]
+
+    # DPDK release checked out after cloning
+    DPDK_REF = "v25.03-rc3"
+
     def __init__(self,firmware_file_path = None, driver_path = None, git_user = "",git_token = "" ):
         self.firmware_file_path = firmware_file_path
         self.driver_path =  driver_path
@@ -15,6 +33,19 @@ class AutomationScriptForSetupInstalltion(CommonFuntion):
         self.error_logs = []
         self.error_logs_cmd = []
 
+        # Local bare mirrors the DTS / DPDK workspaces are created from (GIT_CLONE_MODE=direct disables)
+        self.git_mirror = GitMirrorCache(os.environ.get("GIT_MIRROR_PATH", DEFAULT_GIT_MIRROR_PATH),
+                                         mode=os.environ.get("GIT_CLONE_MODE", "shared"),
+                                         depth=int(os.environ.get("GIT_CLONE_DEPTH", "0")) or None,
+                                         clone_filter=os.environ.get("GIT_CLONE_FILTER") or None)
+        # Reproducible dpdk.tar.gz archives cached by commit hash
+        self.snapshots = SourceSnapshot(os.environ.get("SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
+        # Firmware / driver trees extracted once per archive checksum
+        self.extraction_cache = ExtractionCache(os.environ.get("EXTRACTION_CACHE_PATH", DEFAULT_EXTRACTION_CACHE_PATH))
+        # Built driver artifacts per (tarball, kernel, compiler); may point at shared storage
+        self.driver_builds = DriverBuildCache(os.environ.get("DRIVER_CACHE_PATH", DEFAULT_DRIVER_CACHE_PATH))
+        self.module_manager = KernelModuleManager()
+
 
     def check_proxy_setup(self):
         proxies = ["http_proxy", "https_proxy", "ftp_proxy", "no_proxy"]
@@ -57,12 +88,52 @@ class AutomationScriptForSetupInstalltion(CommonFuntion):
 
 
     # #############################   Updating firmware -:  ###################################################################
+
+    def extract_firmware(self):
+        """
+        Extracts only the architecture folder of the NVM update package
+        (e.g. "E810/Linux_x64") through the extraction cache.
+
+        Returns:
+            str: Directory containing nvmupdate64e, or None if it could not be found.
+        """
+        firmware_name = self.firmware_file_path.split("/")[-1].split("_")[0]
+        top_dirs = self.extraction_cache.top_level_dirs(self.firmware_file_path)
+        top_dir = next((name for name in top_dirs if name == firmware_name), None) or \
+            next((name for name in top_dirs if firmware_name in name), None)
+        if top_dir is None:
+            print(f"⚠️ Firmware folder '{firmware_name}' not found in {self.firmware_file_path}.")
+            return None
+        arch_dir = self.extraction_cache.arch_subdir(self.firmware_file_path, top_dir)
+        if arch_dir is None:
+            print("⚠️ No subdirectory found to enter.")
+            return None
+        root = self.extraction_cache.extract(self.firmware_file_path, arch_dir)
+        return os.path.join(root, arch_dir) if root else None
+
+    def extract_driver(self):
+        """
+        Extracts the driver tarball through the extraction cache.
+
+        Returns:
+            str: The driver's top-level source directory, or None if it could not be found.
+        """
+        driver_name = self.driver_path.split("/")[-1].split("_")[0].split(".")[0]
+        folder_name = next((name for name in self.extraction_cache.top_level_dirs(self.driver_path)
+                            if driver_name in name), None)
+        if folder_name is None:
+            print(f"⚠️ Driver folder '{driver_name}' not found in {self.driver_path}.")
+            return None
+        root = self.extraction_cache.extract(self.driver_path)
+        return os.path.join(root, folder_name) if root else None
+
             
     def updating_firmware_drivers(self):
 
         """
         Validates paths and extracts firmware and driver tar files.
         Navigates into extracted directories and runs firmware installation.
+        Raises if either the firmware or the driver could not be updated.
 
         Parameters:
         - firmware_file_path (str): Path to the firmware tar.gz file.
@@ -88,88 +159,49 @@ class AutomationScriptForSetupInstalltion(CommonFuntion):
         current_path = os.getcwd()
         print(f"\n📍 Current working directory: {current_path}\n")
 
-        # Extract firmware 
-        self.run_command(['tar', '-xvf', self.firmware_file_path, '-C', current_path],
-                    f"Extracting firmware file: {self.firmware_file_path}")
-        
-        # Extrating driver 
-        self.run_command(['tar', '-xvf', self.driver_path, '-C', current_path],
-                    f"Extracting driver file: {self.driver_path}")
-
-        # List files in current directory
-        success, output = self.run_command(['ls'], "Listing files in current directory", check_output=True)
-        if not success:
-            print("⚠️ Failed to list files.")
-            
+        # Unpack both archives in parallel into the extraction cache (no-op when already there)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            firmware_future = pool.submit(contextvars.copy_context().run, self.extract_firmware)
+            driver_future = pool.submit(contextvars.copy_context().run, self.extract_driver)
+            firmware_dir, driver_dir = firmware_future.result(), driver_future.result()
 
-        # Attempt to find firmware folder and navigate into it
-        firmware_name = self.firmware_file_path.split("/")[-1].split("_")[0]
-        if firmware_name in output:
+        # Run the firmware update from the folder built for this architecture. nvmupdate64e
+        # writes logs and config next to itself, so it runs in a per-run copy and the
+        # extraction cache stays pristine.
+        if firmware_dir:
             try:
-                os.chdir(firmware_name)
-                success, output = self.run_command(['ls', '-p'], "Listing contents of firmware directory", check_output=True)
-                if success:
-                    # Find first folder (lines ending with '/')
-                    folders = [line for line in output.splitlines() if line.endswith('/')]
-                    if folders:
-                        os.chdir(folders[0].rstrip('/'))
-                        installation_driver = True
-                        self.run_command(['./nvmupdate64e'], "Running firmware installation")
-                        
-                    else:
-                        print("⚠️ No subdirectory found to enter.")
-                else:
-                    print("⚠️ Failed to list contents of firmware directory.")
+                work_dir = os.path.join(setup_file_path, os.path.basename(firmware_dir))
+                shutil.rmtree(work_dir, ignore_errors=True)
+                shutil.copytree(firmware_dir, work_dir, symlinks=True)
+                os.chdir(work_dir)
+                installation_firmware, _ = self.run_command(['./nvmupdate64e'], "Running firmware installation")
             except Exception as e:
                 print("❌ Error navigating firmware directory:", e)
                 self.error_logs.append(["❌ Error navigating firmware directory:", e])
-        else:
-            print(f"⚠️ Firmware folder '{firmware_name}' not found in extracted contents.")
-
 
         # Attempting to install driver :
-        
-        # Changing the directory root setup directory
         os.chdir(setup_file_path)
-        success, output = self.run_command(['ls','-l'], "Listing files in current directory", check_output=True)
-        # Fetching current driver data 
-        if not success:
-            print("⚠️ Failed to list files.")
-        output = re.findall(r'^d[\w-]+\s+\d+\s+\w+\s+\w+\s+\d+\s+\w+\s+\d+\s+[\d:]+\s+(.+)$', output, re.MULTILINE)
-
-        # Attempt to find driver folder and navigate into it
-        driver_name = self.driver_path.split("/")[-1].split("_")[0].split(".")[0] 
-        
-        for folder_name in output:
-            if driver_name in folder_name:
-                os.chdir(folder_name)
-                try:
-                    # Installing Make cmd 
-                    self.run_command(["apt", "update"], "updating Sudo Update :\n")
-                    self.run_command(['apt','install','-y','make'], "Instalation Of Make cmd")
-
-                    os.chdir("src")
-                    # Run make commands
-                    
-                    self.run_command(['make'], "Running make")
-                    self.run_command(['dmesg', '-c'], "Clearing dmesg")
-                    self.run_command(['make', 'install'], "Running make install")
-                    self.run_command(['rmmod', 'irdma'], "Removing irdma module")
-                    self.run_command(['rmmod', 'ice'], "Removing ice module")
-                    self.run_command(['modprobe', 'ice'], "Loading ice module")
-
-                    installation_driver= True
-                except Exception as x:
-                    print("❌ Failed Error:", x)
-                    self.error_logs.append(["❌ Failed Error:", x])
-                # Breaking loop driver is updated .
-                break
+        if driver_dir:
+            try:
+                self.run_command(['dmesg', '-c'], "Clearing dmesg")
+                # Cached .ko for this tarball / kernel / compiler, or a parallel build on a miss
+                if self.driver_builds.install(driver_dir, self.extraction_cache.digest(self.driver_path)):
+                    # Reload ice (and irdma on top of it) only if the installed build differs
+                    reload = self.module_manager.ensure_current("ice")
+                    installation_driver = reload['action'] != "failed"
+            except Exception as x:
+                print("❌ Failed Error:", x)
+                self.error_logs.append(["❌ Failed Error:", x])
         
         # Assuming installation_driver and installation_firmware are boolean values
         driver_status = "✅" if installation_driver else "❌"
         firmware_status = "✅" if installation_firmware else "❌"
         print("\n\nInstallation Driver Status: {} | Firmware Status: {}\n\n".format(driver_status, firmware_status))
 
+        # Raise so the pipeline does not journal a failed update as completed
+        if not (installation_driver and installation_firmware):
+            raise Exception(f"❗ Update failed (driver: {driver_status}, firmware: {firmware_status}).")
+
 
 
     # ###################################   Dpdk and Dts Setup Script       ##################################################################
@@ -179,74 +211,76 @@ class AutomationScriptForSetupInstalltion(CommonFuntion):
     def clone_dts_repo(self):
 
         """
-        Clones the private DTS repository using GitHub credentials.
+        Clones the private DTS repository using GitHub credentials, from the local mirror
+        when one exists.
         """
        
         path = os.getcwd()
         print("\n📍current path : "+str(path))
-        self.run_command(["git", "clone", self.dts_url], "Cloning DTS repository")
+        if not self.git_mirror.checkout(self.dts_url, "networking.dataplane.dpdk.dts.local.upstream"):
+            raise Exception("❗ Could not clone the DTS repository.")
         os.chdir("networking.dataplane.dpdk.dts.local.upstream")
         os.chdir("dep")
         
     def clone_dpdk_repo(self):
 
         """
-        Clones the public DPDK repository and checks out a specific version.
+        Clones the public DPDK repository at DPDK_REF and packs that commit into dpdk.tar.gz
+        (reused from the snapshot cache when the commit was archived before).
         """
-        self.run_command(["git", "clone", self.dpdk_url], "Cloning DPDK repository")
+        if not self.git_mirror.checkout(self.dpdk_url, "dpdk", self.DPDK_REF):
+            raise Exception(f"❗ Could not check out DPDK version {self.DPDK_REF}.")
 
-        self.run_command(["tar", "-czvf", "dpdk.tar.gz", "dpdk/"],"taring dpdk file")
+        if self.snapshots.build("dpdk", "dpdk.tar.gz", prefix="dpdk") is None:
+            raise Exception("❗ Could not build dpdk.tar.gz.")
         path = os.getcwd()
         print("\n📍current path : "+str(path))
         os.chdir("dpdk")
-        self.run_command(["git", "checkout","-b", "v25.03-rc3"], "Checking out DPDK version v25.03-rc3")
 
 
     def install_required_packages(self):
 
         """
         Installs required system and Python packages for DPDK and DTS setup.
-        """
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
 
-        apt_packages = [
-            ["sudo", "timedatectl", "set-ntp", "false"],
-            ["sudo", "timedatectl", "set-time", current_time],
-            ["sudo", "timedatectl", "set-ntp", "true"],
-            ["sudo", "apt-get", "update"],
-            ["apt", "update"],
-            ["apt", "install", "-y", "gcc"],
-            ["apt", "install", "-y", "build-essential"],
-            ["apt", "install", "-y", "meson"],
-            ["apt", "install", "-y", "ninja-build"],
-            ["apt", "install", "-y", "libnuma-dev"],
-            ["apt", "install", "-y", "python3-pip"],
-            ["apt", "install", "-y", "libpcap-dev"],
-            ["apt", "install", "-y", "libboost-all-dev"],
-            ["apt", "install", "-y", "libudev-dev"],
-            ["apt", "install", "-y", "libnl-3-dev"],
-            ["apt", "install", "-y", "libnl-genl-3-dev"],
-            ["apt", "install", "-y", "nasm"],
-            ["apt", "install", "-y", "yasm"],
-            ["apt", "install", "-y", "python3-scapy"],
-            ["apt", "install", "-y", "pkg-config"],
-            ["apt", "install", "-y", "lldpad"]
-        ]
-
-        pip_packages = [
-            ["pip3", "install", "xlrd", "--break-system-packages"],
-            ["pip3", "install", "xlwt", "--break-system-packages"],
-            ["pip3", "install", "pexpect==4.7.0", "--break-system-packages"],
-            ["pip3", "install", "pyelftools", "--break-system-packages"],
-
-        ]
-
-        for pkg in apt_packages:
-            self.run_command(pkg, f"Installing {' '.join(pkg[3:]) if len(pkg) > 3 else pkg[1]}")
-
-        for pkg in pip_packages:
-            self.run_command(pkg, f"Installing Python package {pkg[2]}")
+        Only packages missing from the dpkg database / Python environment are installed,
+        in one apt transaction and one pip call; `apt-get update` only runs when the
+        package lists are stale (see PackageProvisioner). With PACKAGE_BUNDLE_PATH set to
+        an offline bundle (or a directory of bundles) everything is installed from it
+        without network access (see PackageBundle).
+
+        Returns:
+            bool: True if every required package is installed.
+        """
+        provisioner = PackageProvisioner(
+            dpkg_status_path=os.environ.get("DPKG_STATUS_PATH", DPKG_STATUS_PATH),
+            apt_lists_max_age=float(os.environ.get("APT_LISTS_MAX_AGE", 24 * 3600)),
+        )
+
+        bundle_path = os.environ.get("PACKAGE_BUNDLE_PATH", "")
+        if bundle_path:
+            bundle_dir = bundle_path if os.path.isfile(os.path.join(bundle_path, BUNDLE_MANIFEST)) else latest_bundle(bundle_path)
+            if bundle_dir:
+                if not PackageBundle(provisioner).install(bundle_dir, self.APT_PACKAGES, self.PIP_PACKAGES):
+                    self.error_logs_cmd.append(["❌ Package installation from bundle failed:", bundle_dir])
+                    return False
+                return True
+            print(f"⚠️ No package bundle for this platform under {bundle_path}, installing from the network.")
+
+        plan = provisioner.plan(self.APT_PACKAGES, self.PIP_PACKAGES)
+
+        if plan['apt_update']:
+            # Resync the clock first, a skewed clock makes apt reject the Release files
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for command in (["sudo", "timedatectl", "set-ntp", "false"],
+                            ["sudo", "timedatectl", "set-time", current_time],
+                            ["sudo", "timedatectl", "set-ntp", "true"]):
+                self.run_command(command, f"Running {' '.join(command[1:])}")
+
+        if not provisioner.apply(plan):
+            self.error_logs_cmd.append(["❌ Package installation failed:", plan['apt'] + plan['pip']])
+            return False
+        return True
 
 
 
@@ -0,0 +1,162 @@
+import os
+import time
+import shlex
+import select
+import signal
+import secrets
+import threading
+import subprocess
+
+
+# Commands cheap enough that fork+exec from Python dominates their run time
+SMALL_COMMAND_PREFIXES = (
+    ("pwd",),
+    ("chmod",),
+    ("rm",),
+    ("cat",),
+    ("ls",),
+    ("mkdir",),
+    ("ip", "-br"),
+    ("lshw",),
+    ("uname",),
+)
+
+
+class ShellCoprocess:
+    """
+    One long-lived `/bin/sh` that runs commands sent over its stdin.
+
+    Each command is followed by a `printf` of a random sentinel and `$?`, so the
+    reader knows where one command's output ends and what its exit code was.
+    Commands sent together in run_batch() go down the pipe in a single write.
+    A command that outlives its timeout takes the shell down with it: the whole
+    session is killed and the remaining commands run in a fresh shell.
+    The shell follows the Python process: every command is prefixed with a `cd`
+    to os.getcwd(), and os.environ changes are exported before it runs.
+    """
+
+    def __init__(self, shell="/bin/sh"):
+        self.shell = shell
+        self.lock = threading.Lock()
+        self.process = None
+        self.sentinel = None
+        self.buffer = b""
+        self.environment = {}
+
+    def start(self):
+        self.sentinel = f"__COPROC_{secrets.token_hex(8)}__"
+        self.buffer = b""
+        self.process = subprocess.Popen([self.shell], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, start_new_session=True)
+        self.environment = dict(os.environ)
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _environment_script(self):
+        current = dict(os.environ)
+        lines = [f"unset {shlex.quote(key)}" for key in self.environment if key not in current]
+        lines += [f"export {shlex.quote(key)}={shlex.quote(value)}"
+                  for key, value in current.items() if self.environment.get(key) != value]
+        self.environment = current
+        return "".join(line + "\n" for line in lines)
+
+    def _script(self, command):
+        # stdin from /dev/null so a command can never consume the protocol stream;
+        # the leading newline of the sentinel line is stripped again by _read_result()
+        return (f"cd {shlex.quote(os.getcwd())} && {shlex.join(command)} </dev/null 2>&1\n"
+                f"printf '\\n{self.sentinel} %d\\n' $?\n")
+
+    def _read_result(self, timeout=None):
+        """
+        Reads one command's output up to its sentinel line.
+
+        Args:
+            timeout (float): Maximum wait in seconds (None = no limit).
+
+        Returns:
+            tuple: (exit_code, output), or None if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        marker = f"\n{self.sentinel} ".encode()
+        while True:
+            index = self.buffer.find(marker)
+            if index != -1:
+                end = self.buffer.find(b"\n", index + len(marker))
+                if end != -1:
+                    output = self.buffer[:index]
+                    exit_code = int(self.buffer[index + len(marker):end])
+                    self.buffer = self.buffer[end + 1:]
+                    return exit_code, output.decode(errors="replace")
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.process.stdout], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(self.process.stdout.fileno(), 65536)
+            if not chunk:
+                raise OSError("shell coprocess exited")
+            self.buffer += chunk
+
+    def run_batch(self, commands, timeouts=None):
+        """
+        Runs commands one after another in the coprocess, sending them in one write.
+
+        Args:
+            commands (list): Command lists.
+            timeouts (list): Per-command timeout in seconds (None = no limit), counted
+                             from when the previous command finished.
+
+        Returns:
+            list: (exit_code, output) per command, stderr merged into output. A command
+                  that timed out has exit_code None and the timeout message as output.
+        """
+        timeouts = list(timeouts) if timeouts is not None else [None] * len(commands)
+        results = []
+        with self.lock:
+            while len(results) < len(commands):
+                pending = list(zip(commands, timeouts))[len(results):]
+                if not self.alive:
+                    self.start()
+                script = self._environment_script() + "".join(self._script(command) for command, _ in pending)
+                try:
+                    self.process.stdin.write(script.encode())
+                    self.process.stdin.flush()
+                    for command, timeout in pending:
+                        result = self._read_result(timeout)
+                        if result is None:
+                            # Still running: kill the session and resend the rest to a new shell
+                            self.close()
+                            results.append((None, f"Command '{shlex.join(command)}' timed out after {timeout} seconds"))
+                            break
+                        results.append(result)
+                except OSError:
+                    self.close()
+                    raise
+        return results
+
+    def run(self, command, timeout=None):
+        """
+        Returns:
+            tuple: (exit_code, output) of one command; exit_code is None on timeout.
+        """
+        return self.run_batch([command], [timeout])[0]
+
+    def close(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            try:
+                # The shell leads its own session, so this also kills a command still running in it
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+
+def is_small_command(command):
+    return any(tuple(command[:len(prefix)]) == prefix for prefix in SMALL_COMMAND_PREFIXES)
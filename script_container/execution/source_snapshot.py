@@ -0,0 +1,219 @@
+import os
+import time
+import gzip
+import shutil
+import tarfile
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.tracing import TRACER
+
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dpdkCrafter", "snapshots")
+SNAPSHOT_MTIME = 0
+
+
+class ParallelGzipWriter:
+    """
+    Write-only file object producing a gzip stream compressed on several cores.
+
+    Input is cut into fixed-size blocks, each compressed as an independent gzip member
+    (zlib releases the GIL, so threads scale) and written in order. Concatenated
+    members are a valid gzip file, and with a fixed member mtime the output only
+    depends on the input bytes.
+    """
+
+    def __init__(self, fileobj, level=6, block_size=1024 * 1024, workers=None):
+        """
+        Args:
+            fileobj: Binary file object receiving the compressed stream.
+            level (int): zlib compression level.
+            block_size (int): Uncompressed bytes per gzip member.
+            workers (int): Compression threads, defaults to the CPU count.
+        """
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.pending = deque()
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[:self.block_size])
+            del self.buffer[:self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block):
+        self.pending.append(self.pool.submit(gzip.compress, block, self.level, mtime=SNAPSHOT_MTIME))
+        # Bound memory: never keep more than two blocks per worker in flight
+        while len(self.pending) > 2 * self.workers:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.buffer or not self.pending:
+            self._submit(bytes(self.buffer))
+            self.buffer.clear()
+        while self.pending:
+            self.fileobj.write(self.pending.popleft().result())
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SourceSnapshot(CommonFuntion):
+    """
+    Reproducible source tarballs of a git commit, cached by commit hash.
+
+    The tree is streamed with `git archive` (no `.git`, no untracked build output),
+    normalised (fixed mtime, root ownership, no user names) and compressed with
+    ParallelGzipWriter, so the same commit always yields byte-identical archives.
+    An archive already in the cache is reused without reading the tree.
+    """
+
+    def __init__(self, cache_root=DEFAULT_SNAPSHOT_PATH, level=6, workers=None):
+        """
+        Args:
+            cache_root (str): Directory holding `<name>-<commit>.tar.gz` archives.
+            level (int): gzip compression level.
+            workers (int): Compression threads, defaults to the CPU count.
+        """
+        self.cache_root = cache_root
+        self.level = level
+        self.workers = workers
+
+    def resolve_commit(self, repo_path, ref="HEAD"):
+        success, output = self.run_command(["git", "-C", repo_path, "rev-parse", "--verify", f"{ref}^{{commit}}"],
+                                           f"Resolving {ref} in {repo_path}", check_output=True)
+        return output.strip() if success else None
+
+    def cache_path(self, name, commit):
+        return os.path.join(self.cache_root, f"{name}-{commit}.tar.gz")
+
+    def build(self, repo_path, dest, prefix=None, ref="HEAD"):
+        """
+        Writes the archive of `ref` to `dest`, from the cache when possible.
+
+        Args:
+            repo_path (str): Git working copy (or bare repository).
+            dest (str): Archive path to create, e.g. "dpdk.tar.gz".
+            prefix (str): Top-level directory inside the archive, defaults to the repository name.
+            ref (str): Commit, tag or branch to archive.
+
+        Returns:
+            str: Commit hash of the archived tree, or None on failure.
+        """
+        prefix = prefix or os.path.basename(os.path.abspath(repo_path))
+        commit = self.resolve_commit(repo_path, ref)
+        if commit is None:
+            return None
+
+        cached = self.cache_path(prefix, commit)
+        with TRACER.span(f"Snapshot {prefix}@{commit[:12]}", "snapshot", commit=commit) as span:
+            if os.path.isfile(cached):
+                print(f"♻️ Reusing snapshot {cached}")
+                span['cache'] = "hit"
+            else:
+                span['cache'] = "miss"
+                if not self._write_archive(repo_path, commit, prefix, cached):
+                    return None
+            if self.cassette.replaying and not os.path.isfile(cached):
+                # The archive command was served from the cassette, there is nothing to place
+                return commit
+            try:
+                self._place(cached, dest)
+            except OSError as e:
+                print(f"❌ Error placing snapshot at {dest}: {e}")
+                return None
+        print(f"✅ {dest} is {prefix} at {commit}")
+        return commit
+
+    def _write_archive(self, repo_path, commit, prefix, path):
+        """
+        Streams `git archive` into a normalised, compressed archive at `path`.
+
+        git archive produces binary output, so it cannot go through run_command_streaming;
+        like run_command it is traced as a "command" span and recorded to / replayed
+        from the command cassette (replay writes nothing).
+
+        Returns:
+            bool: True if the archive was written (or replayed as successful).
+        """
+        command = ["git", "-C", repo_path, "archive", "--format=tar", f"--prefix={prefix}/", commit]
+        description = f"Archiving {prefix}@{commit[:12]} into {path}"
+        with TRACER.span(description, "command", argv=command) as span:
+            if self.cassette.replaying:
+                entry = self.cassette.replay(command, False)
+                if entry is None:
+                    print(f"❌ Error during '{description}': no recorded result for {command}")
+                    return False
+                print(f"\n📼 Replaying: {description}")
+                span.update(replayed=True, exit_code=entry['exit_code'], output_bytes=len(entry['output']))
+                if not entry['success']:
+                    print(f"❌ Error during '{description}': {entry['output']}")
+                return entry['success']
+
+            print(f"\n🔧 Executing: {description}")
+            started = time.perf_counter()
+            success, output, exit_code = self._stream_archive(command, path, span)
+            if self.cassette.recording:
+                self.cassette.record(command, False, success, output, exit_code, time.perf_counter() - started)
+            if not success:
+                print(f"❌ Error during '{description}': {output}")
+            else:
+                print(f"📦 {output} ({os.path.getsize(path) / 1e6:.1f} MB).")
+            return success
+
+    def _stream_archive(self, command, path, span):
+        """
+        Returns:
+            tuple: (success: bool, summary or error message: str, exit_code: int)
+        """
+        os.makedirs(self.cache_root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        files = 0
+        try:
+            with open(tmp_path, "wb") as raw, \
+                    ParallelGzipWriter(raw, self.level, workers=self.workers) as compressed, \
+                    tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as archive, \
+                    tarfile.open(fileobj=process.stdout, mode="r|") as source:
+                # git archive emits entries in tree order; only metadata needs normalising
+                for member in source:
+                    member.mtime = SNAPSHOT_MTIME
+                    member.uid = member.gid = 0
+                    member.uname = member.gname = ""
+                    member.pax_headers = {}
+                    archive.addfile(member, source.extractfile(member) if member.isfile() else None)
+                    files += 1
+            stderr = process.stderr.read().decode(errors="replace")
+            if process.wait() != 0:
+                raise RuntimeError(stderr.strip() or f"git archive exited with {process.returncode}")
+            os.replace(tmp_path, path)
+        except (OSError, RuntimeError, tarfile.TarError) as e:
+            process.kill()
+            process.wait()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            span.update(exit_code=process.returncode or 1)
+            return False, str(e), process.returncode or 1
+        span.update(exit_code=0, output_bytes=os.path.getsize(path), entries=files)
+        return True, f"Archived {files} entries", 0
+
+    @staticmethod
+    def _place(cached, dest):
+        # Hard link when on the same filesystem, copy otherwise; never leave a partial dest
+        tmp_dest = f"{dest}.{os.getpid()}.tmp"
+        try:
+            os.link(cached, tmp_dest)
+        except OSError:
+            shutil.copyfile(cached, tmp_dest)
+        os.replace(tmp_dest, dest)
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+DEFAULT_STEP_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dpdkCrafter", "steps.json")
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """
+    Returns:
+        str: SHA-256 hex digest of a file's contents, or None if it cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class StepJournal:
+    """
+    Remembers which pipeline steps completed and with which inputs, so a rerun after
+    a failure skips every step whose input hash is unchanged and restarts at the
+    first dirty one.
+    """
+
+    def __init__(self, journal_path=DEFAULT_STEP_JOURNAL_PATH):
+        """
+        Args:
+            journal_path (str): JSON file holding one entry per completed step.
+        """
+        self.journal_path = journal_path
+        self.entries = self._read()
+        self.lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable step journal {self.journal_path}: {e}")
+            return {}
+
+    @staticmethod
+    def input_hash(name, fingerprint, upstream_hashes):
+        """
+        Hashes a step's own inputs together with the hashes of the steps it depends on,
+        so a change anywhere upstream makes every downstream step dirty too.
+
+        Args:
+            name (str): Step name.
+            fingerprint: JSON-serializable description of the step's inputs.
+            upstream_hashes (list): Input hashes of the dependencies.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        payload = json.dumps([name, fingerprint, sorted(upstream_hashes)], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def completed(self, name, input_hash):
+        """
+        Returns:
+            dict: Outputs recorded for the step if it completed with the same input hash, else None.
+        """
+        entry = self.entries.get(name)
+        if entry and entry.get("input_hash") == input_hash and entry.get("outputs") is not None:
+            return entry["outputs"]
+        return None
+
+    def record(self, name, input_hash, outputs):
+        """
+        Marks a step as completed and rewrites the journal atomically. Steps whose
+        outputs cannot be stored as JSON are not recorded and will always rerun.
+        """
+        try:
+            json.dumps(outputs)
+        except (TypeError, ValueError):
+            return
+        with self.lock:
+            self.entries[name] = {"input_hash": input_hash, "outputs": outputs, "completed_at": time.time()}
+            self._write()
+
+    def forget(self, name):
+        with self.lock:
+            if self.entries.pop(name, None) is not None:
+                self._write()
+
+    def _write(self):
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            tmp_path = f"{self.journal_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            print(f"❌ Error saving step journal: {e}")
+
+    def invalidate(self):
+        """
+        Removes the journal so the next run executes every step.
+        """
+        self.entries = {}
+        try:
+            os.remove(self.journal_path)
+            print(f"🗑️ Step journal {self.journal_path} invalidated.")
+        except FileNotFoundError:
+            pass
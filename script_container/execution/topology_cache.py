@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import hashlib
+
+
+DEFAULT_TOPOLOGY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "dpdkCrafter", "topology.json")
+
+# Inventory fields that change when a NIC, its driver or its firmware is swapped
+FINGERPRINT_FIELDS = ('bus', 'device', 'mac', 'driver', 'driver_version', 'firmware_version')
+
+
+class TopologyCache:
+    """
+    Stores the mapInterfaceToBus() result on disk, keyed by a fingerprint of the NIC
+    inventory, so unchanged benches can skip flap-based cabling discovery.
+    """
+
+    def __init__(self, cache_path=DEFAULT_TOPOLOGY_CACHE_PATH):
+        """
+        Args:
+            cache_path (str): JSON file holding the cached topology.
+        """
+        self.cache_path = cache_path
+
+    def fingerprint(self, records):
+        """
+        Hashes the identity fields of every NIC record.
+
+        Args:
+            records (list): Inventory records (see NicInventory.collect()).
+
+        Returns:
+            str: SHA-256 hex digest, independent of record order.
+        """
+        identity = sorted(tuple(str(record.get(field, "")) for field in FINGERPRINT_FIELDS) for record in records)
+        return hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+
+    def load(self, fingerprint):
+        """
+        Args:
+            fingerprint (str): Fingerprint of the current inventory.
+
+        Returns:
+            dict: Cached mapInterfaceToBus() result, or None on a miss or fingerprint mismatch.
+        """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable topology cache {self.cache_path}: {e}")
+            return None
+
+        if entry.get("fingerprint") != fingerprint:
+            print("♻️ NIC inventory changed since the topology was cached.")
+            return None
+        return entry.get("topology")
+
+    def save(self, fingerprint, topology):
+        """
+        Writes the topology atomically so an interrupted run never leaves a torn cache.
+
+        Args:
+            fingerprint (str): Fingerprint of the inventory the topology was discovered on.
+            topology (dict): mapInterfaceToBus() result.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "saved_at": time.time(), "topology": topology}, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+            print(f"💾 Topology cached at {self.cache_path}")
+        except OSError as e:
+            print(f"❌ Error saving topology cache: {e}")
+
+    def invalidate(self):
+        """
+        Removes the cached topology so the next run rediscovers the cabling.
+        """
+        try:
+            os.remove(self.cache_path)
+            print(f"🗑️ Topology cache {self.cache_path} invalidated.")
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,208 @@
+import time
+import random
+
+
+class TopologyGraph:
+    """
+    Port-level cabling graph built from link observations.
+
+    Nodes are interfaces and edges are observed links carrying an evidence count
+    (how many probes saw the two ports flap together). Resolution works per
+    connected component: point-to-point cables become pairs, while switch-connected
+    or multi-peer ports and weakly supported links are reported instead of guessed.
+    """
+
+    def __init__(self, dominance=2.0):
+        """
+        Args:
+            dominance (float): How many times stronger a port's best link must be than its
+                               second best before it is accepted as a point-to-point cable.
+        """
+        self.dominance = dominance
+        self.nodes = {}        # interface -> insertion order
+        self.adjacency = {}    # interface -> {peer: evidence}
+        self.edge_order = {}   # (a, b) as first observed -> observation order
+
+    def add_node(self, interface):
+        if interface not in self.nodes:
+            self.nodes[interface] = len(self.nodes)
+            self.adjacency[interface] = {}
+
+    def add_link(self, source, peer, evidence=1):
+        """
+        Records that `peer` lost link when `source` was probed.
+
+        Args:
+            source (str): Probed interface; kept as the first element of the resulting pair.
+            peer (str): Interface observed flapping with it.
+            evidence (int): Weight added to the edge.
+        """
+        if source == peer:
+            self.add_node(source)
+            return
+        self.add_node(source)
+        self.add_node(peer)
+        self.adjacency[source][peer] = self.adjacency[source].get(peer, 0) + evidence
+        self.adjacency[peer][source] = self.adjacency[peer].get(source, 0) + evidence
+        if (peer, source) not in self.edge_order:
+            self.edge_order.setdefault((source, peer), len(self.edge_order))
+
+    def add_observation(self, source, observed):
+        """
+        Adds one probe: every distinct interface in `observed` other than the source
+        gets one unit of evidence towards the source.
+
+        Args:
+            source (str): Probed interface.
+            observed (list): Interfaces that reported link events during the probe.
+        """
+        self.add_node(source)
+        for peer in dict.fromkeys(observed):
+            if peer != source:
+                self.add_link(source, peer)
+
+    def evidence(self, a, b):
+        return self.adjacency.get(a, {}).get(b, 0)
+
+    def components(self):
+        """
+        Returns:
+            list: Connected components as lists of interfaces, in insertion order.
+        """
+        seen = set()
+        components = []
+        for start in self.nodes:
+            if start in seen:
+                continue
+            seen.add(start)
+            stack, component = [start], []
+            while stack:
+                node = stack.pop()
+                component.append(node)
+                for peer in self.adjacency[node]:
+                    if peer not in seen:
+                        seen.add(peer)
+                        stack.append(peer)
+            components.append(sorted(component, key=self.nodes.get))
+        return components
+
+    def _best_peer(self, node):
+        """
+        Returns the peer whose evidence dominates all other links of `node`, or None.
+        """
+        ranked = sorted(self.adjacency[node].items(), key=lambda item: -item[1])
+        if not ranked:
+            return None
+        if len(ranked) > 1 and ranked[0][1] < self.dominance * ranked[1][1]:
+            return None
+        return ranked[0][0]
+
+    def resolve(self):
+        """
+        Resolves the graph into point-to-point pairs and reports what cannot be paired.
+
+        Returns:
+            dict: {
+                'pairs': [[source, peer], ...] in first-observation order,
+                'multi_peer': components with more than two ports that share a link
+                              domain (e.g. switch-connected ports),
+                'ambiguous': [[a, b, evidence], ...] links that were not accepted,
+                'unpaired': interfaces without any link evidence,
+            }
+        """
+        pairs, multi_peer, ambiguous, unpaired = [], [], [], []
+        for component in self.components():
+            if len(component) == 1:
+                unpaired.append(component[0])
+                continue
+
+            matched = set()
+            for node in component:
+                peer = self._best_peer(node)
+                if peer is not None and node not in matched and self._best_peer(peer) == node:
+                    matched.update((node, peer))
+                    pairs.append((node, peer) if (node, peer) in self.edge_order else (peer, node))
+
+            leftover = [node for node in component if node not in matched]
+            if len(leftover) > 1:
+                multi_peer.append(leftover)
+            else:
+                unpaired.extend(leftover)
+            for node in component:
+                for peer, evidence in self.adjacency[node].items():
+                    key = (node, peer)
+                    accepted = node in matched and self._best_peer(node) == peer
+                    if key in self.edge_order and not accepted:
+                        ambiguous.append([node, peer, evidence])
+
+        pairs.sort(key=self.edge_order.get)
+        return {
+            'pairs': [list(pair) for pair in pairs],
+            'multi_peer': multi_peer,
+            'ambiguous': ambiguous,
+            'unpaired': unpaired,
+        }
+
+
+def benchmark_topology_graph(ports=4000, probes_per_port=2, noise_ratio=0.1, seed=7):
+    """
+    Times TopologyGraph resolution on a synthetic bench and compares it with the
+    legacy list-of-lists pairing.
+
+    Args:
+        ports (int): Number of interfaces (cabled back-to-back in random pairs).
+        probes_per_port (int): How many times each port is probed.
+        noise_ratio (float): Fraction of probes that also report a random unrelated port.
+        seed (int): Random seed for a repeatable bench.
+
+    Returns:
+        dict: Event count, timings in seconds and whether the cabling was recovered.
+    """
+    rng = random.Random(seed)
+    names = [f"ens{idx}" for idx in range(ports)]
+    shuffled = names[:]
+    rng.shuffle(shuffled)
+    peers = {}
+    for idx in range(0, ports - 1, 2):
+        peers[shuffled[idx]], peers[shuffled[idx + 1]] = shuffled[idx + 1], shuffled[idx]
+
+    observations = []
+    for _ in range(probes_per_port):
+        for name in names:
+            observed = [name, peers[name]] if name in peers else [name]
+            if rng.random() < noise_ratio:
+                observed.append(rng.choice(names))
+            observations.append((name, observed))
+    events = sum(len(observed) for _, observed in observations)
+
+    start = time.perf_counter()
+    graph = TopologyGraph()
+    for source, observed in observations:
+        graph.add_observation(source, observed)
+    result = graph.resolve()
+    graph_seconds = time.perf_counter() - start
+
+    # Legacy approach: list of lists with membership checks in both orders
+    start = time.perf_counter()
+    legacy_pairs = []
+    for _, observed in observations:
+        for idx in range(0, len(observed) - 1, 2):
+            pair, reverse_pair = [observed[idx], observed[idx + 1]], [observed[idx + 1], observed[idx]]
+            if pair not in legacy_pairs and reverse_pair not in legacy_pairs:
+                legacy_pairs.append(pair)
+    legacy_seconds = time.perf_counter() - start
+
+    expected = {frozenset(item) for item in peers.items()}
+    return {
+        'ports': ports,
+        'events': events,
+        'graph_seconds': graph_seconds,
+        'legacy_seconds': legacy_seconds,
+        'recovered': {frozenset(pair) for pair in result['pairs']} == expected,
+        'ambiguous_links': len(result['ambiguous']),
+    }
+
+
+if __name__ == "__main__":
+    for port_count in (64, 1000, 4000):
+        print(benchmark_topology_graph(ports=port_count))
@@ -0,0 +1,119 @@
+import io
+import os
+import json
+import tarfile
+
+import pytest
+
+from script_container.execution.archive_cache import ExtractionCache, member_path
+
+
+def make_archive(path, members, mode="w:gz"):
+    """
+    Writes a tarball; `members` maps names to file contents, or None for directories.
+    """
+    with tarfile.open(path, mode) as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    return str(path)
+
+
+NVM_PACKAGE = {
+    "./E810/": None,
+    "./E810/Linux_x64/nvmupdate64e": b"x64 tool",
+    "./E810/Linux_x64/nvmupdate.cfg": b"CONFIG",
+    "./E810/Linux_aarch64/nvmupdate64e": b"arm tool",
+    "./E810/readme.txt": b"readme",
+    "./tools/ddp/ice.pkg": b"ddp",  # no directory entries in the archive for tools/ or tools/ddp
+}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("./E810/Linux_x64/", "E810/Linux_x64"),
+    ("/abs/path", "abs/path"),
+    ("a/./b/../c", "a/c"),
+    (".", None),
+    ("../escape", None),
+    ("a/../../escape", None),
+])
+def test_member_path(name, expected):
+    assert member_path(name) == expected
+
+
+def test_index_lists_files_and_implied_directories(tmp_path):
+    archive = make_archive(tmp_path / "nvm.tar.gz", NVM_PACKAGE)
+    cache = ExtractionCache(str(tmp_path / "cache"))
+
+    index = cache.index(archive)
+
+    assert index['files'] == ["E810/Linux_x64/nvmupdate64e", "E810/Linux_x64/nvmupdate.cfg",
+                              "E810/Linux_aarch64/nvmupdate64e", "E810/readme.txt", "tools/ddp/ice.pkg"]
+    assert index['dirs'] == ["E810", "E810/Linux_aarch64", "E810/Linux_x64", "tools", "tools/ddp"]
+    assert cache.top_level_dirs(archive) == ["E810", "tools"]
+    assert cache.subdirs(archive, "E810/") == ["E810/Linux_aarch64", "E810/Linux_x64"]
+    # The index is saved next to the extracted trees and read back from there
+    saved = os.path.join(str(tmp_path / "cache"), cache.digest(archive), "index.json")
+    with open(saved) as f:
+        assert json.load(f) == index
+
+
+@pytest.mark.parametrize("machine, expected", [
+    ("x86_64", "E810/Linux_x64"),
+    ("aarch64", "E810/Linux_aarch64"),
+    ("riscv64", "E810/Linux_aarch64"),  # no matching name: first subdirectory
+])
+def test_arch_subdir(tmp_path, machine, expected):
+    archive = make_archive(tmp_path / "nvm.tar.gz", NVM_PACKAGE)
+
+    assert ExtractionCache(str(tmp_path / "cache")).arch_subdir(archive, "E810", machine) == expected
+    assert ExtractionCache(str(tmp_path / "cache")).arch_subdir(archive, "tools/ddp", machine) is None
+
+
+def test_selective_extraction_writes_only_the_subtree(tmp_path):
+    archive = make_archive(tmp_path / "nvm.tar.gz", dict(NVM_PACKAGE, **{"./E810/Linux_x64_old/nvmupdate64e": b"old"}))
+    cache = ExtractionCache(str(tmp_path / "cache"))
+
+    dest = cache.extract(archive, "E810/Linux_x64/")
+
+    extracted = sorted(os.path.relpath(os.path.join(root, name), dest)
+                       for root, _, names in os.walk(dest) for name in names)
+    assert extracted == ["E810/Linux_x64/nvmupdate.cfg", "E810/Linux_x64/nvmupdate64e"]
+    with open(os.path.join(dest, "E810", "Linux_x64", "nvmupdate64e"), "rb") as f:
+        assert f.read() == b"x64 tool"
+    # A sibling whose name only starts with the subtree is not part of it
+    assert not os.path.exists(os.path.join(dest, "E810", "Linux_x64_old"))
+
+
+def test_extraction_is_cached_by_content(tmp_path, monkeypatch):
+    archive = make_archive(tmp_path / "nvm.tar.gz", NVM_PACKAGE)
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    full = cache.extract(archive)
+    subtree = cache.extract(archive, "E810/Linux_x64")
+
+    assert full != subtree
+    assert os.path.isfile(os.path.join(full, "tools", "ddp", "ice.pkg"))
+
+    # Same bytes under another name: served from the cache without opening the tarball
+    copy = tmp_path / "renamed.tar.gz"
+    copy.write_bytes((tmp_path / "nvm.tar.gz").read_bytes())
+    monkeypatch.setattr(tarfile, "open", lambda *args, **kwargs: pytest.fail("archive was read again"))
+    assert cache.extract(str(copy), "E810/Linux_x64") == subtree
+    assert cache.extract(str(copy)) == full
+
+
+def test_missing_subtree_and_unsafe_members_extract_nothing(tmp_path):
+    archive = make_archive(tmp_path / "evil.tar", {"../outside.txt": b"x", "ok/file": b"y"}, mode="w")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+
+    assert cache.extract(archive, "E810") is None
+    dest = cache.extract(archive)
+    assert os.listdir(dest) == ["ok"]
+    assert not (tmp_path / "cache" / "outside.txt").exists()
+    assert not [name for name in os.listdir(os.path.dirname(dest)) if name.endswith(".tmp")]
@@ -0,0 +1,347 @@
+import os
+import time
+
+import pytest
+
+from script_container.execution.constant import CommandCache
+from script_container.execution.bus_info_details import (
+    NLMSG_HEADER, LinkEvent, LinkEventListener, PairingManagerInfo, ReplayLinkSource, build_link_message, parse_link_messages)
+
+
+class NoEthtool:
+    def collect(self, interfaces):
+        return {}
+
+
+@pytest.fixture
+def pairing(tmp_path):
+    # One PCI port in a fake sysfs, so construction reads the inventory instead of running lshw
+    pci_path = tmp_path / "sys" / "bus" / "pci" / "devices" / "0000:ca:00.0"
+    pci_path.mkdir(parents=True)
+    for name, value in (("vendor", "0x8086"), ("device", "0x1592")):
+        (pci_path / name).write_text(value + "\n")
+    net_path = tmp_path / "sys" / "class" / "net" / "ens802f0np0"
+    net_path.mkdir(parents=True)
+    os.symlink(pci_path, net_path / "device")
+    return PairingManagerInfo(sysfs_root=str(tmp_path / "sys"), kmsg_path=str(tmp_path / "kmsg"),
+                              ethtool=NoEthtool())
+
+
+def test_link_message_round_trip():
+    assert parse_link_messages(build_link_message(7, "ens802f0np0", True)) == [(7, "ens802f0np0", True)]
+    assert parse_link_messages(build_link_message(8, "ens802f1np1", False)) == [(8, "ens802f1np1", False)]
+
+
+def test_parse_batched_datagram_skips_other_messages():
+    other = NLMSG_HEADER.pack(NLMSG_HEADER.size + 4, 3, 0, 0, 0) + b"\0" * 4  # NLMSG_DONE
+    datagram = build_link_message(7, "ens1f0", False) + other + build_link_message(8, "ens1f1", True)
+
+    assert parse_link_messages(datagram) == [(7, "ens1f0", False), (8, "ens1f1", True)]
+
+
+def test_parse_stops_on_truncated_or_corrupt_headers():
+    message = build_link_message(7, "ens1f0", False)
+
+    assert parse_link_messages(message[:10]) == []
+    assert parse_link_messages(NLMSG_HEADER.pack(4, 16, 0, 0, 0) + message) == []
+
+
+def test_listener_records_carrier_transitions_only():
+    source = ReplayLinkSource([
+        build_link_message(7, "ens1f0", True),
+        build_link_message(7, "ens1f0", True),   # attribute change without a carrier transition
+        build_link_message(7, "ens1f0", False),
+        build_link_message(8, "ens1f1", False),
+    ], poll_interval=0.01)
+    started = time.monotonic()
+    listener = LinkEventListener(source).start()
+    try:
+        assert listener.wait_for(lambda events: len(events) == 3, timeout=2.0)
+    finally:
+        listener.stop()
+
+    assert [(event.interface, event.carrier, event.index) for event in listener.events()] == \
+        [("ens1f0", True, 7), ("ens1f0", False, 7), ("ens1f1", False, 8)]
+    assert [event.interface for event in listener.events(carrier=False)] == ["ens1f0", "ens1f1"]
+    assert all(event.timestamp >= started for event in listener.events())
+    assert listener.events(since=time.monotonic() + 1) == []
+
+
+def test_wait_for_carrier():
+    listener = LinkEventListener(ReplayLinkSource([
+        build_link_message(7, "ens1f0", False),
+        build_link_message(8, "ens1f1", False),
+        build_link_message(7, "ens1f0", True),
+    ], interval=0.01, poll_interval=0.01)).start()
+    since = time.monotonic()
+    try:
+        assert listener.wait_for_carrier(["ens1f0", "ens1f1"], False, since, timeout=2.0)
+        assert listener.wait_for_carrier(["ens1f0"], True, since, timeout=2.0)
+        assert not listener.wait_for_carrier(["ens1f1"], True, since, timeout=0.1)
+    finally:
+        listener.stop()
+
+
+def test_listener_stops_on_receive_error():
+    class BrokenSource:
+        closed = False
+
+        def recv(self):
+            raise OSError("socket closed")
+
+        def close(self):
+            self.closed = True
+
+    source = BrokenSource()
+    listener = LinkEventListener(source).start()
+    listener.thread.join(timeout=1.0)
+    assert not listener.thread.is_alive()
+    listener.stop()
+    assert source.closed
+
+
+DMESG = """\
+[  812.100231] ice 0000:ca:00.0 ens802f0np0: NIC Link is Down
+[  812.100877] ice 0000:ca:00.1 ens802f1np1: NIC Link is Down
+[  812.350002] ice 0000:ca:00.0 ens802f0np0: NIC Link is up 100 Gbps Full Duplex
+[  811.000000] ice 0000:17:00.0 ens1f0: NIC Link is Down
+"""
+
+
+def test_extract_link_events_sorted_by_timestamp(pairing):
+    assert pairing.extract_link_events(DMESG) == [
+        (811.0, "ens1f0"), (812.100231, "ens802f0np0"), (812.100877, "ens802f1np1")]
+    assert pairing.extract_interface_names(DMESG) == ["ens802f0np0", "ens802f1np1", "ens802f0np0", "ens1f0"]
+
+
+def test_attribute_link_events_pairs_each_reset_with_closest_peer(pairing):
+    resets = [(10.0, "a0"), (10.25, "b0")]
+    events = [(10.001, "a0"), (10.002, "a1"), (10.251, "b0"), (10.253, "b1")]
+
+    assert pairing.attribute_link_events(resets, events, latency=1.0, pair_window=0.1) == [["a0", "a1"], ["b0", "b1"]]
+
+
+def test_attribute_link_events_with_overlapping_waves(pairing):
+    # Wave 0 resets c0 and d0 together; wave 1 (e0) starts before their events arrive, and
+    # e0 renegotiates slowly, so its events land long after the next reset was issued
+    resets = [(10.0, "c0"), (10.0, "d0"), (10.25, "e0"), (10.25, "f0")]
+    events = [(10.3000, "f0"), (10.3003, "f1"), (10.4000, "c0"), (10.4002, "c1"),
+              (10.4100, "d0"), (10.4103, "d1"), (11.5000, "e0"), (11.5004, "e1")]
+
+    assert pairing.attribute_link_events(resets, events, latency=3.0, pair_window=0.05) == \
+        [["c0", "c1"], ["d0", "d1"], ["e0", "e1"], ["f0", "f1"]]
+
+
+def test_attribute_link_events_pairs_ports_reset_in_the_same_wave(pairing):
+    # Both ends were reset together: each anchor is the other one's peer
+    resets = [(10.0, "a0"), (10.0, "a1")]
+    events = [(10.001, "a0"), (10.0012, "a1")]
+
+    assert pairing.attribute_link_events(resets, events, latency=1.0, pair_window=0.05) == [["a0", "a1"], ["a1", "a0"]]
+
+
+def test_attribute_link_events_claims_events_once(pairing):
+    resets = [(10.0, "a0"), (10.0, "b0")]
+    events = [(10.001, "a0"), (10.0011, "a1"), (10.002, "b0")]
+
+    # a1 is closer to a0, so b0 finds no peer left instead of reusing it
+    assert pairing.attribute_link_events(resets, events, latency=1.0, pair_window=0.05) == [["a0", "a1"], ["b0", "a0"]]
+
+
+def test_attribute_link_events_ignores_events_outside_the_windows(pairing):
+    resets = [(10.0, "a0"), (20.0, "b0")]
+    events = [(9.0, "a0"), (10.001, "a0"), (10.9, "a1"), (24.0, "b0"), (24.001, "b1")]
+
+    assert pairing.attribute_link_events(resets, events, latency=3.0, pair_window=0.5) == []
+
+
+@pytest.mark.parametrize("count, wave_size, expected", [
+    (0, 8, []),
+    (1, 8, [["p0"]]),
+    (4, 8, [["p0", "p2"], ["p1", "p3"]]),
+    (5, 2, [["p0", "p3"], ["p1", "p4"], ["p2"]]),
+])
+def test_reset_waves_interleave_neighbouring_ports(pairing, count, wave_size, expected):
+    assert pairing.reset_waves([f"p{idx}" for idx in range(count)], wave_size) == expected
+
+
+class ScriptedListener:
+    """
+    Listener stand-in producing the link-down events of every reset the manager issued.
+    """
+
+    def __init__(self, cabling, resets):
+        self.cabling = cabling
+        self.resets = resets
+
+    def wait_for_carrier(self, interfaces, carrier, since, timeout):
+        return True
+
+    def events(self, since=0.0, carrier=None):
+        events = []
+        for issued, interface in self.resets:
+            events.append(LinkEvent(issued + 0.5, interface, False, 0))
+            if interface in self.cabling:
+                events.append(LinkEvent(issued + 0.5002, self.cabling[interface], False, 0))
+        return sorted(events)
+
+
+def test_concurrent_pairing_skips_failed_resets(pairing, monkeypatch):
+    cabling = {'a0': "a1", 'a1': "a0", 'b0': "b1", 'b1': "b0"}
+    issued = []
+
+    def reset_link(interface):
+        if interface == "b1":
+            raise OSError("Operation not supported")
+        if interface == "b0":
+            return False
+        issued.append((time.monotonic(), interface))
+        return True
+
+    monkeypatch.setattr(pairing, "reset_link", reset_link)
+    pairing.interFaceDetails = [{'name': name, 'status': "UP"} for name in cabling]
+
+    pairing.fetchingPairDetailsConcurrently(wave_gap=0.01, pair_window=0.05,
+                                            listener=ScriptedListener(cabling, issued))
+
+    assert pairing.pairingInterface == [["a0", "a1"]]
+
+
+def test_kernel_log_from_file_backed_kmsg(pairing, tmp_path):
+    kmsg = tmp_path / "kmsg"
+    kmsg.write_text("6,1,800000000,-;older record\n")
+    assert pairing.open_kernel_log() is not None
+    try:
+        cursor = pairing.kernel_log_cursor()
+        with open(kmsg, "a") as f:
+            f.write("6,2,812100231,-;ice 0000:ca:00.0 ens802f0np0: NIC Link is Down\n")
+
+        assert pairing.extract_link_events(pairing.kernel_log_since(cursor)) == [(812.100231, "ens802f0np0")]
+        # The calibration marker goes to kmsg_path; a plain file never echoes it back as a record
+        assert pairing.kernel_clock_offset() == 0.0
+        assert "dpdkCrafter-clock-" in kmsg.read_text()
+    finally:
+        pairing.close_kernel_log()
+
+
+def test_dmesg_pairing_anchors_evidence_on_the_reset_port(pairing, monkeypatch):
+    # A stray link message from an unrelated port lands between the reset port and its peer
+    logs = {
+        'a0': "[1.0] ice a0: NIC Link is Down\n[1.1] ice b0: NIC Link is Down\n[1.2] ice a1: NIC Link is Down\n",
+        'a1': "[2.0] ice a1: NIC Link is Down\n[2.1] ice a0: NIC Link is Down\n",
+        'b0': "[3.0] ice b0: NIC Link is Down\n[3.1] ice b1: NIC Link is Down\n",
+        'b1': "[4.0] ice b1: NIC Link is Down\n[4.1] ice b0: NIC Link is Down\n",
+    }
+    probed = []
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(pairing, "kernel_log_cursor", lambda: None)
+    monkeypatch.setattr(pairing, "kernel_log_since", lambda cursor: logs[probed[-1]])
+    monkeypatch.setattr(pairing, "reset_link", probed.append)
+    pairing.interFaceDetails = [{'name': name, 'status': "UP"} for name in logs]
+
+    pairing.fetchingPairDetailsFromDmesg()
+
+    assert pairing.pairingInterface == [["a0", "a1"], ["b0", "b1"]]
+    assert ["a0", "b0", 1] in pairing.ambiguous_links
+
+
+def group_test_observations(pairing, interfaces, cabling, flapping=()):
+    """
+    Simulates every group-test round: an untouched port loses carrier when its peer was
+    toggled, and a flapping port loses it whenever it is observed.
+    """
+    observations = []
+    for bit, complement, toggled in pairing.group_test_rounds(interfaces):
+        lost = {name for name in interfaces
+                if name not in toggled and (cabling.get(name) in toggled or name in flapping)}
+        observations.append((bit, complement, lost))
+    return observations
+
+
+@pytest.mark.parametrize("interfaces, cabling, flapping, expected_pairs, expected_ambiguous", [
+    # Every pair recovered, including non power-of-two port counts
+    (["a0", "a1"], {'a0': "a1"}, (), [{"a0", "a1"}], []),
+    (["a0", "a1", "b0", "b1"], {'a0': "a1", 'b0': "b1"}, (), [{"a0", "a1"}, {"b0", "b1"}], []),
+    (["p0", "p1", "p2", "p3", "p4", "p5"], {'p0': "p5", 'p1': "p3", 'p2': "p4"}, (),
+     [{"p0", "p5"}, {"p1", "p3"}, {"p2", "p4"}], []),
+    (["p0", "p1", "p2", "p3", "p4", "p5", "p6", "p7"], {'p0': "p7", 'p1': "p2", 'p3': "p6", 'p4': "p5"}, (),
+     [{"p0", "p7"}, {"p1", "p2"}, {"p3", "p6"}, {"p4", "p5"}], []),
+    # An unpaired port decodes to its own code and is left out instead of mis-paired
+    (["a0", "a1", "x0"], {'a0': "a1"}, (), [{"a0", "a1"}], []),
+    (["x0", "a0", "a1", "x1", "b0"], {'a0': "b0", 'a1': "x1"}, (), [{"a0", "b0"}, {"a1", "x1"}], []),
+    # A flapping port collides with a real pair's code and is reported, not paired
+    (["a0", "a1", "x0", "x1"], {'a0': "a1"}, ("x1",), [{"a0", "a1"}], ["x1"]),
+])
+def test_group_test_decode(pairing, interfaces, cabling, flapping, expected_pairs, expected_ambiguous):
+    cabling = {**cabling, **{peer: name for name, peer in cabling.items()}}
+    observations = group_test_observations(pairing, interfaces, cabling, flapping)
+
+    links, ambiguous = pairing.decode_group_test(interfaces, observations)
+
+    assert sorted(map(sorted, {frozenset(link) for link in links})) == sorted(map(sorted, expected_pairs))
+    assert all([peer, name] in links for name, peer in links)
+    assert ambiguous == expected_ambiguous
+
+
+@pytest.mark.parametrize("count, rounds", [(0, 0), (1, 2), (2, 2), (3, 4), (8, 6), (9, 8)])
+def test_group_test_rounds_leave_each_port_untouched_once_per_bit(pairing, count, rounds):
+    interfaces = [f"p{idx}" for idx in range(count)]
+    schedule = pairing.group_test_rounds(interfaces)
+
+    assert len(schedule) == rounds
+    for bit in range(rounds // 2):
+        toggled = [set(names) for b, _, names in schedule if b == bit]
+        assert all(sum(name not in names for names in toggled) == 1 for name in interfaces)
+
+
+def test_bring_interfaces_up_waits_for_admin_state_not_carrier(pairing, monkeypatch):
+    net_root = os.path.join(pairing.sysfs_root, "class", "net")
+    for name in ("cabled0", "uncabled0"):
+        os.makedirs(os.path.join(net_root, name))
+        with open(os.path.join(net_root, name, "flags"), "w") as f:
+            f.write("0x1002\n")
+
+    def set_links_state(interfaces, state):
+        for name in interfaces:
+            with open(os.path.join(net_root, name, "flags"), "w") as f:
+                f.write("0x1003\n")  # IFF_UP set; neither port has carrier yet
+        return True
+
+    monkeypatch.setattr(pairing, "set_links_state", set_links_state)
+    started = time.monotonic()
+
+    brought_up = pairing.bring_interfaces_up(
+        [{'name': "cabled0", 'status': "DOWN"}, {'name': "uncabled0", 'status': "DOWN"}, {'name': "up0", 'status': "UP"}])
+
+    assert brought_up == ["cabled0", "uncabled0"]
+    assert time.monotonic() - started < 1.0
+    assert pairing.admin_states(brought_up) == {'cabled0': True, 'uncabled0': True}
+
+
+class ResettingEthtool(NoEthtool):
+    def __init__(self):
+        self.resets = []
+
+    def nway_reset(self, interface):
+        self.resets.append(interface)
+        return True
+
+
+def test_link_changes_drop_cached_interface_state(pairing, monkeypatch):
+    monkeypatch.setattr(pairing, "command_cache", CommandCache())
+    monkeypatch.setattr(pairing, "ethtool", ResettingEthtool())
+
+    def run_command(command, description="", check_output=False):
+        # A concurrent `ip -br a` caching the pre-change state while the batch runs
+        pairing.command_cache.put(["ip", "-br", "a"], (True, "ens802f0np0 UP"), 60.0)
+        return True, ""
+
+    monkeypatch.setattr(pairing, "run_command", run_command)
+
+    assert pairing.set_links_state(["ens802f0np0"], "down")
+    assert pairing.command_cache.get(["ip", "-br", "a"]) is None
+
+    pairing.command_cache.put(["ip", "-br", "a"], (True, "ens802f0np0 UP"), 60.0)
+    assert pairing.reset_link("ens802f0np0")
+    assert pairing.ethtool.resets == ["ens802f0np0"]
+    assert pairing.command_cache.get(["ip", "-br", "a"]) is None
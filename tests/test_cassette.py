@@ -0,0 +1,100 @@
+import os
+import struct
+
+import pytest
+
+from script_container.execution.cassette import CommandCassette
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.ethtool_ioctl import CassetteEthtoolBackend, EthtoolIoctl
+from script_container.execution.bus_info_details import (
+    PairingManagerInfo, RecordingLinkSource, ReplayLinkSource, build_link_message)
+
+
+def record_then_replay(path, actions):
+    """
+    Runs `actions(cassette)` once recording and once replaying the same cassette.
+    """
+    recorder = CommandCassette(str(path), "record")
+    recorded = actions(recorder)
+    recorder.close()
+    player = CommandCassette(str(path), "replay")
+    return recorded, actions(player), player
+
+
+def test_capture_round_trip_and_stream_exhaustion(tmp_path):
+    reads = iter(["first", "second"])
+
+    def actions(cassette):
+        return [cassette.capture(["#stream"], lambda: next(reads), repeat=False) for _ in range(2)] + \
+            [cassette.capture(["#stream"], lambda: "third", repeat=False, default="done")]
+
+    recorded, replayed, player = record_then_replay(tmp_path / "tape.jsonl", actions)
+
+    assert recorded == ["first", "second", "third"]
+    assert replayed == ["first", "second", "third"]
+    assert player.misses == []
+
+
+class OneLinkBackend:
+    def ioctl(self, interface, buffer):
+        if interface != "ens1f0":
+            raise OSError(19, "No such device")
+        struct.pack_into("=I", buffer, 4, 1)
+
+    def close(self):
+        pass
+
+
+def test_ethtool_ioctls_replay_without_a_socket(tmp_path):
+    def actions(cassette):
+        backend = CassetteEthtoolBackend(cassette, OneLinkBackend() if cassette.recording else None)
+        ethtool = EthtoolIoctl(backend)
+        with pytest.raises(OSError) as error:
+            ethtool.link_detected("ens1f1")
+        return ethtool.link_detected("ens1f0"), error.value.errno
+
+    recorded, replayed, _ = record_then_replay(tmp_path / "tape.jsonl", actions)
+
+    assert recorded == replayed == (True, 19)
+
+
+def test_link_datagrams_replay_in_order(tmp_path):
+    datagrams = [build_link_message(7, "ens1f0", False), build_link_message(8, "ens1f1", False)]
+
+    def actions(cassette):
+        if cassette.recording:
+            source = RecordingLinkSource(ReplayLinkSource(datagrams), cassette)
+        else:
+            source = ReplayLinkSource.from_cassette(cassette)
+        return [source.recv() for _ in datagrams]
+
+    recorded, replayed, _ = record_then_replay(tmp_path / "tape.jsonl", actions)
+
+    assert recorded == replayed == datagrams
+
+
+def test_pairing_discovery_replays_without_the_host(tmp_path, monkeypatch):
+    pci_path = tmp_path / "sys" / "bus" / "pci" / "devices" / "0000:ca:00.0"
+    pci_path.mkdir(parents=True)
+    for name, value in (("vendor", "0x8086"), ("device", "0x1592")):
+        (pci_path / name).write_text(value + "\n")
+    net_path = tmp_path / "sys" / "class" / "net" / "ens802f0np0"
+    net_path.mkdir(parents=True)
+    (net_path / "carrier").write_text("1\n")
+    os.symlink(pci_path, net_path / "device")
+    monkeypatch.setenv("PAIRING_SYSFS_ROOT", str(tmp_path / "sys"))
+
+    def actions(cassette):
+        monkeypatch.setattr(CommonFuntion, "cassette", cassette)
+        with PairingManagerInfo(ethtool=EthtoolIoctl(OneLinkBackend())) as pairing:
+            return pairing.bus_info, pairing.carrier_states(["ens802f0np0"])
+
+    recorder = CommandCassette(str(tmp_path / "tape.jsonl"), "record")
+    recorded = actions(recorder)
+    recorder.close()
+    # The host tree is gone: replay must rebuild it from the recording
+    monkeypatch.setenv("PAIRING_SYSFS_ROOT", str(tmp_path / "missing"))
+    replayed = actions(CommandCassette(str(tmp_path / "tape.jsonl"), "replay"))
+
+    assert recorded[0][0]['bus'] == "pci@0000:ca:00.0"
+    assert replayed == recorded
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from script_container.execution.command_executor import AsyncCommandExecutor
+from script_container.execution.output_stream import StreamCapture
+
+
+def process_gone(pid):
+    """
+    True once `pid` has exited (a zombie waiting for its reaper counts as exited).
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return True
+
+
+def test_results_keep_the_order_of_the_commands():
+    results = AsyncCommandExecutor(max_concurrency=4).run_all([
+        {'command': ["sh", "-c", "sleep 0.2; echo slow"], 'check_output': True},
+        {'command': ["echo", "fast"], 'check_output': True},
+        ["sh", "-c", "exit 2"],
+        ["true"],
+    ])
+
+    assert results[0] == (True, "slow\n")
+    assert results[1] == (True, "fast\n")
+    assert not results[2][0] and "exit status 2" in results[2][1]
+    assert results[3] == (True, "")
+
+
+def test_concurrency_cap_is_respected():
+    commands = [["sleep", "0.2"]] * 4
+
+    started = time.monotonic()
+    assert all(success for success, _ in AsyncCommandExecutor(max_concurrency=2).run_all(commands))
+    capped = time.monotonic() - started
+
+    started = time.monotonic()
+    assert all(success for success, _ in AsyncCommandExecutor(max_concurrency=4).run_all(commands))
+    parallel = time.monotonic() - started
+
+    assert capped >= 0.4
+    assert parallel < capped
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    command = ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"]
+
+    started = time.monotonic()
+    success, output = AsyncCommandExecutor().run_all([{'command': command, 'timeout': 0.5}])[0]
+
+    assert not success and "timed out after 0.5 seconds" in output
+    assert time.monotonic() - started < 5
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 2
+    while not process_gone(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert process_gone(child)
+
+
+def test_missing_binary_is_reported_as_failure(tmp_path):
+    success, output = AsyncCommandExecutor().run_all([[str(tmp_path / "missing-tool")]])[0]
+
+    assert not success and "missing-tool" in output
+
+
+def test_capture_streams_the_output():
+    lines = []
+    capture = StreamCapture([lines.append], tail_lines=2)
+    result = AsyncCommandExecutor().run_all([{'command': ["seq", "1", "5"], 'capture': capture}])[0]
+
+    assert result == (True, "4\n5")
+    assert lines == ["1", "2", "3", "4", "5"]
+
+
+def test_cancel_from_another_thread_stops_running_commands():
+    executor = AsyncCommandExecutor()
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(executor.run_all([["sleep", "30"], ["sleep", "30"]])))
+
+    started = time.monotonic()
+    runner.start()
+    while len(executor.processes) < 2 and time.monotonic() - started < 5:
+        time.sleep(0.05)
+    executor.cancel()
+    runner.join(10)
+
+    assert not runner.is_alive()
+    assert time.monotonic() - started < 10
+    assert len(results) == 2 and not any(success for success, _ in results)
+    assert not executor.processes and not executor.tasks
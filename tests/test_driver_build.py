@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from script_container.execution.driver_build import DRIVER_MANIFEST, DriverBuildCache, build_jobs
+from script_container.execution.step_journal import file_digest
+
+pytestmark = pytest.mark.skipif(shutil.which("make") is None, reason="make is not installed")
+
+KERNEL = "6.8.0-test"
+
+# Stand-in for an Intel out-of-tree driver: builds ice.ko and installs it plus a DDP package
+MAKEFILE = """\
+MODULES := $(DESTDIR)/lib/modules/$(KVER)/updates/drivers/net/ethernet/intel/ice
+FIRMWARE := $(DESTDIR)/lib/firmware/updates/intel/ice/ddp
+
+ice.ko:
+\tprintf 'module built from %s' "$$(cat ../VERSION)" > ice.ko
+
+install: ice.ko
+\tmkdir -p $(MODULES) $(FIRMWARE)
+\tcp ice.ko $(MODULES)/ice.ko
+\tprintf 'ddp' > $(FIRMWARE)/ice-1.3.36.0.pkg
+\tln -sf ice-1.3.36.0.pkg $(FIRMWARE)/ice.pkg
+"""
+
+
+@pytest.fixture
+def driver(tmp_path, monkeypatch):
+    """
+    Driver source tree and a DriverBuildCache installing into a scratch root, with the
+    compiler version pinned and depmod calls captured instead of run.
+    """
+    source = tmp_path / "ice-1.13.7"
+    (source / "src").mkdir(parents=True)
+    (source / "src" / "Makefile").write_text(MAKEFILE)
+    (source / "VERSION").write_text("1.13.7")
+    install_root = tmp_path / "root"
+    monkeypatch.setenv("DESTDIR", str(install_root))
+    monkeypatch.setenv("KVER", KERNEL)
+
+    cache = DriverBuildCache(cache_root=str(tmp_path / "cache"), install_root=str(install_root), jobs=2)
+    cache.depmod_calls = []
+    monkeypatch.setattr(cache, "compiler_version", lambda: "gcc (Ubuntu 13.2.0) 13.2.0")
+    monkeypatch.setattr(cache, "run_command",
+                        lambda command, description="", *args, **kwargs: cache.depmod_calls.append(command)
+                        or (True, ""))
+    return source, install_root, cache
+
+
+def entry_of(cache, source):
+    return cache.entry_path(str(source), cache.build_key("digest-1", KERNEL, cache.compiler_version()))
+
+
+def test_miss_builds_and_caches_a_verified_manifest(driver):
+    source, install_root, cache = driver
+
+    assert cache.install(str(source), "digest-1", KERNEL)
+
+    module = f"lib/modules/{KERNEL}/updates/drivers/net/ethernet/intel/ice/ice.ko"
+    entry = entry_of(cache, source)
+    with open(os.path.join(entry, DRIVER_MANIFEST)) as f:
+        manifest = json.load(f)
+    assert manifest['modules'] == ["ice.ko"]
+    assert (manifest['kernel'], manifest['source_digest']) == (KERNEL, "digest-1")
+    assert sorted(manifest['files']) == ["lib/firmware/updates/intel/ice/ddp/ice-1.3.36.0.pkg", module]
+    assert manifest['links'] == {"lib/firmware/updates/intel/ice/ddp/ice.pkg": "ice-1.3.36.0.pkg"}
+    assert manifest['files'][module] == file_digest(os.path.join(entry, "root", module))
+    # The scratch build directory and the temporary entry are gone; the source tree is untouched
+    assert sorted(os.listdir(cache.cache_root)) == [os.path.basename(entry)]
+    assert not (source / "src" / "ice.ko").exists()
+    assert cache.depmod_calls == []
+
+
+def test_hit_installs_cached_artifacts_without_make(driver, tmp_path, monkeypatch):
+    source, install_root, cache = driver
+    assert cache.install(str(source), "digest-1", KERNEL)
+    shutil.rmtree(install_root)
+
+    monkeypatch.setattr(cache, "run_command_streaming", lambda *args, **kwargs: pytest.fail("make ran on a hit"))
+    assert cache.install(str(source), "digest-1", KERNEL)
+
+    ddp = install_root / "lib/firmware/updates/intel/ice/ddp"
+    assert (install_root / f"lib/modules/{KERNEL}/updates/drivers/net/ethernet/intel/ice/ice.ko").read_text() == \
+        "module built from 1.13.7"
+    assert os.readlink(ddp / "ice.pkg") == "ice-1.3.36.0.pkg" and (ddp / "ice.pkg").read_text() == "ddp"
+    assert cache.depmod_calls == [["depmod", "-a", KERNEL]]
+
+
+def test_tampered_cache_entry_fails_verification_and_is_rebuilt(driver):
+    source, install_root, cache = driver
+    assert cache.install(str(source), "digest-1", KERNEL)
+    module = f"lib/modules/{KERNEL}/updates/drivers/net/ethernet/intel/ice/ice.ko"
+    cached = os.path.join(entry_of(cache, source), "root", module)
+    with open(cached, "w") as f:
+        f.write("corrupted")
+    (install_root / module).unlink()
+
+    assert not cache.install_cached(entry_of(cache, source), KERNEL)
+    assert not (install_root / module).exists()  # nothing is copied once a checksum fails
+
+    assert cache.install(str(source), "digest-1", KERNEL)
+    with open(cached) as f:
+        assert f.read() == "module built from 1.13.7"
+    assert (install_root / module).read_text() == "module built from 1.13.7"
+
+
+def test_broken_manifest_is_reported_not_raised(driver):
+    source, install_root, cache = driver
+    assert cache.install(str(source), "digest-1", KERNEL)
+    with open(os.path.join(entry_of(cache, source), DRIVER_MANIFEST), "w") as f:
+        f.write("{truncated")
+
+    assert not cache.install_cached(entry_of(cache, source), KERNEL)
+
+
+def test_build_without_installed_modules_is_not_cached(driver):
+    source, install_root, cache = driver
+    (source / "src" / "Makefile").write_text("ice.ko:\n\ttouch ice.ko\n\ninstall: ice.ko\n\t@true\n")
+
+    assert cache.install(str(source), "digest-1", KERNEL)
+    assert os.listdir(cache.cache_root) == []
+
+
+def test_failed_make_is_reported(driver):
+    source, install_root, cache = driver
+    (source / "src" / "Makefile").write_text("ice.ko:\n\t@echo 'error: implicit declaration' && false\n")
+
+    assert not cache.install(str(source), "digest-1", KERNEL)
+    assert os.listdir(cache.cache_root) == []
+
+
+def test_build_key_covers_source_kernel_and_compiler():
+    cache = DriverBuildCache(cache_root="/unused", jobs=1)
+    key = cache.build_key("digest-1", KERNEL, "gcc 13")
+
+    assert cache.build_key("digest-1", KERNEL, "gcc 13") == key
+    assert len({key, cache.build_key("digest-2", KERNEL, "gcc 13"), cache.build_key("digest-1", "6.9.0", "gcc 13"),
+                cache.build_key("digest-1", KERNEL, "gcc 14")}) == 4
+
+
+def test_build_jobs_honours_the_environment(monkeypatch):
+    monkeypatch.setenv("DRIVER_BUILD_JOBS", "3")
+    assert build_jobs() == 3
+    monkeypatch.setenv("DRIVER_BUILD_JOBS", "0")
+    assert build_jobs() == 1
+    monkeypatch.delenv("DRIVER_BUILD_JOBS")
+    assert build_jobs() >= 1
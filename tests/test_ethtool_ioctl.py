@@ -0,0 +1,132 @@
+import struct
+
+import pytest
+
+from script_container.execution.ethtool_ioctl import (
+    DRVINFO, ETHTOOL_CMD, ETHTOOL_GDRVINFO, ETHTOOL_GLINK, ETHTOOL_GLINKSETTINGS, ETHTOOL_GSET, ETHTOOL_NWAY_RST,
+    LINK_SETTINGS_HEADER, EthtoolIoctl)
+from script_container.execution.bus_info_details import PairingManagerInfo
+
+
+class FakeBackend:
+    """
+    Answers ethtool commands the way the kernel fills the buffer in place.
+    Interfaces missing from `ports` fail every command with ENODEV.
+    """
+
+    def __init__(self, ports, nwords=2, link_settings=True):
+        self.ports = ports
+        self.nwords = nwords
+        self.link_settings = link_settings
+        self.calls = []
+        self.closed = False
+
+    def ioctl(self, interface, buffer):
+        command = struct.unpack_from("=I", buffer)[0]
+        self.calls.append((interface, command, len(buffer)))
+        if interface not in self.ports:
+            raise OSError(19, "No such device")
+        port = self.ports[interface]
+
+        if command == ETHTOOL_GDRVINFO:
+            DRVINFO.pack_into(buffer, 0, command, port['driver'].encode(), b"1.0.0", port['firmware'].encode(),
+                              port['bus'].encode(), b"", b"", 0, 0, 0, 0, 0)
+        elif command == ETHTOOL_GLINKSETTINGS:
+            if not self.link_settings:
+                raise OSError(95, "Operation not supported")
+            requested = struct.unpack_from("=b", buffer, 15)[0]
+            if requested != self.nwords:
+                # Handshake answer: only the negated word count is filled in
+                struct.pack_into("=b", buffer, 15, -self.nwords)
+                return
+            assert len(buffer) == LINK_SETTINGS_HEADER.size + 3 * self.nwords * 4
+            LINK_SETTINGS_HEADER.pack_into(buffer, 0, command, port['speed'], 1, 3, 0, 1, 0, 0, 0,
+                                           self.nwords, 0, 0, 0, 0)
+        elif command == ETHTOOL_GSET:
+            speed = port['speed']
+            ETHTOOL_CMD.pack_into(buffer, 0, command, 0, 0, speed & 0xFFFF, 0, 3, 0, 0, 1, 0, 0, 0,
+                                  speed >> 16, 0, 0, 0)
+        elif command == ETHTOOL_GLINK:
+            struct.pack_into("=I", buffer, 4, int(port['link']))
+        elif command != ETHTOOL_NWAY_RST:
+            raise OSError(95, "Operation not supported")
+
+    def close(self):
+        self.closed = True
+
+
+PORTS = {
+    'ens802f0np0': {'driver': "ice", 'firmware': "4.40 0x8001c967 1.3534.0", 'bus': "0000:ca:00.0",
+                    'speed': 100000, 'link': True},
+}
+
+
+def test_driver_info_decodes_drvinfo():
+    ethtool = EthtoolIoctl(FakeBackend(PORTS))
+
+    assert ethtool.driver_info("ens802f0np0") == {
+        'driver': "ice", 'version': "1.0.0", 'firmware_version': "4.40 0x8001c967 1.3534.0",
+        'bus_info': "0000:ca:00.0", 'expansion_rom_version': ""}
+
+
+def test_link_settings_nwords_handshake():
+    backend = FakeBackend(PORTS, nwords=3)
+
+    assert EthtoolIoctl(backend).link_settings("ens802f0np0") == {
+        'speed': 100000, 'duplex': "full", 'autoneg': True, 'port': 3}
+    # Header-only probe first, then a buffer sized for three words of each link mode mask
+    assert [size for _, _, size in backend.calls] == [
+        LINK_SETTINGS_HEADER.size, LINK_SETTINGS_HEADER.size + 3 * 3 * 4]
+
+
+def test_link_settings_falls_back_to_gset():
+    backend = FakeBackend(PORTS, link_settings=False)
+
+    # 100000 does not fit in the 16-bit speed field, so speed_hi must be merged back in
+    assert EthtoolIoctl(backend).link_settings("ens802f0np0")['speed'] == 100000
+    assert [command for _, command, _ in backend.calls] == [ETHTOOL_GLINKSETTINGS, ETHTOOL_GSET]
+
+
+@pytest.mark.parametrize("speed, expected", [(0, None), (0xFFFF, None), (0xFFFFFFFF, None), (25000, 25000)])
+def test_link_settings_unknown_speed(speed, expected):
+    ports = {'p0': dict(PORTS['ens802f0np0'], speed=speed)}
+
+    assert EthtoolIoctl(FakeBackend(ports)).link_settings("p0")['speed'] == expected
+
+
+def test_collect_keeps_partial_results_and_skips_missing_ports():
+    details = EthtoolIoctl(FakeBackend(PORTS)).collect(["ens802f0np0", "missing0"])
+
+    assert details['missing0'] == {}
+    assert (details['ens802f0np0']['driver'], details['ens802f0np0']['speed'],
+            details['ens802f0np0']['link_detected']) == ("ice", 100000, True)
+
+
+def test_context_manager_closes_the_backend():
+    backend = FakeBackend(PORTS)
+    with EthtoolIoctl(backend) as ethtool:
+        assert ethtool.nway_reset("ens802f0np0")
+
+    assert backend.closed
+
+
+def test_firmware_versions_fall_back_to_ethtool_cli_for_unreadable_ports(tmp_path, monkeypatch):
+    backend = FakeBackend(PORTS)
+    pairing = PairingManagerInfo(sysfs_root=str(tmp_path / "sys"), kmsg_path=str(tmp_path / "kmsg"),
+                                 ethtool=EthtoolIoctl(backend))
+    pairing.nic_records = [{'device': "ens802f0np0"}, {'device': "ens802f1np1"}]
+    commands = []
+
+    def run_commands_concurrently(specs):
+        commands.extend(spec['command'] for spec in specs)
+        return [(True, "driver: ice\nfirmware-version: 4.40 0x8001c967\nbus-info: 0000:ca:00.1\n")]
+
+    monkeypatch.setattr(pairing, "run_commands_concurrently", run_commands_concurrently)
+
+    assert pairing.firmware_versions() == {'ens802f0np0': "4.40 0x8001c967 1.3534.0",
+                                           'ens802f1np1': "4.40 0x8001c967"}
+    assert commands == [["ethtool", "-i", "ens802f1np1"]]
+
+    # A backend passed in belongs to the caller and is not closed with the pairing manager
+    pairing.close()
+    assert not backend.closed
@@ -0,0 +1,64 @@
+from script_container.execution.kmsg_reader import KmsgReader, KmsgRecord
+
+
+def append(path, *lines):
+    with open(path, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def test_parse_record():
+    assert KmsgReader.parse_record("6,1042,812100231,-;ice 0000:ca:00.0 ens802f0np0: NIC Link is Down") == \
+        KmsgRecord(1042, 812.100231, 6, "ice 0000:ca:00.0 ens802f0np0: NIC Link is Down")
+    assert KmsgReader.parse_record("30,7,1000,c;systemd[1]: started").priority == 6
+    assert KmsgReader.parse_record(" SUBSYSTEM=pci") is None
+    assert KmsgReader.parse_record("no header") is None
+    assert KmsgReader.parse_record("x,y,z;bad numbers") is None
+
+
+def test_reader_starts_at_the_end_of_the_log(tmp_path):
+    kmsg = tmp_path / "kmsg"
+    append(kmsg, "6,1,1000000,-;boot message")
+    reader = KmsgReader(str(kmsg))
+    try:
+        assert reader.poll() == []
+        append(kmsg, "6,2,2000000,-;new message")
+        assert [record.message for record in reader.poll()] == ["new message"]
+    finally:
+        reader.close()
+
+
+def test_cursors_are_independent_and_non_destructive(tmp_path):
+    kmsg = tmp_path / "kmsg"
+    kmsg.write_text("")
+    reader = KmsgReader(str(kmsg))
+    try:
+        first = reader.cursor()
+        append(kmsg, "6,10,812100231,-;ice 0000:ca:00.0 ens802f0np0: NIC Link is Down",
+               " DEVICE=+pci:0000:ca:00.0")
+        second = reader.cursor()
+        append(kmsg, "6,11,812100877,-;ice 0000:ca:00.1 ens802f1np1: NIC Link is Down")
+
+        assert [record.seq for record in reader.read_since(first)] == [10, 11]
+        assert [record.seq for record in reader.read_since(second)] == [11]
+        # Reading never consumes records for other cursors
+        assert [record.seq for record in reader.read_since(first)] == [10, 11]
+        assert reader.text_since(second) == "[  812.100877] ice 0000:ca:00.1 ens802f1np1: NIC Link is Down\n"
+    finally:
+        reader.close()
+
+
+def test_partial_lines_and_replayed_sequence_numbers(tmp_path):
+    kmsg = tmp_path / "kmsg"
+    kmsg.write_text("")
+    reader = KmsgReader(str(kmsg), history=2)
+    try:
+        with open(kmsg, "a") as f:
+            f.write("6,1,1000000,-;split ")
+        assert reader.poll() == []
+        append(kmsg, "record", "6,1,1000000,-;duplicate", "6,2,2000000,-;two", "6,3,3000000,-;three")
+
+        assert [record.message for record in reader.poll()] == ["split record", "two", "three"]
+        # Only the newest `history` records are kept
+        assert [record.seq for record in reader.read_since(-1)] == [2, 3]
+    finally:
+        reader.close()
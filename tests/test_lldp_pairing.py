@@ -0,0 +1,120 @@
+import socket
+import struct
+
+import pytest
+
+from script_container.execution.lldp_pairing import (
+    ETH_P_LLDP, LLDP_MULTICAST, SUBTYPE_PORT_MAC, LldpNeighborCollector, build_lldp_frame, parse_lldp_frame, read_pcap)
+
+
+def write_pcap(path, frames, endian="<", magic=0xa1b2c3d4):
+    with open(path, "wb") as f:
+        f.write(struct.pack(endian + "IHHiIII", magic, 2, 4, 0, 0, 65535, 1))
+        for frame in frames:
+            f.write(struct.pack(endian + "IIII", 0, 0, len(frame), len(frame)) + frame)
+
+
+def fake_sysfs(root, macs):
+    for interface, mac in macs.items():
+        path = root / "class" / "net" / interface
+        path.mkdir(parents=True)
+        (path / "address").write_text(mac + "\n")
+    return str(root)
+
+
+def test_build_and_parse_round_trip():
+    frame = build_lldp_frame("3c:fd:fe:aa:bb:01", "ens1f0", "dut-01", ttl=90)
+
+    assert frame[:6] == LLDP_MULTICAST
+    assert parse_lldp_frame(frame) == {
+        'source_mac': "3c:fd:fe:aa:bb:01",
+        'chassis_id': "dut-01",
+        'port_id': "3c:fd:fe:aa:bb:01",
+        'port_id_subtype': SUBTYPE_PORT_MAC,
+        'port_description': "ens1f0",
+        'system_name': "dut-01",
+        'ttl': 90,
+    }
+
+
+def test_parse_vlan_tagged_frame():
+    frame = build_lldp_frame("3c:fd:fe:aa:bb:01", "ens1f0", "dut-01")
+    tagged = frame[:12] + struct.pack("!HH", 0x8100, 100) + frame[12:]
+
+    assert parse_lldp_frame(tagged)['port_description'] == "ens1f0"
+
+
+def test_parse_rejects_non_lldp_and_short_frames():
+    ipv4 = LLDP_MULTICAST + bytes(6) + struct.pack("!H", 0x0800) + bytes(20)
+
+    assert parse_lldp_frame(ipv4) is None
+    assert parse_lldp_frame(b"\x01\x02") is None
+
+
+def test_parse_stops_at_end_tlv_and_truncated_values():
+    header = LLDP_MULTICAST + bytes.fromhex("3cfdfeaabb02") + struct.pack("!H", ETH_P_LLDP)
+    chassis = struct.pack("!H", (1 << 9) | 7) + bytes([4]) + bytes.fromhex("3cfdfeaabb02")
+    end = struct.pack("!H", 0)
+    trailing_name = struct.pack("!H", (5 << 9) | 3) + b"bad"
+    truncated_ttl = struct.pack("!H", (3 << 9) | 2) + b"\x00"
+
+    neighbor = parse_lldp_frame(header + chassis + end + trailing_name)
+    assert neighbor['chassis_id'] == "3c:fd:fe:aa:bb:02"
+    assert neighbor['system_name'] == ""
+    assert parse_lldp_frame(header + truncated_ttl)['ttl'] == 0
+
+
+def test_read_pcap_both_byte_orders(tmp_path):
+    frames = [build_lldp_frame("3c:fd:fe:aa:bb:01", "ens1f0", "dut-01"), b"\x00" * 60]
+    write_pcap(tmp_path / "le.pcap", frames, "<")
+    write_pcap(tmp_path / "be.pcap", frames, ">")
+
+    assert read_pcap(str(tmp_path / "le.pcap")) == frames
+    assert read_pcap(str(tmp_path / "be.pcap")) == frames
+
+
+def test_read_pcap_rejects_other_files(tmp_path):
+    (tmp_path / "not.pcap").write_bytes(b"garbage" * 10)
+
+    with pytest.raises(ValueError):
+        read_pcap(str(tmp_path / "not.pcap"))
+
+
+def test_neighbors_from_pcap_and_map_peers(tmp_path):
+    macs = {'ens1f0': "3c:fd:fe:aa:bb:00", 'ens1f1': "3c:fd:fe:aa:bb:01", 'ens2f0': "3c:fd:fe:cc:dd:00"}
+    collector = LldpNeighborCollector(sysfs_root=fake_sysfs(tmp_path / "sys", macs))
+    write_pcap(tmp_path / "sample.pcap", [
+        build_lldp_frame(macs['ens1f1'], "ens1f1", socket.gethostname()),
+        b"\x00" * 60,
+        build_lldp_frame("00:11:22:33:44:55", "Ethernet12", "switch-7"),
+    ])
+    seen = collector.neighbors_from_pcap(str(tmp_path / "sample.pcap"))
+
+    links, remote = collector.map_peers({'ens1f0': seen[0], 'ens2f0': seen[1]}, list(macs))
+    assert links == [["ens1f0", "ens1f1"]]
+    assert remote == {'ens2f0': {'chassis_id': "switch-7", 'port_id': "00:11:22:33:44:55", 'system_name': "switch-7"}}
+
+
+def test_parse_lldptool_output():
+    output = ("Chassis ID TLV\n\tMAC: 3C:FD:FE:AA:BB:00\n"
+              "Port ID TLV\n\tMAC: 3C:FD:FE:AA:BB:01\n"
+              "Time to Live TLV\n\t120\n"
+              "System Name TLV\n\tdut-01\n"
+              "End of LLDPDU TLV\n")
+    neighbor = LldpNeighborCollector().parse_lldptool_output(output)
+
+    assert neighbor['chassis_id'] == "3c:fd:fe:aa:bb:00"
+    assert neighbor['port_id'] == "3c:fd:fe:aa:bb:01"
+    assert neighbor['port_id_subtype'] == SUBTYPE_PORT_MAC
+    assert neighbor['ttl'] == 120
+    assert LldpNeighborCollector().parse_lldptool_output("Agent instance for port not found\n") is None
+
+
+def test_query_lldptool_without_lldptool(monkeypatch):
+    collector = LldpNeighborCollector()
+
+    def missing(*args, **kwargs):
+        raise FileNotFoundError("lldptool")
+
+    monkeypatch.setattr(collector, "run_command", missing)
+    assert collector.query_lldptool(["ens1f0", "ens1f1"]) == {}
@@ -0,0 +1,100 @@
+import shutil
+
+import pytest
+
+from script_container.execution.constant import CommandCache
+from script_container.execution.module_manager import KernelModuleManager
+
+
+MODINFO = """\
+filename:       /lib/modules/6.8.0/updates/drivers/net/ethernet/intel/ice/ice.ko
+version:        1.14.9
+srcversion:     NEW0000000000000000000
+alias:          pci:v00008086d00001592sv*sd*bc*sc*i*
+"""
+
+
+class FakeKernel:
+    """
+    Scripted run_command: modinfo reports the installed module, rmmod / modprobe edit the fake sysfs.
+    """
+
+    def __init__(self, sysfs, fail=(), loads="NEW0000000000000000000"):
+        self.sysfs = sysfs
+        self.fail = set(fail)
+        self.loads = loads
+        self.calls = []
+
+    def load(self, name, srcversion):
+        path = self.sysfs / "module" / name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "initstate").write_text("live\n")
+        (path / "srcversion").write_text(srcversion + "\n")
+
+    def __call__(self, command, description="", check_output=False):
+        self.calls.append(" ".join(command))
+        if command[0] == "modinfo":
+            return True, MODINFO
+        if " ".join(command) in self.fail:
+            return False, "rmmod: ERROR: Module ice is in use"
+        if command[0] == "rmmod":
+            shutil.rmtree(self.sysfs / "module" / command[1])
+        elif command[0] == "modprobe":
+            self.load(command[1], self.loads if command[1] == "ice" else "DEP")
+        return True, ""
+
+
+@pytest.fixture
+def kernel(tmp_path):
+    sysfs = tmp_path / "sys"
+    fake = FakeKernel(sysfs)
+    fake.load("ice", "OLD0000000000000000000")
+    fake.load("irdma", "DEP")
+    return fake
+
+
+def manager(kernel, monkeypatch):
+    modules = KernelModuleManager(sysfs_root=str(kernel.sysfs), listener_factory=None)
+    monkeypatch.setattr(modules, "run_command", kernel)
+    return modules
+
+
+def test_identical_module_is_not_reloaded(kernel, monkeypatch):
+    kernel.load("ice", "NEW0000000000000000000")
+
+    assert manager(kernel, monkeypatch).ensure_current("ice")['action'] == "unchanged"
+    assert [call for call in kernel.calls if not call.startswith("modinfo")] == []
+
+
+def test_reload_removes_dependents_first_and_restores_them(kernel, monkeypatch):
+    result = manager(kernel, monkeypatch).ensure_current("ice", timeout=0)
+
+    assert result['action'] == "reloaded"
+    assert kernel.calls[1:] == ["rmmod irdma", "rmmod ice", "modprobe ice", "modprobe irdma"]
+
+
+def test_failed_rmmod_reports_failure_and_restores_dependents(kernel, monkeypatch):
+    kernel.fail = {"rmmod ice"}
+    modules = manager(kernel, monkeypatch)
+
+    assert modules.ensure_current("ice", timeout=0)['action'] == "failed"
+    assert "modprobe ice" not in kernel.calls
+    assert modules.is_loaded("irdma")
+    assert modules.loaded_version("ice")['srcversion'] == "OLD0000000000000000000"
+
+
+def test_stale_srcversion_after_modprobe_is_a_failure(kernel, monkeypatch):
+    # modprobe picked another ice.ko than the one installed for this kernel
+    kernel.loads = "OTHER000000000000000000"
+
+    assert manager(kernel, monkeypatch).ensure_current("ice", timeout=0)['action'] == "failed"
+
+
+def test_reload_drops_cached_interface_state(kernel, monkeypatch):
+    modules = manager(kernel, monkeypatch)
+    monkeypatch.setattr(modules, "command_cache", CommandCache())
+    modules.command_cache.put(["ip", "-br", "a"], (True, "ens802f0np0 DOWN"), 60.0)
+
+    modules.ensure_current("ice", timeout=0)
+
+    assert modules.command_cache.get(["ip", "-br", "a"]) is None
@@ -0,0 +1,126 @@
+import os
+
+from script_container.execution.nic_inventory import NicInventory
+
+
+PCI_IDS = """\
+# Fake pci.ids
+8086  Intel Corporation
+\t1592  Ethernet Controller E810-C for QSFP
+\t\t8086 0002  Ethernet Network Adapter E810-C-Q2
+\t159b  Ethernet Controller E810-C for SFP
+15b3  Mellanox Technologies
+\t1017  MT27800 Family [ConnectX-5]
+C 02  Network controller
+\t00  Ethernet controller
+"""
+
+
+class FakeEthtool:
+    def __init__(self, details):
+        self.details = details
+        self.requested = None
+
+    def collect(self, interfaces):
+        self.requested = list(interfaces)
+        return self.details
+
+
+def add_port(sysfs, interface, address, device, mac, driver="ice", numa_node="1"):
+    pci_path = sysfs / "bus" / "pci" / "devices" / address
+    pci_path.mkdir(parents=True)
+    for name, value in (("vendor", "0x8086"), ("device", device), ("subsystem_vendor", "0x8086"),
+                        ("subsystem_device", "0x0002"), ("numa_node", numa_node)):
+        (pci_path / name).write_text(value + "\n")
+    if driver:
+        driver_path = sysfs / "bus" / "pci" / "drivers" / driver
+        driver_path.mkdir(parents=True, exist_ok=True)
+        os.symlink(driver_path, pci_path / "driver")
+    net_path = sysfs / "class" / "net" / interface
+    net_path.mkdir(parents=True)
+    (net_path / "address").write_text(mac + "\n")
+    os.symlink(pci_path, net_path / "device")
+
+
+def fake_sysfs(tmp_path):
+    sysfs = tmp_path / "sys"
+    add_port(sysfs, "ens802f1np1", "0000:ca:00.1", "0x1592", "3c:fd:fe:aa:bb:01")
+    add_port(sysfs, "ens802f0np0", "0000:ca:00.0", "0x1592", "3c:fd:fe:aa:bb:00")
+    add_port(sysfs, "ens1f0", "0000:17:00.0", "0x1234", "3c:fd:fe:cc:dd:00", driver=None, numa_node="-1")
+    (sysfs / "class" / "net" / "lo").mkdir(parents=True)
+    (sysfs / "module" / "ice").mkdir(parents=True)
+    (sysfs / "module" / "ice" / "version").write_text("1.13.7\n")
+    (tmp_path / "pci.ids").write_text(PCI_IDS)
+    return str(sysfs), (str(tmp_path / "missing.ids"), str(tmp_path / "pci.ids"))
+
+
+def test_collect_reads_pci_netdevs_sorted_by_bus(tmp_path):
+    sysfs, pci_ids = fake_sysfs(tmp_path)
+    records = NicInventory(sysfs_root=sysfs, pci_ids_paths=pci_ids).collect()
+
+    assert [record['device'] for record in records] == ["ens1f0", "ens802f0np0", "ens802f1np1"]
+    assert records[1] == {
+        'bus': "pci@0000:ca:00.0",
+        'device': "ens802f0np0",
+        'description': "Ethernet Controller E810-C for QSFP",
+        'mac': "3c:fd:fe:aa:bb:00",
+        'driver': "ice",
+        'driver_version': "1.13.7",
+        'numa_node': 1,
+        'vendor_id': "8086",
+        'device_id': "1592",
+        'subsystem_vendor_id': "8086",
+        'subsystem_device_id': "0002",
+    }
+
+
+def test_collect_unbound_and_unknown_device(tmp_path):
+    sysfs, pci_ids = fake_sysfs(tmp_path)
+    unbound = NicInventory(sysfs_root=sysfs, pci_ids_paths=pci_ids).collect()[0]
+
+    assert unbound['driver'] == "" and unbound['driver_version'] == ""
+    assert unbound['numa_node'] == -1
+    assert unbound['description'] == "Ethernet device 8086:1234"
+
+
+def test_collect_without_pci_ids_or_sysfs(tmp_path):
+    sysfs, _ = fake_sysfs(tmp_path)
+
+    records = NicInventory(sysfs_root=sysfs, pci_ids_paths=()).collect()
+    assert records[1]['description'] == "Ethernet device 8086:1592"
+    assert NicInventory(sysfs_root=str(tmp_path / "nowhere")).collect() == []
+
+
+def test_collect_merges_ethtool_details(tmp_path):
+    sysfs, pci_ids = fake_sysfs(tmp_path)
+    ethtool = FakeEthtool({'ens802f0np0': {'firmware_version': "4.40 0x8001c967 1.3534.0", 'speed': 100000,
+                                           'link_detected': True}})
+    records = NicInventory(sysfs_root=sysfs, pci_ids_paths=pci_ids, ethtool=ethtool).collect()
+
+    assert sorted(ethtool.requested) == ["ens1f0", "ens802f0np0", "ens802f1np1"]
+    assert (records[1]['firmware_version'], records[1]['speed'], records[1]['link_detected']) == \
+        ("4.40 0x8001c967 1.3534.0", 100000, True)
+    assert (records[2]['firmware_version'], records[2]['speed'], records[2]['link_detected']) == ("", None, None)
+
+
+def test_bus_info_and_table(tmp_path):
+    sysfs, pci_ids = fake_sysfs(tmp_path)
+    inventory = NicInventory(sysfs_root=sysfs, pci_ids_paths=pci_ids)
+
+    assert inventory.bus_info()[2] == {'bus': "pci@0000:ca:00.1", 'device': "ens802f1np1",
+                                       'description': "Ethernet Controller E810-C for QSFP"}
+    table = inventory.format_table().splitlines()
+    assert table[0].startswith("Bus info") and set(table[1]) == {"="}
+    assert len(table) == 5
+
+
+def test_snapshot_restores_an_equivalent_tree(tmp_path):
+    sysfs, pci_ids = fake_sysfs(tmp_path)
+    (tmp_path / "sys" / "class" / "net" / "ens802f0np0" / "carrier").write_text("1\n")
+    snapshot = NicInventory(sysfs_root=sysfs).snapshot()
+
+    restored = NicInventory.restore(snapshot, str(tmp_path / "restored"))
+
+    assert NicInventory(sysfs_root=restored, pci_ids_paths=pci_ids).collect() == \
+        NicInventory(sysfs_root=sysfs, pci_ids_paths=pci_ids).collect()
+    assert (tmp_path / "restored" / "class" / "net" / "ens802f0np0" / "carrier").read_text() == "1\n"
@@ -0,0 +1,29 @@
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.output_stream import StreamCapture
+
+
+def test_streaming_keeps_only_the_tail_and_passes_every_line_to_handlers():
+    lines = []
+    success, output = CommonFuntion().run_command_streaming(
+        ["sh", "-c", "seq 1 50; echo done >&2"], "Counting", handlers=[lines.append], tail_lines=3)
+
+    assert success
+    assert output == "49\n50\ndone"
+    assert len(lines) == 51
+
+
+def test_streaming_reports_a_failed_exit_with_the_tail():
+    success, output = CommonFuntion().run_command_streaming(["sh", "-c", "echo boom; exit 4"], "Failing")
+
+    assert not success
+    assert "exit status 4" in output and output.endswith("boom")
+
+
+def test_streaming_reports_a_command_that_cannot_start(tmp_path):
+    capture = StreamCapture()
+    success, output = CommonFuntion().run_command_streaming([str(tmp_path / "missing-tool"), "--help"],
+                                                            "Missing tool", capture=capture)
+
+    assert not success
+    assert "could not be started" in output and "missing-tool" in output
+    assert capture.line_count == 0
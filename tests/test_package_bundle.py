@@ -0,0 +1,135 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from script_container.execution.package_bundle import (
+    BUNDLE_MANIFEST, PackageBundle, compare_deb_versions, deb_name_version, deb_version_satisfies,
+    parse_deb_relations)
+from script_container.execution.step_journal import file_digest
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("1.0", "1.0", 0),
+    ("0:1.0", "1.0", 0),           # epoch 0 is implied
+    ("1:0.1", "9.9", 1),           # any epoch beats a bigger upstream version
+    ("1:2.0", "2:1.0", -1),
+    ("1.0~rc1", "1.0", -1),        # "~" sorts before the end of the string
+    ("1.0~~", "1.0~", -1),
+    ("1.0~rc1", "1.0~rc2", -1),
+    ("1.0", "1.0-1", -1),          # a missing revision sorts first
+    ("1.0-1", "1.0-2", -1),
+    ("1.0-1ubuntu1", "1.0-1", 1),
+    ("2.35-0ubuntu3.2", "2.35-0ubuntu3.10", -1),   # digit runs compare numerically
+    ("1.01", "1.1", 0),
+    ("1.0.0", "1.0", 1),
+    ("1.0a", "1.0+", -1),          # letters sort before other symbols
+    ("1.2-3-4", "1.2-3-10", -1),   # the revision starts after the last hyphen
+])
+def test_compare_deb_versions(a, b, expected):
+    result = compare_deb_versions(a, b)
+
+    assert (result > 0) - (result < 0) == expected
+    reverse = compare_deb_versions(b, a)
+    assert (reverse > 0) - (reverse < 0) == -expected
+    if shutil.which("dpkg"):
+        operator = {-1: "lt", 0: "eq", 1: "gt"}[expected]
+        assert subprocess.run(["dpkg", "--compare-versions", a, operator, b]).returncode == 0
+
+
+def test_deb_name_version_decodes_the_epoch():
+    assert deb_name_version("debs/libfoo1_1%3a2.0-1_amd64.deb") == ("libfoo1", "1:2.0-1")
+
+
+def test_parse_deb_relations_and_satisfaction():
+    assert parse_deb_relations("libc6 (>= 2.34), python3:any, debconf (>= 0.5) | debconf-2.0") == [
+        [("libc6", ">=", "2.34")], [("python3", None, None)], [("debconf", ">=", "0.5"), ("debconf-2.0", None, None)]]
+    assert parse_deb_relations("") == []
+    assert deb_version_satisfies("2.35-0ubuntu3", ">=", "2.34")
+    assert not deb_version_satisfies("2.35", "<<", "2.35")
+    assert deb_version_satisfies("2.35", "<=", "2.35")
+    assert not deb_version_satisfies("", ">=", "1.0")
+    assert deb_version_satisfies("", None, None)
+
+
+def control(package, version, depends="", provides=""):
+    return {'Package': package, 'Version': version, 'Depends': depends, 'Pre-Depends': "", 'Provides': provides}
+
+
+CLOSURE = {
+    'debs/dpdk-dev_24.11-1_amd64.deb': control("dpdk-dev", "24.11-1",
+                                               "libc6 (>= 2.34), libnuma1 (>= 2.0.16), debconf (>= 0.5) | debconf-2.0"),
+    'debs/libc6_2.39-0ubuntu8_amd64.deb': control("libc6", "2.39-0ubuntu8"),
+    'debs/libnuma1_2.0.18-1_amd64.deb': control("libnuma1", "2.0.18-1", "libc6 (>= 2.14)"),
+    'debs/cdebconf_0.270_amd64.deb': control("cdebconf", "0.270", "libc6 (>= 2.38)", provides="debconf-2.0"),
+    'debs/unrelated_1.0_amd64.deb': control("unrelated", "1.0"),
+}
+
+
+@pytest.mark.parametrize("installed, expected", [
+    # Installed libc6 satisfies every relation: it is not upgraded
+    ({'libc6': "2.35-0ubuntu3", 'libnuma1': "2.0.18-1", 'debconf': "1.5.79"},
+     ["debs/dpdk-dev_24.11-1_amd64.deb"]),
+    # Missing dependency is added, its own satisfied dependency is not
+    ({'libc6': "2.35-0ubuntu3", 'debconf': "1.5.79"},
+     ["debs/dpdk-dev_24.11-1_amd64.deb", "debs/libnuma1_2.0.18-1_amd64.deb"]),
+    # Installed but too old for the requirement: upgraded from the bundle
+    ({'libc6': "2.35-0ubuntu3", 'libnuma1': "2.0.14-3", 'debconf': "1.5.79"},
+     ["debs/dpdk-dev_24.11-1_amd64.deb", "debs/libnuma1_2.0.18-1_amd64.deb"]),
+    # Virtual dependency resolved through Provides, which in turn needs a newer libc6
+    ({'libc6': "2.35-0ubuntu3", 'libnuma1': "2.0.18-1"},
+     ["debs/cdebconf_0.270_amd64.deb", "debs/dpdk-dev_24.11-1_amd64.deb", "debs/libc6_2.39-0ubuntu8_amd64.deb"]),
+])
+def test_select_debs_installs_only_what_the_host_lacks(installed, expected):
+    assert PackageBundle.select_debs(CLOSURE, ["dpdk-dev"], installed) == expected
+
+
+def build_deb(tmp_path, package, version, depends=""):
+    root = tmp_path / "src" / package
+    (root / "DEBIAN").mkdir(parents=True)
+    fields = [f"Package: {package}", f"Version: {version}", "Architecture: all", "Maintainer: dev <dev@example.com>",
+              f"Description: {package} test package"] + ([f"Depends: {depends}"] if depends else [])
+    (root / "DEBIAN" / "control").write_text("\n".join(fields) + "\n")
+    deb = tmp_path / "bundle" / "debs" / f"{package}_{version.replace(':', '%3a')}_all.deb"
+    deb.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["dpkg-deb", "--build", "--root-owner-group", str(root), str(deb)], check=True, capture_output=True)
+    return deb
+
+
+class FakeProvisioner:
+    pip_command = ["pip3"]
+
+    def __init__(self, installed):
+        self.installed = installed
+
+    def installed_apt_packages(self):
+        return dict(self.installed)
+
+    def plan(self, apt_packages, pip_packages):
+        missing = [package for package in apt_packages if package not in self.installed]
+        return {'apt': missing, 'pip': [], 'apt_update': False,
+                'already_installed': len(apt_packages) - len(missing)}
+
+
+@pytest.mark.skipif(shutil.which("dpkg-deb") is None, reason="dpkg-deb is not installed")
+def test_install_hands_apt_only_the_needed_debs(tmp_path, monkeypatch):
+    build_deb(tmp_path, "dts-deps", "1.0", "libbase (>= 1.0), libnew")
+    build_deb(tmp_path, "libbase", "2.0")
+    build_deb(tmp_path, "libnew", "1:0.5")
+    bundle_dir = tmp_path / "bundle"
+    files = {str(path.relative_to(bundle_dir)): file_digest(str(path)) for path in sorted(bundle_dir.rglob("*.deb"))}
+    (bundle_dir / BUNDLE_MANIFEST).write_text(json.dumps({
+        'version': "test", 'platform': PackageBundle.platform_id(), 'apt_packages': ["dts-deps"],
+        'pip_packages': [], 'files': files}))
+
+    bundle = PackageBundle(FakeProvisioner({'libbase': "1.5"}))
+    commands = []
+    monkeypatch.setattr(bundle, "run_command_streaming",
+                        lambda command, description="", handlers=(): commands.append(command) or (True, ""))
+
+    assert bundle.install(str(bundle_dir))
+    assert sorted(path.rsplit("/", 1)[-1] for path in commands[0][4:]) == ["dts-deps_1.0_all.deb",
+                                                                         "libnew_1%3a0.5_all.deb"]
+    assert PackageBundle().deb_controls(str(bundle_dir), ["debs/libnew_1%3a0.5_all.deb"]) == {
+        'debs/libnew_1%3a0.5_all.deb': control("libnew", "1:0.5")}
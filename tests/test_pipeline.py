@@ -0,0 +1,180 @@
+import time
+import threading
+
+import pytest
+
+from script_container.execution.pipeline import PipelineError, PipelineScheduler, PipelineStep
+from script_container.execution.step_journal import StepJournal
+
+
+def step(name, inputs=(), outputs=(), calls=None, fail=False, **kwargs):
+    def func(context):
+        if calls is not None:
+            calls.append(name)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        return {key: name for key in outputs}
+    return PipelineStep(name, func, inputs=inputs, outputs=outputs, **kwargs)
+
+
+def test_failure_blocks_only_transitive_dependents():
+    calls = []
+    pipeline = PipelineScheduler(max_workers=1)
+    pipeline.add(step("firmware", outputs=["drivers_ready"], calls=calls, fail=True))
+    pipeline.add(step("pairing", inputs=["drivers_ready"], outputs=["topology"], calls=calls))
+    pipeline.add(step("ports", inputs=["topology", "repo"], calls=calls))
+    pipeline.add(step("clone", outputs=["repo"], calls=calls))
+    pipeline.add(step("packages", outputs=["packages_ready"], calls=calls))
+
+    with pytest.raises(PipelineError, match="firmware"):
+        pipeline.run()
+
+    assert sorted(calls) == ["clone", "firmware", "packages"]
+    assert {name: result['status'] for name, result in pipeline.results.items()} == {
+        'firmware': "failed", 'pairing': "blocked", 'ports': "blocked", 'clone': "done", 'packages': "done"}
+
+
+def test_step_returning_false_blocks_disabled_dependents_too():
+    pipeline = PipelineScheduler()
+    pipeline.add(PipelineStep("packages", lambda context: False, outputs=["packages_ready"]))
+    pipeline.add(step("lldp", inputs=["packages_ready"], enabled=False))
+
+    with pytest.raises(PipelineError, match="packages"):
+        pipeline.run()
+    assert pipeline.results['lldp']['status'] == "blocked"
+
+
+def test_unknown_fingerprint_runs_the_step_and_its_dependents(tmp_path):
+    journal = StepJournal(str(tmp_path / "steps.json"))
+    commits = iter(["abc", "abc", None])
+
+    def build(calls):
+        pipeline = PipelineScheduler(max_workers=1, journal=journal)
+        pipeline.add(step("clone", outputs=["repo"], calls=calls, fingerprint=lambda context: next(commits)))
+        pipeline.add(step("build", inputs=["repo"], calls=calls, fingerprint=lambda context: "flags"))
+        return pipeline
+
+    first, second, third = [], [], []
+    build(first).run()
+    build(second).run()
+    build(third).run()
+
+    assert first == ["clone", "build"]
+    assert second == []
+    assert third == ["clone", "build"]
+    assert journal.completed("clone", StepJournal.input_hash("clone", "abc", [])) is not None
+
+
+def timed_results(timings):
+    return {name: {'status': "done", 'start': start, 'duration': duration, 'error': None}
+            for name, (start, duration) in timings.items()}
+
+
+def test_critical_path_follows_the_dependency_that_finished_last():
+    pipeline = PipelineScheduler()
+    pipeline.add(step("clone", outputs=["repo"]))
+    pipeline.add(step("packages", outputs=["packages_ready"]))
+    pipeline.add(step("firmware", outputs=["drivers_ready"]))
+    pipeline.add(step("build", inputs=["repo", "packages_ready"], outputs=["dpdk"]))
+    pipeline.add(step("run_dts", inputs=["dpdk", "drivers_ready"]))
+    pipeline.results = timed_results({
+        'clone': (0.0, 4.0), 'packages': (0.0, 9.0), 'firmware': (0.0, 12.0),
+        'build': (9.0, 20.0), 'run_dts': (29.0, 5.0)})
+
+    assert pipeline.critical_path() == ["packages", "build", "run_dts"]
+    report = pipeline.report()
+    assert "Critical path (34.0s): packages → build → run_dts" in report
+    assert [line.split()[0] for line in report.splitlines() if line.endswith(" *")] == [
+        "packages", "build", "run_dts"]
+
+
+def test_critical_path_ignores_steps_that_never_ran():
+    pipeline = PipelineScheduler()
+    pipeline.add(step("firmware", outputs=["drivers_ready"]))
+    pipeline.add(step("pairing", inputs=["drivers_ready"]))
+    pipeline.results = timed_results({'firmware': (0.0, 3.0)})
+    pipeline.results['pairing'] = {'status': "blocked", 'start': None, 'duration': None, 'error': None}
+
+    assert pipeline.critical_path() == ["firmware"]
+    assert PipelineScheduler().critical_path() == []
+
+
+def test_independent_steps_run_in_parallel_and_fail_fast_blocks_dependents():
+    release = threading.Event()
+    calls = []
+
+    def slow(context):
+        # Only finishes once the failing branch has been handled
+        calls.append("slow")
+        assert release.wait(5)
+        return {'repo': "slow"}
+
+    def failing(context):
+        calls.append("firmware")
+        raise RuntimeError("flash failed")
+
+    pipeline = PipelineScheduler(max_workers=2)
+    pipeline.add(PipelineStep("clone", slow, outputs=["repo"]))
+    pipeline.add(PipelineStep("firmware", failing, outputs=["drivers_ready"]))
+    pipeline.add(step("pairing", inputs=["drivers_ready"], calls=calls))
+    pipeline.add(step("build", inputs=["repo"], calls=calls))
+
+    timer = threading.Timer(0.3, release.set)
+    timer.start()
+    started = time.monotonic()
+    with pytest.raises(PipelineError, match="firmware"):
+        pipeline.run()
+    timer.cancel()
+
+    assert time.monotonic() - started < 5
+    assert sorted(calls) == ["build", "firmware", "slow"]
+    assert pipeline.results['pairing']['status'] == "blocked"
+    assert pipeline.results['build']['status'] == "done"
+    # Both roots started together instead of one after the other
+    assert pipeline.results['firmware']['start'] < pipeline.results['clone']['duration']
+
+
+def test_exclusive_resources_serialize_steps():
+    active, overlaps = [], []
+    lock = threading.Lock()
+
+    def using_apt(name):
+        def func(context):
+            with lock:
+                active.append(name)
+                overlaps.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(name)
+        return func
+
+    pipeline = PipelineScheduler(max_workers=4)
+    for name in ("packages", "pip", "lldp"):
+        pipeline.add(PipelineStep(name, using_apt(name), resources=["apt"]))
+    pipeline.run()
+
+    assert overlaps == [1, 1, 1]
+
+
+@pytest.mark.parametrize("steps, message", [
+    ([step("a", inputs=["b_out"], outputs=["a_out"]), step("b", inputs=["a_out"], outputs=["b_out"])],
+     "Dependency cycle between steps: a, b"),
+    ([step("a", inputs=["nowhere"])], "needs 'nowhere'"),
+])
+def test_inconsistent_declarations_are_rejected_before_running(steps, message):
+    pipeline = PipelineScheduler()
+    for item in steps:
+        pipeline.add(item)
+
+    with pytest.raises(PipelineError, match=message):
+        pipeline.run()
+
+
+def test_duplicate_producers_are_rejected():
+    pipeline = PipelineScheduler()
+    pipeline.add(step("clone", outputs=["repo"]))
+
+    with pytest.raises(PipelineError, match="produced by both"):
+        pipeline.add(step("mirror", outputs=["repo"]))
+    with pytest.raises(PipelineError, match="Duplicate"):
+        pipeline.add(step("clone"))
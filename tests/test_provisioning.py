@@ -0,0 +1,101 @@
+from script_container.execution import provisioning
+from script_container.execution.provisioning import PackageProvisioner, canonical_name
+
+
+DPKG_STATUS = """\
+Package: make
+Status: install ok installed
+Priority: optional
+Version: 4.3-4.1build1
+Description: utility for directing compilation
+ Multi-line description with a
+ Version: 9.9 continuation line that must be ignored
+
+Package: mawk
+Status: install ok installed
+Provides: awk
+Version: 1.3.4.20200120-3
+
+Package: gcc-12
+Status: deinstall ok config-files
+Version: 12.3.0-1ubuntu1
+
+Package: python3-pip
+Status: install ok half-configured
+Version: 22.0.2+dfsg-1
+
+Package: libc6
+Status: install ok installed
+Provides: libc6-udeb (= 2.35-0ubuntu3.1), glibc-2.35
+Version: 2.35-0ubuntu3.1
+"""
+
+
+def fake_provisioner(tmp_path, status=DPKG_STATUS, distributions=()):
+    (tmp_path / "status").write_text(status)
+    site = tmp_path / "site-packages"
+    for name, version in distributions:
+        dist_info = site / f"{name}-{version}.dist-info"
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+    return PackageProvisioner(dpkg_status_path=str(tmp_path / "status"), apt_lists_path=str(tmp_path / "lists"),
+                              python_paths=[str(site)])
+
+
+def test_installed_apt_packages_keeps_installed_stanzas_only(tmp_path):
+    installed = fake_provisioner(tmp_path).installed_apt_packages()
+
+    assert installed == {
+        'make': "4.3-4.1build1",
+        'mawk': "1.3.4.20200120-3",
+        'awk': "1.3.4.20200120-3",
+        'libc6': "2.35-0ubuntu3.1",
+        'libc6-udeb': "2.35-0ubuntu3.1",
+        'glibc-2.35': "2.35-0ubuntu3.1",
+    }
+
+
+def test_installed_apt_packages_prefers_real_package_over_provides(tmp_path):
+    status = ("Package: awk-provider\nStatus: install ok installed\nProvides: gawk\nVersion: 1.0\n\n"
+              "Package: gawk\nStatus: install ok installed\nVersion: 5.1.0-1\n")
+
+    assert fake_provisioner(tmp_path, status).installed_apt_packages()['gawk'] == "5.1.0-1"
+
+
+def test_installed_apt_packages_without_status_file(tmp_path):
+    assert PackageProvisioner(dpkg_status_path=str(tmp_path / "missing")).installed_apt_packages() == {}
+
+
+def test_pip_requirement_satisfied():
+    provisioner = PackageProvisioner()
+    installed = {'pexpect': "4.7.0", 'pyelftools': "0.29"}
+
+    assert canonical_name("PyELF_Tools") == "pyelf-tools"
+    assert provisioner.pip_requirement_satisfied("pexpect==4.7.0", installed)
+    assert not provisioner.pip_requirement_satisfied("pexpect==4.8.0", installed)
+    assert provisioner.pip_requirement_satisfied("PyElfTools", installed)
+    assert not provisioner.pip_requirement_satisfied("xlrd", installed)
+
+
+def test_plan_installs_only_the_delta(tmp_path, monkeypatch):
+    monkeypatch.setattr(provisioning, "APT_UPDATE_STAMP", str(tmp_path / "no-stamp"))
+    provisioner = fake_provisioner(tmp_path, distributions=[("pexpect", "4.7.0"), ("PyYAML", "6.0")])
+
+    plan = provisioner.plan(["make", "awk", "gcc-12", "python3-pip"], ["pexpect==4.7.0", "pyyaml", "xlrd"])
+
+    assert plan['apt'] == ["gcc-12", "python3-pip"]
+    assert plan['pip'] == ["xlrd"]
+    assert plan['already_installed'] == 4
+    # No package lists were ever downloaded, so apt-get update must run first
+    assert plan['apt_update'] is True
+
+
+def test_plan_skips_apt_update_with_fresh_lists(tmp_path, monkeypatch):
+    monkeypatch.setattr(provisioning, "APT_UPDATE_STAMP", str(tmp_path / "no-stamp"))
+    (tmp_path / "lists").mkdir()
+    (tmp_path / "lists" / "archive.ubuntu.com_ubuntu_dists_jammy_InRelease").write_text("")
+    provisioner = fake_provisioner(tmp_path)
+
+    assert provisioner.apt_lists_fresh()
+    assert provisioner.plan(["gcc-12"], [])['apt_update'] is False
+    assert provisioner.plan(["make"], [])['apt_update'] is False
@@ -0,0 +1,49 @@
+import os
+import time
+
+import pytest
+
+from script_container.execution.constant import CommonFuntion
+from script_container.execution.shell_backend import ShellCoprocess
+
+
+@pytest.fixture
+def shell():
+    coprocess = ShellCoprocess()
+    yield coprocess
+    coprocess.close()
+
+
+def test_run_returns_exit_code_and_merged_output(shell):
+    assert shell.run(["sh", "-c", "echo out; echo err >&2; exit 3"]) == (3, "out\nerr\n")
+    assert shell.run(["echo", "again"]) == (0, "again\n")
+
+
+def test_timeout_kills_the_shell_and_restarts_it(shell):
+    started = time.monotonic()
+    exit_code, output = shell.run(["sleep", "30"], timeout=0.2)
+
+    assert exit_code is None and "timed out after 0.2 seconds" in output
+    assert time.monotonic() - started < 5
+    assert shell.run(["echo", "fresh"]) == (0, "fresh\n")
+
+
+def test_batch_continues_after_a_timed_out_command(shell):
+    results = shell.run_batch([["echo", "a"], ["sleep", "30"], ["echo", "b"]], [None, 0.2, 1.0])
+
+    assert results[0] == (0, "a\n")
+    assert results[1][0] is None
+    assert results[2] == (0, "b\n")
+
+
+def test_run_command_reports_a_coprocess_timeout_as_failure(tmp_path, monkeypatch):
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)  # opening it for reading blocks until a writer shows up
+    runner = CommonFuntion()
+    monkeypatch.setattr(runner, "shell_backend", ShellCoprocess())
+    try:
+        success, output = runner.run_command(["cat", str(fifo)], "Reading fifo", timeout=0.2)
+    finally:
+        runner.shell_backend.close()
+
+    assert not success and "timed out" in output
@@ -0,0 +1,100 @@
+import os
+import gzip
+import shutil
+import tarfile
+import subprocess
+
+import pytest
+
+from script_container.execution.source_snapshot import SNAPSHOT_MTIME, ParallelGzipWriter, SourceSnapshot
+
+
+def git(*args, cwd=None):
+    return subprocess.run(["git"] + list(args), cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """
+    Work tree with one commit holding a few files, an executable and a symlink.
+    """
+    for key, value in (("GIT_AUTHOR_NAME", "dev"), ("GIT_AUTHOR_EMAIL", "dev@example.com"),
+                       ("GIT_COMMITTER_NAME", "dev"), ("GIT_COMMITTER_EMAIL", "dev@example.com"),
+                       ("GIT_CONFIG_NOSYSTEM", "1"), ("HOME", str(tmp_path))):
+        monkeypatch.setenv(key, value)
+    work = tmp_path / "dpdk"
+    git("init", "-q", "-b", "main", str(work))
+    (work / "lib").mkdir()
+    (work / "lib" / "eal.c").write_text("int main(void) { return 0; }\n" * 2000)
+    (work / "build.sh").write_text("#!/bin/sh\nmeson setup build\n")
+    (work / "build.sh").chmod(0o755)
+    os.symlink("lib/eal.c", work / "eal.c")
+    git("add", "-A", cwd=work)
+    git("commit", "-q", "-m", "initial", cwd=work)
+    return work
+
+
+def test_parallel_gzip_output_depends_only_on_the_input(tmp_path):
+    data = os.urandom(50_000) + b"dpdk" * 200_000
+
+    outputs = []
+    for workers in (1, 4):
+        path = tmp_path / f"out-{workers}.gz"
+        with open(path, "wb") as raw, ParallelGzipWriter(raw, block_size=64 * 1024, workers=workers) as writer:
+            for offset in range(0, len(data), 10_000):
+                writer.write(data[offset:offset + 10_000])
+        outputs.append(path.read_bytes())
+
+    assert outputs[0] == outputs[1]
+    assert gzip.decompress(outputs[0]) == data
+
+
+def test_parallel_gzip_empty_input_is_a_valid_gzip(tmp_path):
+    path = tmp_path / "empty.gz"
+    with open(path, "wb") as raw, ParallelGzipWriter(raw, workers=2):
+        pass
+
+    assert gzip.decompress(path.read_bytes()) == b""
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_archives_of_the_same_commit_are_byte_identical(repo, tmp_path):
+    first = SourceSnapshot(cache_root=str(tmp_path / "cache-a"), workers=1)
+    commit = first.build(str(repo), str(tmp_path / "a.tar.gz"))
+
+    # Untracked output, fresh mtimes and a different thread count must not change the bytes
+    (repo / "build").mkdir()
+    (repo / "build" / "eal.o").write_bytes(b"\0" * 100)
+    os.utime(repo / "lib" / "eal.c", (1_000_000_000, 1_000_000_000))
+    second = SourceSnapshot(cache_root=str(tmp_path / "cache-b"), workers=4)
+
+    assert second.build(str(repo), str(tmp_path / "b.tar.gz")) == commit == git("rev-parse", "HEAD", cwd=repo)
+    assert (tmp_path / "a.tar.gz").read_bytes() == (tmp_path / "b.tar.gz").read_bytes()
+
+    with tarfile.open(tmp_path / "a.tar.gz") as archive:
+        members = {member.name: member for member in archive.getmembers()}
+    assert sorted(members) == ["dpdk", "dpdk/build.sh", "dpdk/eal.c", "dpdk/lib", "dpdk/lib/eal.c"]
+    assert {(member.mtime, member.uid, member.gid, member.uname, member.gname)
+            for member in members.values()} == {(SNAPSHOT_MTIME, 0, 0, "", "")}
+    assert members["dpdk/build.sh"].mode & 0o111
+    assert members["dpdk/eal.c"].issym() and members["dpdk/eal.c"].linkname == "lib/eal.c"
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_cached_archive_is_reused_and_placed_whole(repo, tmp_path, monkeypatch):
+    snapshot = SourceSnapshot(cache_root=str(tmp_path / "cache"), workers=2)
+    commit = snapshot.build(str(repo), str(tmp_path / "first.tar.gz"), prefix="dpdk-src")
+    assert os.path.isfile(snapshot.cache_path("dpdk-src", commit))
+
+    monkeypatch.setattr(snapshot, "_write_archive", lambda *args: pytest.fail("cache hit must not re-archive"))
+    assert snapshot.build(str(repo), str(tmp_path / "second.tar.gz"), prefix="dpdk-src") == commit
+    assert (tmp_path / "first.tar.gz").read_bytes() == (tmp_path / "second.tar.gz").read_bytes()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_unknown_ref_builds_nothing(repo, tmp_path):
+    snapshot = SourceSnapshot(cache_root=str(tmp_path / "cache"))
+
+    assert snapshot.build(str(repo), str(tmp_path / "x.tar.gz"), ref="no-such-tag") is None
+    assert not (tmp_path / "x.tar.gz").exists()
@@ -0,0 +1,101 @@
+from script_container.execution.pipeline import PipelineScheduler, PipelineStep
+from script_container.execution.step_journal import StepJournal, file_digest
+
+
+def test_input_hash_chains_upstream_hashes():
+    clone = StepJournal.input_hash("clone", {'commit': "abc"}, [])
+    build = StepJournal.input_hash("build", "flags", [clone])
+
+    # Same inputs, same hash; key order and dependency order do not matter
+    assert StepJournal.input_hash("clone", {'commit': "abc"}, []) == clone
+    assert StepJournal.input_hash("x", {'a': 1, 'b': 2}, ["h1", "h2"]) == \
+        StepJournal.input_hash("x", {'b': 2, 'a': 1}, ["h2", "h1"])
+    # A change upstream propagates to the dependent even with its own fingerprint unchanged
+    new_clone = StepJournal.input_hash("clone", {'commit': "def"}, [])
+    assert StepJournal.input_hash("build", "flags", [new_clone]) != build
+    # The step name is part of the hash
+    assert StepJournal.input_hash("pip", "flags", [clone]) != build
+
+
+def test_record_persists_and_only_matches_the_same_hash(tmp_path):
+    path = tmp_path / "cache" / "steps.json"
+    journal = StepJournal(str(path))
+    journal.record("clone", "h1", {'repo': "/opt/dts"})
+    journal.record("probe", "h2", {'handle': object()})  # not JSON: never journaled
+
+    reloaded = StepJournal(str(path))
+    assert reloaded.completed("clone", "h1") == {'repo': "/opt/dts"}
+    assert reloaded.completed("clone", "other") is None
+    assert reloaded.completed("probe", "h2") is None
+
+    reloaded.forget("clone")
+    assert StepJournal(str(path)).completed("clone", "h1") is None
+    reloaded.record("clone", "h1", {})
+    reloaded.invalidate()
+    assert not path.exists() and reloaded.entries == {}
+
+
+def test_unreadable_journal_starts_empty(tmp_path):
+    path = tmp_path / "steps.json"
+    path.write_text("{not json")
+
+    assert StepJournal(str(path)).entries == {}
+
+
+def test_file_digest(tmp_path):
+    path = tmp_path / "archive.tar.gz"
+    path.write_bytes(b"abc")
+
+    assert file_digest(str(path)) == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+    assert file_digest(str(tmp_path / "missing")) is None
+
+
+def test_upstream_change_reruns_only_the_dirty_chain(tmp_path):
+    journal = StepJournal(str(tmp_path / "steps.json"))
+    fingerprints = {'clone': "abc", 'packages': "list-1", 'build': "flags"}
+
+    def run():
+        calls = []
+        pipeline = PipelineScheduler(max_workers=1, journal=journal)
+        for name, inputs, outputs in (("clone", [], ["repo"]), ("packages", [], ["packages_ready"]),
+                                      ("build", ["repo", "packages_ready"], ["dpdk"])):
+            pipeline.add(PipelineStep(
+                name, lambda context, name=name, outputs=outputs: calls.append(name) or {key: name for key in outputs},
+                inputs=inputs, outputs=outputs, fingerprint=lambda context, name=name: fingerprints[name]))
+        context = pipeline.run()
+        return calls, context, pipeline
+
+    assert run()[0] == ["clone", "packages", "build"]
+    calls, context, pipeline = run()
+    assert calls == []
+    assert context['dpdk'] == "build"  # outputs restored from the journal
+    assert {result['status'] for result in pipeline.results.values()} == {"cached"}
+
+    fingerprints['clone'] = "def"
+    assert run()[0] == ["clone", "build"]
+    fingerprints['build'] = "other-flags"
+    assert run()[0] == ["build"]
+
+
+def test_verify_reruns_a_step_whose_outputs_disappeared(tmp_path):
+    journal = StepJournal(str(tmp_path / "steps.json"))
+    workspace = tmp_path / "dts"
+    calls = []
+
+    def clone(context):
+        calls.append("clone")
+        workspace.mkdir(exist_ok=True)
+        return {'repo': str(workspace)}
+
+    def run():
+        pipeline = PipelineScheduler(journal=journal)
+        pipeline.add(PipelineStep("clone", clone, outputs=["repo"], fingerprint=lambda context: "abc",
+                                  verify=lambda outputs: (tmp_path / "dts").is_dir()))
+        pipeline.run()
+
+    run()
+    run()
+    workspace.rmdir()
+    run()
+
+    assert calls == ["clone", "clone"]
@@ -0,0 +1,55 @@
+import pytest
+
+from script_container.execution.topology_graph import TopologyGraph, benchmark_topology_graph
+
+
+def build(observations, dominance=2.0):
+    graph = TopologyGraph(dominance=dominance)
+    for source, observed in observations:
+        graph.add_observation(source, observed)
+    return graph
+
+
+@pytest.mark.parametrize("observations, expected", [
+    # Back-to-back cables, each probed from both ends
+    ([("a", ["a", "b"]), ("c", ["c", "d"]), ("b", ["b", "a"]), ("d", ["d", "c"])],
+     {'pairs': [["a", "b"], ["c", "d"]], 'multi_peer': [], 'ambiguous': [], 'unpaired': []}),
+    # The pair keeps the orientation of the first probe that saw the link
+    ([("b", ["a"]), ("a", ["b"])],
+     {'pairs': [["b", "a"]], 'multi_peer': [], 'ambiguous': [], 'unpaired': []}),
+    # Switch: every port flaps with every other one, nothing is guessed
+    ([("a", ["b", "c"]), ("b", ["a", "c"]), ("c", ["a", "b"])],
+     {'pairs': [], 'multi_peer': [["a", "b", "c"]],
+      'ambiguous': [["a", "b", 2], ["a", "c", 2], ["b", "c", 2]], 'unpaired': []}),
+    # A single noisy observation is outweighed by the real cable and reported
+    ([("a", ["b"]), ("a", ["b", "c"]), ("b", ["a"])],
+     {'pairs': [["a", "b"]], 'multi_peer': [], 'ambiguous': [["a", "c", 1]], 'unpaired': ["c"]}),
+    # Probed ports that never saw a peer, and self-reports, stay unpaired
+    ([("a", ["a"]), ("b", [])],
+     {'pairs': [], 'multi_peer': [], 'ambiguous': [], 'unpaired': ["a", "b"]}),
+])
+def test_resolve(observations, expected):
+    assert build(observations).resolve() == expected
+
+
+def test_dominance_threshold_decides_between_pair_and_ambiguity():
+    observations = [("a", ["b"]), ("a", ["b"]), ("a", ["b", "c"]), ("b", ["a"]), ("c", ["a"])]
+
+    # a-b has 4 units of evidence against 2 for a-c
+    assert build(observations, dominance=2.0).resolve()['pairs'] == [["a", "b"]]
+    assert build(observations, dominance=3.0).resolve()['pairs'] == []
+
+
+def test_evidence_is_symmetric_and_duplicates_count_once_per_probe():
+    graph = build([("a", ["b", "b", "a"]), ("b", ["a"])])
+
+    assert graph.evidence("a", "b") == graph.evidence("b", "a") == 2
+    assert graph.evidence("a", "missing") == 0
+    assert graph.components() == [["a", "b"]]
+
+
+def test_benchmark_recovers_the_synthetic_cabling():
+    result = benchmark_topology_graph(ports=64, probes_per_port=2, noise_ratio=0.1)
+
+    assert result['recovered']
+    assert result['ports'] == 64